@@ -1,6 +1,26 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import employees, payroll
+from app.api.v1.endpoints import employees, payroll, jobs
+from app.core.config import settings
+
+
+def without_routes(router: APIRouter, replaced: APIRouter) -> APIRouter:
+    """
+    A copy of router minus the routes (same path and methods) that replaced defines.
+    """
+    taken = {(route.path, frozenset(route.methods)) for route in replaced.routes}
+    remaining = APIRouter()
+    remaining.routes.extend(route for route in router.routes if (route.path, frozenset(route.methods)) not in taken)
+    return remaining
+
 
 api_router = APIRouter()
-api_router.include_router(employees.router, prefix="/employees", tags=["Employees"])
-api_router.include_router(payroll.router, prefix="/payroll", tags=["Payroll"])
+if settings.db_async:
+    from app.api.v1.endpoints import employees_async, payroll_async
+    api_router.include_router(employees_async.router, prefix="/employees", tags=["Employees"])
+    # the remaining sync routes go first so that /{payroll_id} does not shadow /export and friends
+    api_router.include_router(without_routes(payroll.router, payroll_async.router), prefix="/payroll", tags=["Payroll"])
+    api_router.include_router(payroll_async.router, prefix="/payroll", tags=["Payroll"])
+else:
+    api_router.include_router(employees.router, prefix="/employees", tags=["Employees"])
+    api_router.include_router(payroll.router, prefix="/payroll", tags=["Payroll"])
+api_router.include_router(jobs.router, prefix="/jobs", tags=["Jobs"])
@@ -1,13 +1,19 @@
 from fastapi import APIRouter
 from typing import List, Optional
-from fastapi import Query, Depends, HTTPException
+from fastapi import Query, Depends, HTTPException, Header, Request
 from sqlalchemy.orm import Session
 from app.db.session import get_session
+from app.services.pagination import page_openapi, page_response
+from app.services.serialization import PreEncodedJSONResponse, json_response
+from app.services.employee_cache import employee_cache
+from app.services.versioning import not_modified_response, with_etag
 from app.schemas.employee import EmployeeResponse,EmployeeCreate,EmployeeUpdate
 from app.services.employee_service import (
     get_all_employees,
     get_employee_by_id,
     get_filtered_employees,
+    employee_etag,
+    employee_list_etag,
     create_employee,
     update_employee,
     update_employee_status,
@@ -17,21 +23,40 @@ from app.services.employee_service import (
 
 router = APIRouter()
 
-@router.get("/", response_model=List[EmployeeResponse])
-def read_users(db: Session = Depends(get_session)):
-    return get_all_employees(db)
+@router.get("/", response_model=None, response_class=PreEncodedJSONResponse, responses=page_openapi(EmployeeResponse))
+def read_users(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, description="Page size; without limit or cursor every row is returned"),
+    cursor: Optional[str] = Query(None),
+    status: Optional[str] = Query(None),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return, e.g. id,first_name,last_name"),
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_session)
+):
+    etag = employee_list_etag(db, request.url.query)
+    not_modified = not_modified_response(if_none_match, etag)
+    if not_modified:
+        return not_modified
+    page = get_all_employees(db, limit, cursor, status, fields)
+    return with_etag(page_response(page), etag)
 
 
 @router.get("/employeeList", response_model=List[EmployeeResponse])
-async def employee_list(
+def employee_list(
+    request: Request,
     search: Optional[str] = Query(None),
     hire_date_from: Optional[str] = Query(None),
     hire_date_to: Optional[str] = Query(None),
     status: Optional[str] = Query(None),
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(get_session)
 ):
+    etag = employee_list_etag(db, request.url.query)
+    not_modified = not_modified_response(if_none_match, etag)
+    if not_modified:
+        return not_modified
     try:
-        return get_filtered_employees(
+        employees = get_filtered_employees(
             db=db,
             search=search,
             hire_date_from=hire_date_from,
@@ -40,19 +65,29 @@ async def employee_list(
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
+    return with_etag(json_response(employees), etag)
+
+@router.get("/cache-stats", response_model=dict)
+def read_employee_cache_stats():
+    return employee_cache.stats()
 
 @router.get("/{employee_id}", response_model=EmployeeResponse)
-async def read_employee(
+def read_employee(
     employee_id: int,
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(get_session)
 ):
+    etag = employee_etag(db, employee_id)
+    not_modified = not_modified_response(if_none_match, etag)
+    if not_modified:
+        return not_modified
     employee = get_employee_by_id(db, employee_id)
     if not employee:
         raise HTTPException(status_code=404, detail="Employee not found")
-    return employee
+    return with_etag(json_response(employee), etag)
     
 @router.post("/employee/add",  response_model=dict)
-async def add_employee_submit(
+def add_employee_submit(
     employee: EmployeeCreate, 
     db: Session = Depends(get_session)
 ):
@@ -67,7 +102,7 @@ async def add_employee_submit(
         raise HTTPException(status_code=400, detail=result["error"])
     
 @router.put("/employee/edit/{employee_id}", response_model=dict)
-async def edit_employee_submit(
+def edit_employee_submit(
     employee_id: int,
     updated_employee: EmployeeUpdate,
     db: Session = Depends(get_session),
@@ -78,7 +113,7 @@ async def edit_employee_submit(
     return result
 
 @router.put("/employee/status/{employee_id}", response_model=EmployeeResponse)
-async def edit_employee_status(
+def edit_employee_status(
     employee_id: int,
     status: str,
     db: Session = Depends(get_session),
@@ -89,7 +124,7 @@ async def edit_employee_status(
     return result["employee"]
 
 @router.delete("/employee/delete/{employee_id}", response_model=dict)
-async def delete_employee_submit(
+def delete_employee_submit(
     employee_id: int,
     db: Session = Depends(get_session),
 ):
@@ -0,0 +1,80 @@
+import asyncio
+from fastapi import APIRouter
+from typing import List, Literal, Optional
+from fastapi import Query, HTTPException
+from fastapi import status
+from fastapi.responses import FileResponse, Response
+from app.services.job_service import job_queue, JobQueueFull, JOB_FAILED
+from app.services.payslip_cache import SpooledArtifact
+from app.services.payroll_service import build_payslip_artifact, build_bulk_payslips_zip
+
+router = APIRouter()
+
+PAYSLIP_FORMATS = {"pdf": "pdf", "excel": "xlsx"}
+
+
+def submit_job(kind: str, params: dict, render) -> dict:
+    try:
+        job = job_queue.submit(kind, params, render)
+    except JobQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "5"})
+    return job.to_dict()
+
+def get_job_or_404(job_id: str):
+    job = job_queue.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.post("/payslip", response_model=dict, status_code=status.HTTP_202_ACCEPTED)
+def submit_payslip_job(
+    employee_id: int,
+    format: Literal["pdf", "excel"] = Query("pdf"),
+):
+    fmt = PAYSLIP_FORMATS[format]
+    return submit_job(
+        f"payslip_{format}",
+        {"employee_id": employee_id},
+        lambda db: build_payslip_artifact(db, employee_id, fmt),
+    )
+
+@router.post("/bulk-payslips", response_model=dict, status_code=status.HTTP_202_ACCEPTED)
+def submit_bulk_payslips_job(
+    start_date: str = Query(...),
+    end_date: str = Query(...),
+    employee_ids: Optional[List[int]] = Query(None),
+):
+    return submit_job(
+        "bulk_payslips",
+        {"start_date": start_date, "end_date": end_date, "employee_ids": employee_ids},
+        lambda db: build_bulk_payslips_zip(db, start_date, end_date, employee_ids),
+    )
+
+@router.get("/{job_id}", response_model=dict)
+def read_job(job_id: str):
+    return get_job_or_404(job_id).to_dict()
+
+@router.get("/{job_id}/wait", response_model=dict)
+async def wait_for_job(
+    job_id: str,
+    timeout: float = Query(30, ge=0, le=300),
+):
+    job = get_job_or_404(job_id)
+    # asyncio.wait leaves the job alone on timeout; wait_for would cancel a queued one
+    await asyncio.wait([asyncio.wrap_future(job.future)], timeout=timeout)
+    return job.to_dict()
+
+@router.get("/{job_id}/download")
+def download_job_result(job_id: str):
+    job = get_job_or_404(job_id)
+    if job.status == JOB_FAILED:
+        raise HTTPException(status_code=job.error_code or 500, detail=job.error)
+    result = job.result
+    if result is None:
+        raise HTTPException(status_code=409, detail=f"Job is still {job.status}")
+    if isinstance(result, SpooledArtifact):
+        return FileResponse(result.path, media_type=result.media_type, filename=result.filename)
+    return Response(result.content, media_type=result.media_type, headers={
+        "Content-Disposition": f"attachment; filename={result.filename}"
+    })
@@ -1,34 +1,84 @@
 from fastapi import APIRouter, UploadFile, File
-from typing import List, Optional
-from fastapi import Query, Depends, HTTPException
+from typing import List, Literal, Optional
+from fastapi import Query, Depends, HTTPException, Header, Request, Response
 from sqlalchemy.orm import Session
 from app.db.session import get_session
-from app.schemas.payroll import PayrollSchema, PayrollResponse,PayrollCreate,PayrollUpdate
+from app.schemas.payroll import PayrollSchema, PayrollResponse,PayrollCreate,PayrollUpdate,PayrollSimulation
 from fastapi import status
 from fastapi.responses import StreamingResponse
 from app.services.payroll_service import(
     get_all_payrolls,
+    export_payrolls,
     generate_payroll,
     update_payroll,
     delete_payroll,
     get_payroll_summary,
     generate_payslip_pdf,
+    generate_bulk_payslips_pdf,
     generate_payslip_excel,
+    generate_payroll_workbook,
     batch_upload_payroll,
+    stream_upload_payroll,
     download_payroll_template,
-    get_payroll_by_id
+    get_payroll_by_id,
+    payroll_etag,
+    payroll_list_etag
 )
+from app.services.payslip_renderer import reload_render_context
+from app.services.render_executor import render_executor, RenderQueueFull
+from app.services.pagination import page_openapi, page_response
+from app.services.serialization import PreEncodedJSONResponse, json_response
+from app.services.versioning import not_modified_response, with_etag
+from app.services.rollup_service import get_company_summary
+from app.services.payroll_engine import run_payroll, simulate_payroll
     
 router = APIRouter()
 
-@router.get("/", response_model=List[PayrollResponse])
-def read_users(db: Session = Depends(get_session)):
-    return get_all_payrolls(db)
+async def run_render(kind: str, render, *args):
+    """
+    Run a payslip/template render on the bounded render pool; 429 with Retry-After when it is full.
+    """
+    try:
+        return await render_executor.run(kind, render, *args)
+    except RenderQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+@router.get("/", response_model=None, response_class=PreEncodedJSONResponse, responses=page_openapi(PayrollResponse))
+def read_users(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, description="Page size; without limit or cursor every row is returned"),
+    cursor: Optional[str] = Query(None),
+    employee_id: Optional[int] = Query(None),
+    start_date: Optional[str] = Query(None),
+    end_date: Optional[str] = Query(None),
+    project: Optional[str] = Query(None),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return, e.g. id,date,net_salary"),
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_session)
+):
+    etag = payroll_list_etag(db, request.url.query)
+    not_modified = not_modified_response(if_none_match, etag)
+    if not_modified:
+        return not_modified
+    page = get_all_payrolls(db, limit, cursor, employee_id, start_date, end_date, project, fields)
+    return with_etag(page_response(page), etag)
+
+@router.get("/export", response_class=StreamingResponse)
+def export_payroll_data(
+    format: Literal["ndjson", "csv"] = Query("ndjson"),
+    start_date: Optional[str] = Query(None),
+    end_date: Optional[str] = Query(None),
+    project: Optional[str] = Query(None),
+    employee_id: Optional[int] = Query(None),
+):
+    return export_payrolls(format, start_date, end_date, project, employee_id)
 
 @router.get("/download-template")
-def download_template():
+async def download_template():
     try:
-        return download_payroll_template()
+        return await run_render("payroll_template", download_payroll_template)
+    except HTTPException as e:
+        raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to generate template: {str(e)}")
     
@@ -50,7 +100,7 @@ def create_payroll(
     result = generate_payroll(db, payroll_data, employee_id)
     if not result["success"]:
         raise HTTPException(status_code=result.get("code", 400), detail=result["error"])
-    return result["payroll"]
+    return json_response(result["payroll"], status_code=status.HTTP_201_CREATED)
 
 @router.put("/update", response_model=PayrollResponse)
 def update_payroll_data(
@@ -62,7 +112,7 @@ def update_payroll_data(
     if not result["success"]:
         raise HTTPException(status_code=result.get("code", 400), detail=result["error"])
     
-    return result["payroll"]
+    return json_response(result["payroll"])
 
 @router.delete("/delete", response_model=dict)
 def delete_payroll_data(
@@ -75,75 +125,148 @@ def delete_payroll_data(
     
     return result
 
+@router.post("/run", response_model=dict)
+def run_payroll_period(
+    start_date: str = Query(...),
+    end_date: str = Query(...),
+    employee_ids: Optional[List[int]] = Query(None),
+    db: Session = Depends(get_session)
+):
+    result = run_payroll(db, start_date, end_date, employee_ids)
+    if not result["success"]:
+        raise HTTPException(status_code=result.get("code", 400), detail=result["error"])
+    return result
+
+@router.post("/simulate", response_model=dict)
+def simulate_payroll_rates(
+    simulation: PayrollSimulation,
+    db: Session = Depends(get_session)
+):
+    result = simulate_payroll(db, simulation)
+    if not result["success"]:
+        raise HTTPException(status_code=result.get("code", 400), detail=result["error"])
+    return result
+
 @router.get("/summary", response_model=dict)
 def generate_payroll_summary(
     employee_id: int,
     start_date: Optional[str] = Query(None),
     end_date: Optional[str] = Query(None),
+    totals_only: bool = Query(False),
     db: Session = Depends(get_session)
 ):
-    result = get_payroll_summary(db, employee_id, start_date, end_date)
+    result = get_payroll_summary(db, employee_id, start_date, end_date, totals_only)
     if not result["success"]:
         raise HTTPException(status_code=result.get("code", 400), detail=result["error"])
-    
-    payrolls = result["payrolls"]
-    total_hours_worked = sum(p.total_hours_worked or 0 for p in payrolls)
-    overtime_pay = sum(p.overtime_pay or 0 for p in payrolls)
-    night_differential_pay = sum(p.night_differential_pay or 0 for p in payrolls)
-    deductions = sum(p.deductions or 0 for p in payrolls)
-    allowance = sum(p.allowance or 0 for p in payrolls)
-    gross_salary = sum(p.subtotal or 0 for p in payrolls)
-    net_salary = sum(p.net_salary or 0 for p in payrolls)
-
-    return {
-        "payrolls": payrolls,
-        "totals": {
-            "total_hours_worked": total_hours_worked,
-            "overtime_pay": overtime_pay,
-            "night_differential_pay": night_differential_pay,
-            "deductions": deductions,
-            "allowance": allowance,
-            "gross_salary": gross_salary,
-            "net_salary": net_salary,
-        }
+
+    summary = {
+        "totals": result["totals"],
+        "row_count": result["row_count"],
+        "period_from": result["period_from"],
+        "period_to": result["period_to"],
     }
+    if totals_only:
+        return summary
+    return {"payrolls": result["payrolls"], **summary}
+
+@router.get("/summary/company", response_model=dict)
+def generate_company_summary(
+    period: Literal["day", "week", "month"] = Query("month"),
+    start_date: Optional[str] = Query(None),
+    end_date: Optional[str] = Query(None),
+    db: Session = Depends(get_session)
+):
+    try:
+        return get_company_summary(db, period, start_date, end_date)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/{payroll_id}", response_model=dict)
 def read_payroll(
     payroll_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(get_session)
 ):
+    etag = payroll_etag(db, payroll_id)
+    not_modified = not_modified_response(if_none_match, etag)
+    if not_modified:
+        return not_modified
     result = get_payroll_by_id(db, payroll_id)
     if not result["success"]:
         raise HTTPException(status_code=result.get("code", 400), detail=result["error"])
     
+    with_etag(response, etag)
     return result
 
 @router.get("/payslip/pdf", response_class=StreamingResponse)
-def generate_payslip(
+async def generate_payslip(
     employee_id: int,
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(get_session)
 ):
     try:
-        return generate_payslip_pdf(employee_id, db)
+        return await run_render("payslip_pdf", generate_payslip_pdf, employee_id, db, if_none_match)
     except HTTPException as e:
         raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/payslip/bulk", response_class=StreamingResponse)
+def generate_bulk_payslip(
+    start_date: str = Query(...),
+    end_date: str = Query(...),
+    employee_ids: Optional[List[int]] = Query(None),
+    db: Session = Depends(get_session)
+):
+    try:
+        return generate_bulk_payslips_pdf(db, start_date, end_date, employee_ids)
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/payslip/reload-template", response_model=dict)
+def reload_payslip_template():
+    try:
+        reload_render_context()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to reload payslip template: {str(e)}")
+    return {"success": True, "message": "Payslip template reloaded."}
+
 @router.get("/payslip/excel")
-def generate_payslip_excel_file(
+async def generate_payslip_excel_file(
     employee_id: int,
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(get_session)
 ):
-    return generate_payslip_excel(db, employee_id)
+    return await run_render("payslip_excel", generate_payslip_excel, db, employee_id, if_none_match)
+
+@router.get("/payslip/excel/bulk", response_class=StreamingResponse)
+async def generate_payroll_workbook_file(
+    start_date: str = Query(...),
+    end_date: str = Query(...),
+    employee_ids: Optional[List[int]] = Query(None),
+    db: Session = Depends(get_session)
+):
+    return await run_render("payroll_workbook", generate_payroll_workbook, db, start_date, end_date, employee_ids)
+
+@router.get("/payslip/render-stats", response_model=dict)
+def read_render_stats():
+    return render_executor.stats()
 
 @router.post("/batch-upload", response_model=dict)
 async def batch_upload_payroll_data(
     excel_file: UploadFile = File(...),
+    streaming: bool = Query(False),
+    chunk_size: Optional[int] = Query(None, ge=1),
+    mode: Literal["insert", "upsert", "skip"] = Query("insert"),
     db: Session = Depends(get_session)
 ):
-    result = await batch_upload_payroll(db, excel_file)
+    if streaming:
+        result = await stream_upload_payroll(db, excel_file, chunk_size, mode)
+    else:
+        result = await batch_upload_payroll(db, excel_file, mode)
     if not result["success"]:
         raise HTTPException(status_code=result.get("code", 400), detail=result["error"])
     
@@ -155,5 +278,9 @@ async def batch_upload_payroll_data(
     Add the Excel file field
     Under Key, type: excel_file (same name as in your function).
     Set the type to File using the dropdown.
-    Upload your .xlsx file in the Value column."""
+    Upload your .xlsx file in the Value column.
+    Add ?streaming=true for large .xlsx/.csv files: they are committed in chunks
+    and the response lists per-chunk progress and row errors.
+    ?mode=upsert overwrites rows that already exist for an employee and date,
+    ?mode=skip leaves them alone; the response counts inserted, updated and skipped rows."""
 
@@ -0,0 +1,116 @@
+from fastapi import APIRouter
+from typing import Optional
+from fastapi import Query, Depends, HTTPException, Header, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.session import get_async_session
+from app.schemas.payroll import PayrollResponse,PayrollCreate,PayrollUpdate
+from fastapi import status
+from app.services.payroll_service_async import (
+    get_all_payrolls,
+    generate_payroll,
+    update_payroll,
+    delete_payroll,
+    get_payroll_summary,
+    get_payroll_by_id,
+    payroll_etag,
+    payroll_list_etag,
+)
+from app.services.pagination import page_openapi, page_response
+from app.services.serialization import PreEncodedJSONResponse, json_response
+from app.services.versioning import not_modified_response, with_etag
+
+# The payroll CRUD routes on the async database stack. When DB_ASYNC is on they replace their
+# counterparts in payroll.router; exports, payslips and uploads stay on the sync stack.
+
+router = APIRouter()
+
+@router.get("/", response_model=None, response_class=PreEncodedJSONResponse, responses=page_openapi(PayrollResponse))
+async def read_users(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, description="Page size; without limit or cursor every row is returned"),
+    cursor: Optional[str] = Query(None),
+    employee_id: Optional[int] = Query(None),
+    start_date: Optional[str] = Query(None),
+    end_date: Optional[str] = Query(None),
+    project: Optional[str] = Query(None),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return, e.g. id,date,net_salary"),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_session)
+):
+    etag = await payroll_list_etag(db, request.url.query)
+    not_modified = not_modified_response(if_none_match, etag)
+    if not_modified:
+        return not_modified
+    page = await get_all_payrolls(db, limit, cursor, employee_id, start_date, end_date, project, fields)
+    return with_etag(page_response(page), etag)
+
+@router.post("/generate", response_model=PayrollResponse,status_code=status.HTTP_201_CREATED)
+async def create_payroll(
+    employee_id: int,
+    payroll_data: PayrollCreate,
+    db: AsyncSession = Depends(get_async_session)
+):
+    result = await generate_payroll(db, payroll_data, employee_id)
+    if not result["success"]:
+        raise HTTPException(status_code=result.get("code", 400), detail=result["error"])
+    return json_response(result["payroll"], status_code=status.HTTP_201_CREATED)
+
+@router.put("/update", response_model=PayrollResponse)
+async def update_payroll_data(
+    payroll_id: int,
+    payroll_data: PayrollUpdate,
+    db: AsyncSession = Depends(get_async_session)
+):
+    result = await update_payroll(db, payroll_id, payroll_data)
+    if not result["success"]:
+        raise HTTPException(status_code=result.get("code", 400), detail=result["error"])
+    return json_response(result["payroll"])
+
+@router.delete("/delete", response_model=dict)
+async def delete_payroll_data(
+    payroll_id: int,
+    db: AsyncSession = Depends(get_async_session)
+):
+    result = await delete_payroll(db, payroll_id)
+    if not result["success"]:
+        raise HTTPException(status_code=result.get("code", 400), detail=result["error"])
+    return result
+
+@router.get("/summary", response_model=dict)
+async def generate_payroll_summary(
+    employee_id: int,
+    start_date: Optional[str] = Query(None),
+    end_date: Optional[str] = Query(None),
+    totals_only: bool = Query(False),
+    db: AsyncSession = Depends(get_async_session)
+):
+    result = await get_payroll_summary(db, employee_id, start_date, end_date, totals_only)
+    if not result["success"]:
+        raise HTTPException(status_code=result.get("code", 400), detail=result["error"])
+
+    summary = {
+        "totals": result["totals"],
+        "row_count": result["row_count"],
+        "period_from": result["period_from"],
+        "period_to": result["period_to"],
+    }
+    if totals_only:
+        return summary
+    return {"payrolls": result["payrolls"], **summary}
+
+@router.get("/{payroll_id}", response_model=dict)
+async def read_payroll(
+    payroll_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_session)
+):
+    etag = await payroll_etag(db, payroll_id)
+    not_modified = not_modified_response(if_none_match, etag)
+    if not_modified:
+        return not_modified
+    result = await get_payroll_by_id(db, payroll_id)
+    if not result["success"]:
+        raise HTTPException(status_code=result.get("code", 400), detail=result["error"])
+    with_etag(response, etag)
+    return result
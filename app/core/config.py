@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -7,6 +8,48 @@ class Settings(BaseSettings):
     secret_key: str = "default-secret-key"
     environment: str = "development"
     reload: bool = True
+    db_echo: bool = False
+    db_async: bool = False
+    async_database_url: Optional[str] = None
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: int = 30
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    sql_profiler_enabled: bool = False  # per-request query counts, X-DB-* headers and N+1 warnings
+    sql_profile_slowest: int = 3
+    sql_repeated_query_threshold: int = 10
+    sql_slow_query_ms: Optional[float] = None  # log statements at least this slow; None turns the log off
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_cache_size: int = -64000  # negative = KiB, so 64 MB per connection
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+    sqlite_busy_timeout_ms: int = 5000
+    payslip_pdf_workers: int = 4
+    render_workers: int = 2
+    render_queue_max_depth: int = 8
+    payslip_template_autoreload: bool = True
+    payslip_cache_enabled: bool = True
+    payslip_cache_max_bytes: int = 64 * 1024 * 1024
+    payslip_cache_dir: Optional[str] = None
+    payslip_cache_disk_max_bytes: int = 512 * 1024 * 1024
+    employee_cache_enabled: bool = True
+    employee_cache_max_entries: int = 10000
+    employee_cache_ttl_seconds: float = 60.0  # how long another worker's edit can go unseen
+    metrics_enabled: bool = True
+    job_workers: int = 2
+    job_queue_max_depth: int = 100
+    job_result_ttl_seconds: int = 3600
+    upload_chunk_size: int = 5000
+    upload_max_reported_errors: int = 1000
+    default_page_size: int = 100  # used when a cursor is passed without a limit
+    max_page_size: int = 1000
+    export_batch_size: int = 2000
+    payroll_regular_hours: float = 10.0  # same threshold as the overtime check in PayrollCreate
+    payroll_overtime_multiplier: float = 1.25
+    payroll_night_diff_rate: float = 0.10  # premium on the hourly rate for night hours
+    payroll_night_start_hour: int = 22
+    payroll_night_end_hour: int = 6
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,187 @@
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, Tuple
+
+# Upper bounds in seconds; the last bucket (+Inf) catches everything slower.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+UNMATCHED_ROUTE = "other"
+
+
+class Histogram:
+    """
+    Fixed-bucket latency histogram: one bisect and three additions per observation.
+    """
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float):
+        self.counts[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+
+
+def _labels(**labels) -> str:
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Metrics:
+    """
+    Process-wide request and span metrics, rendered in the Prometheus text format by /metrics.
+    Each worker process keeps its own numbers; Prometheus sums them across scrape targets.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._requests: Dict[Tuple[str, str, int], int] = defaultdict(int)
+        self._request_latency: Dict[Tuple[str, str], Histogram] = defaultdict(Histogram)
+        self._span_latency: Dict[str, Histogram] = defaultdict(Histogram)
+        self._in_progress = 0
+
+    def request_started(self):
+        with self._lock:
+            self._in_progress += 1
+
+    def request_finished(self, method: str, route: str, status: int, seconds: float):
+        with self._lock:
+            self._in_progress -= 1
+            self._requests[(method, route, status)] += 1
+            self._request_latency[(method, route)].observe(seconds)
+
+    def observe_span(self, name: str, seconds: float):
+        with self._lock:
+            self._span_latency[name].observe(seconds)
+
+    def render(self) -> str:
+        with self._lock:
+            requests = sorted(self._requests.items())
+            request_latency = sorted((key, _copy(h)) for key, h in self._request_latency.items())
+            span_latency = sorted((key, _copy(h)) for key, h in self._span_latency.items())
+            in_progress = self._in_progress
+
+        lines = [
+            "# HELP http_requests_total Requests handled, by method, route template and status code.",
+            "# TYPE http_requests_total counter",
+        ]
+        for (method, route, status), count in requests:
+            lines.append(f"http_requests_total{{{_labels(method=method, route=route, status=status)}}} {count}")
+        lines += [
+            "# HELP http_requests_in_progress Requests currently being handled.",
+            "# TYPE http_requests_in_progress gauge",
+            f"http_requests_in_progress {in_progress}",
+            "# HELP http_request_duration_seconds Time from request start until the response body is sent.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for (method, route), histogram in request_latency:
+            lines += _histogram_lines("http_request_duration_seconds", _labels(method=method, route=route), histogram)
+        lines += [
+            "# HELP app_span_duration_seconds Time spent in instrumented stages (template render, PDF layout, ...).",
+            "# TYPE app_span_duration_seconds histogram",
+        ]
+        for name, histogram in span_latency:
+            lines += _histogram_lines("app_span_duration_seconds", _labels(span=name), histogram)
+        return "\n".join(lines) + "\n"
+
+
+def _copy(histogram: Histogram) -> Histogram:
+    copied = Histogram()
+    copied.counts, copied.total, copied.count = list(histogram.counts), histogram.total, histogram.count
+    return copied
+
+
+def _histogram_lines(name: str, labels: str, histogram: Histogram) -> list:
+    lines = []
+    cumulative = 0
+    for bound, count in zip(LATENCY_BUCKETS, histogram.counts):
+        cumulative += count
+        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+    lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+    lines.append(f"{name}_sum{{{labels}}} {histogram.total:.6f}")
+    lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+    return lines
+
+
+metrics = Metrics()
+
+
+class Span:
+    """
+    Time a block into app_span_duration_seconds{span=name}:
+
+        with Span("weasyprint_layout"):
+            pdf = document.write_pdf()
+
+    Spans inside worker processes (the bulk payslip pool) are recorded in that process only.
+    """
+    __slots__ = ("name", "started")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        metrics.observe_span(self.name, time.perf_counter() - self.started)
+        return False
+
+
+def timed_iter(name: str, iterable):
+    """
+    Yield from iterable, timing each step (the work a lazy reader does per item) as span name.
+    """
+    iterator = iter(iterable)
+    while True:
+        with Span(name):
+            item = next(iterator, _DONE)
+        if item is _DONE:
+            return
+        yield item
+
+
+_DONE = object()
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware (no BaseHTTPMiddleware task per request, streaming bodies untouched) that
+    counts requests by method, route template and status and records their latency. Requests that
+    match no API route, e.g. static files, are labelled route="other" to keep label sets bounded.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        started = time.perf_counter()
+        metrics.request_started()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            metrics.request_finished(
+                scope["method"],
+                getattr(route, "path", UNMATCHED_ROUTE),
+                status,
+                time.perf_counter() - started,
+            )
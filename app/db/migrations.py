@@ -0,0 +1,209 @@
+from datetime import datetime
+from sqlalchemy import inspect, text
+from sqlalchemy.schema import CreateTable
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+# Indexes that create_all only adds to brand-new tables; existing databases get them here.
+LOOKUP_INDEXES = (
+    ("ix_employee_status", "employee", "status"),
+    ("ix_employee_hire_date", "employee", "hire_date"),
+    ("ix_payroll_date_id", "payroll", "date, id"),
+    ("ix_payroll_project_date_id", "payroll", "project, date, id"),
+)
+
+EMPLOYEE_FTS_TABLE = "employee_fts"
+
+# Tables with a per-row version column and a table_version change counter
+VERSIONED_TABLES = ("employee", "payroll")
+
+# Peso amounts that migration 3 turns from floats into integer centavos (app.db.types.Money)
+MONEY_COLUMNS = {
+    "employee": ("salary",),
+    "payroll": ("deductions", "subtotal", "net_salary", "overtime_pay", "night_differential_pay", "allowance"),
+    "payroll_rollup": ("overtime_pay", "night_differential_pay", "deductions", "allowance", "gross_salary", "net_salary"),
+}
+
+
+def _create_lookup_indexes(conn: Connection):
+    for name, table, columns in LOOKUP_INDEXES:
+        conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})"))
+
+
+def _create_employee_name_search(conn: Connection):
+    """
+    SQLite: an external-content FTS5 table with the trigram tokenizer, kept in sync by triggers,
+    so substring name searches are index lookups. Postgres: pg_trgm GIN indexes, which ILIKE uses directly.
+    """
+    if conn.dialect.name == "sqlite":
+        conn.execute(text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {EMPLOYEE_FTS_TABLE} USING fts5("
+            "first_name, last_name, content='employee', content_rowid='id', tokenize='trigram')"
+        ))
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS employee_fts_ai AFTER INSERT ON employee BEGIN "
+            f"INSERT INTO {EMPLOYEE_FTS_TABLE}(rowid, first_name, last_name) "
+            "VALUES (new.id, new.first_name, new.last_name); END"
+        ))
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS employee_fts_ad AFTER DELETE ON employee BEGIN "
+            f"INSERT INTO {EMPLOYEE_FTS_TABLE}({EMPLOYEE_FTS_TABLE}, rowid, first_name, last_name) "
+            "VALUES ('delete', old.id, old.first_name, old.last_name); END"
+        ))
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS employee_fts_au AFTER UPDATE OF first_name, last_name ON employee BEGIN "
+            f"INSERT INTO {EMPLOYEE_FTS_TABLE}({EMPLOYEE_FTS_TABLE}, rowid, first_name, last_name) "
+            "VALUES ('delete', old.id, old.first_name, old.last_name); "
+            f"INSERT INTO {EMPLOYEE_FTS_TABLE}(rowid, first_name, last_name) "
+            "VALUES (new.id, new.first_name, new.last_name); END"
+        ))
+        conn.execute(text(f"INSERT INTO {EMPLOYEE_FTS_TABLE}({EMPLOYEE_FTS_TABLE}) VALUES ('rebuild')"))
+    elif conn.dialect.name == "postgresql":
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        for column in ("first_name", "last_name"):
+            conn.execute(text(
+                f"CREATE INDEX IF NOT EXISTS ix_employee_{column}_trgm ON employee USING gin ({column} gin_trgm_ops)"
+            ))
+
+
+def _rebuild_sqlite_table(conn: Connection, table, converted: dict):
+    """
+    SQLite cannot change a column's type in place: create the table afresh from the model under a
+    temporary name, copy the rows across (through the converted SQL expressions), drop the old
+    table and rename the new one into its place, then put its indexes back.
+    """
+    existing = {row.name for row in conn.execute(text(f"PRAGMA table_info({table.name})"))}
+    rebuilt = table.to_metadata(table.metadata, name=f"{table.name}__rebuild")
+    try:
+        conn.execute(CreateTable(rebuilt))
+        columns = [column.name for column in table.columns if column.name in existing]
+        conn.execute(text(
+            f"INSERT INTO {rebuilt.name} ({', '.join(columns)}) "
+            f"SELECT {', '.join(converted.get(name, name) for name in columns)} FROM {table.name}"
+        ))
+        conn.execute(text(f"DROP TABLE {table.name}"))
+        conn.execute(text(f"ALTER TABLE {rebuilt.name} RENAME TO {table.name}"))
+    finally:
+        table.metadata.remove(rebuilt)
+    for index in table.indexes:
+        index.create(conn, checkfirst=True)
+
+
+def _store_money_as_centavos(conn: Connection):
+    """
+    Money columns become BIGINT centavos: ROUND(amount * 100). Tables that create_all has just made
+    with the new column type are left alone.
+    """
+    from app.db.session import Base
+
+    for table_name, money_columns in MONEY_COLUMNS.items():
+        if conn.dialect.name == "sqlite":
+            types = {row.name: row.type.upper() for row in conn.execute(text(f"PRAGMA table_info({table_name})"))}
+            if all("INT" in types.get(column, "INT") for column in money_columns):
+                continue
+            converted = {column: f"CAST(ROUND({column} * 100) AS INTEGER)" for column in money_columns}
+            _rebuild_sqlite_table(conn, Base.metadata.tables[table_name], converted)
+        elif conn.dialect.name == "postgresql":
+            types = dict(conn.execute(
+                text("SELECT column_name, data_type FROM information_schema.columns WHERE table_name = :table"),
+                {"table": table_name},
+            ).all())
+            for column in money_columns:
+                if types.get(column, "bigint") != "bigint":
+                    conn.execute(text(
+                        f"ALTER TABLE {table_name} ALTER COLUMN {column} TYPE BIGINT "
+                        f"USING ROUND({column}::numeric * 100)::bigint"
+                    ))
+
+    if conn.dialect.name == "sqlite":
+        # the rebuilt tables lost their extra indexes and the name search triggers
+        _create_lookup_indexes(conn)
+        _create_employee_name_search(conn)
+
+
+def _add_row_versions(conn: Connection):
+    """
+    A version column on every row of the versioned tables, and their table_version counters
+    (create_all makes the table_version table itself).
+    """
+    for table_name in VERSIONED_TABLES:
+        if "version" not in {column["name"] for column in inspect(conn).get_columns(table_name)}:
+            conn.execute(text(f"ALTER TABLE {table_name} ADD COLUMN version INTEGER NOT NULL DEFAULT 1"))
+        conn.execute(
+            text(
+                "INSERT INTO table_version (table_name, version) SELECT :table_name, 0 "
+                "WHERE NOT EXISTS (SELECT 1 FROM table_version WHERE table_name = :table_name)"
+            ),
+            {"table_name": table_name},
+        )
+
+
+def _stop_sqlite_id_reuse(conn: Connection):
+    """
+    SQLite hands out the highest deleted id again unless the key is AUTOINCREMENT, and a reused id
+    with a fresh version 1 would repeat the deleted row's ETag. Rebuild the versioned tables with it;
+    ids of rows deleted before this migration above the current maximum can still come back once.
+    """
+    if conn.dialect.name != "sqlite":
+        return
+    from app.db.session import Base
+
+    rebuilt = False
+    for table_name in VERSIONED_TABLES:
+        sql = conn.execute(
+            text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": table_name}
+        ).scalar()
+        if sql and "AUTOINCREMENT" not in sql.upper():
+            _rebuild_sqlite_table(conn, Base.metadata.tables[table_name], {})
+            rebuilt = True
+    if rebuilt:
+        _create_lookup_indexes(conn)
+        _create_employee_name_search(conn)
+
+
+def _fill_payroll_rollups(conn: Connection):
+    """
+    Rollups for the payroll rows written before the rollup table was kept up to date.
+    """
+    from app.services.rollup_service import rebuild_payroll_rollups
+
+    # the session joins this migration's transaction; its commit leaves the outcome to run_migrations
+    session = Session(bind=conn)
+    try:
+        rebuild_payroll_rollups(session)
+    finally:
+        session.close()
+
+
+# (version, description, migrate); append only, never renumber
+MIGRATIONS = (
+    (1, "Lookup indexes on employee status/hire_date and payroll (date, id)/(project, date, id)", _create_lookup_indexes),
+    (2, "Employee name search index", _create_employee_name_search),
+    (3, "Money columns stored as integer centavos", _store_money_as_centavos),
+    (4, "Row versions and table change counters for ETags", _add_row_versions),
+    (5, "Payroll rollups for existing payroll rows", _fill_payroll_rollups),
+    (6, "AUTOINCREMENT keys on the versioned tables (SQLite)", _stop_sqlite_id_reuse),
+)
+
+
+def run_migrations(engine: Engine):
+    """
+    Apply every migration not yet recorded in schema_migrations, each in its own transaction.
+    """
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ("
+            "version INTEGER PRIMARY KEY, description VARCHAR(200) NOT NULL, applied_at TIMESTAMP NOT NULL)"
+        ))
+        applied = set(conn.execute(text("SELECT version FROM schema_migrations")).scalars())
+
+    for version, description, migrate in MIGRATIONS:
+        if version in applied:
+            continue
+        with engine.begin() as conn:
+            migrate(conn)
+            conn.execute(
+                text("INSERT INTO schema_migrations (version, description, applied_at) VALUES (:version, :description, :applied_at)"),
+                {"version": version, "description": description, "applied_at": datetime.now()},
+            )
+        print(f"Applied migration {version}: {description}")
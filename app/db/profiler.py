@@ -0,0 +1,127 @@
+import heapq
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import List, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.core.config import settings
+
+# Placeholder lists from expanded IN clauses, e.g. "IN (?, ?, ?)", collapse to one shape
+PLACEHOLDER_LIST = re.compile(r"\(\s*(?:\?|%\(\w+\)s|%s|\$\d+|:\w+)(?:\s*,\s*(?:\?|%\(\w+\)s|%s|\$\d+|:\w+))*\s*\)")
+WHITESPACE = re.compile(r"\s+")
+STATEMENT_PREVIEW = 300
+
+
+def statement_shape(statement: str) -> str:
+    """
+    A statement with whitespace normalized and IN lists collapsed, so the same query with different
+    parameters (or a different number of them) counts as one shape.
+    """
+    return PLACEHOLDER_LIST.sub("(?)", WHITESPACE.sub(" ", statement).strip())
+
+
+class RequestProfile:
+    """
+    The queries one request has run: count, total time, the slowest few and how often each
+    statement shape ran.
+    """
+    def __init__(self, keep_slowest: int):
+        self.keep_slowest = keep_slowest
+        self.count = 0
+        self.total_time = 0.0
+        self.slowest: List[Tuple[float, int, str]] = []
+        self.shapes = Counter()
+
+    def record(self, statement: str, elapsed: float):
+        self.count += 1
+        self.total_time += elapsed
+        self.shapes[statement_shape(statement)] += 1
+        entry = (elapsed, self.count, statement)
+        if len(self.slowest) < self.keep_slowest:
+            heapq.heappush(self.slowest, entry)
+        elif elapsed > self.slowest[0][0]:
+            heapq.heapreplace(self.slowest, entry)
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        return [(shape, count) for shape, count in self.shapes.most_common() if count > threshold]
+
+
+current_profile: ContextVar[Optional[RequestProfile]] = ContextVar("current_profile", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    profile = current_profile.get()
+    if profile is not None:
+        profile.record(statement, elapsed)
+    slow_ms = settings.sql_slow_query_ms
+    if slow_ms is not None and elapsed * 1000 >= slow_ms:
+        print(f"Slow query ({elapsed * 1000:.1f} ms): {WHITESPACE.sub(' ', statement)[:STATEMENT_PREVIEW]}")
+
+
+def _handle_error(exception_context):
+    # a failed statement never reaches after_cursor_execute; drop its start time
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_started"):
+        connection.info["query_started"].pop()
+
+
+def install_query_profiler(engine: Engine):
+    """
+    Time every statement on engine (for an AsyncEngine, pass its sync_engine) into the current
+    request's profile and the slow-query log.
+    """
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+class QueryProfilerMiddleware:
+    """
+    Profile the queries of each request. The query count and DB time so far go out as
+    X-DB-Query-Count / X-DB-Time-Ms headers (a streamed body's later queries are not in them);
+    once the response is finished a log line has the totals and the slowest statements, and a
+    warning names any statement shape that ran more than sql_repeated_query_threshold times.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(settings.sql_profile_slowest)
+        token = current_profile.set(profile)
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-db-query-count", str(profile.count).encode()),
+                    (b"x-db-time-ms", f"{profile.total_time * 1000:.1f}".encode()),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            current_profile.reset(token)
+            _log_profile(f"{scope['method']} {scope['path']}", profile)
+
+
+def _log_profile(request: str, profile: RequestProfile):
+    if not profile.count:
+        return
+    slowest = "; ".join(
+        f"{elapsed * 1000:.1f} ms {WHITESPACE.sub(' ', statement)[:120]}"
+        for elapsed, _, statement in sorted(profile.slowest, reverse=True)
+    )
+    print(f"[sql] {request}: {profile.count} queries in {profile.total_time * 1000:.1f} ms; slowest: {slowest}")
+    for shape, count in profile.repeated(settings.sql_repeated_query_threshold):
+        print(f"[sql] possible N+1 in {request}: {count} x {shape[:STATEMENT_PREVIEW]}")
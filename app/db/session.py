@@ -1,23 +1,105 @@
 from sqlmodel import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session, sessionmaker
 from contextlib import contextmanager
 from sqlalchemy.ext.declarative import declarative_base
 from app.core.config import settings
+from app.core.metrics import Span
+from app.db.migrations import run_migrations
+from app.db.profiler import install_query_profiler
 
 DATABASE_URL = settings.database_url
 
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {},
-    echo=True  # turn this off in production
-)
 
-SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+def engine_options(database_url: str) -> dict:
+    """
+    create_engine keyword arguments from Settings. In-memory SQLite keeps SQLAlchemy's
+    single-connection pool, which takes no sizing options.
+    """
+    url = make_url(database_url)
+    options = {"echo": settings.db_echo, "pool_pre_ping": settings.db_pool_pre_ping}
+    if url.get_backend_name() == "sqlite":
+        options["connect_args"] = {"check_same_thread": False, "timeout": settings.sqlite_busy_timeout_ms / 1000}
+        if url.database in (None, "", ":memory:"):
+            return options
+    options.update(
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+    )
+    return options
+
+
+engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL))
+
+def apply_sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    WAL lets readers run alongside the single writer; busy_timeout makes a second writer
+    wait for the lock instead of failing with "database is locked".
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={settings.sqlite_journal_mode}")
+    cursor.execute(f"PRAGMA synchronous={settings.sqlite_synchronous}")
+    cursor.execute(f"PRAGMA cache_size={int(settings.sqlite_cache_size)}")
+    cursor.execute(f"PRAGMA mmap_size={int(settings.sqlite_mmap_size)}")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}")
+    cursor.close()
+
+if engine.dialect.name == "sqlite":
+    event.listen(engine, "connect", apply_sqlite_pragmas)
+
+PROFILE_QUERIES = settings.sql_profiler_enabled or settings.sql_slow_query_ms is not None
+if PROFILE_QUERIES:
+    install_query_profiler(engine)
+
+class InstrumentedSession(Session):
+    """
+    A Session whose commits (including the flush they trigger) show up as the db_commit span.
+    """
+    def commit(self):
+        with Span("db_commit"):
+            super().commit()
+
+SessionLocal = sessionmaker(bind=engine, class_=InstrumentedSession, autocommit=False, autoflush=False)
+
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+def async_database_url(database_url: str) -> str:
+    """
+    The async driver URL for a sync one, e.g. sqlite:///./db.sqlite3 -> sqlite+aiosqlite:///./db.sqlite3.
+    """
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend}; set ASYNC_DATABASE_URL.")
+    return url.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+# Only built when DB_ASYNC is on, so sync deployments need neither aiosqlite nor asyncpg.
+async_engine = None
+AsyncSessionLocal = None
+if settings.db_async:
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+    ASYNC_DATABASE_URL = settings.async_database_url or async_database_url(DATABASE_URL)
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL))
+    if async_engine.dialect.name == "sqlite":
+        event.listen(async_engine.sync_engine, "connect", apply_sqlite_pragmas)
+    if PROFILE_QUERIES:
+        install_query_profiler(async_engine.sync_engine)
+    # expire_on_commit=False: attributes cannot lazy-load after commit without an await
+    AsyncSessionLocal = async_sessionmaker(
+        bind=async_engine, sync_session_class=InstrumentedSession, autoflush=False, expire_on_commit=False
+    )
 
 Base = declarative_base()
 
 def create_db_and_tables():
+    # register every model on Base before create_all; the migrations expect the tables to exist
+    from app.models import employee, payroll, payroll_rollup, table_version  # noqa: F401
     Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
 
 def get_session():
     session = SessionLocal()
@@ -25,3 +107,7 @@ def get_session():
         yield session
     finally:
         session.close()
+
+async def get_async_session():
+    async with AsyncSessionLocal() as session:
+        yield session
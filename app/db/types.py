@@ -0,0 +1,56 @@
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Optional
+from sqlalchemy import BigInteger, column, table, type_coerce
+from sqlalchemy.types import TypeDecorator
+
+CENTAVO = Decimal("0.01")
+
+
+def to_centavos(value) -> Optional[int]:
+    """
+    An amount in pesos (Decimal, float, int or numeric string) as whole centavos, rounded half-up.
+    """
+    if value is None:
+        return None
+    if not isinstance(value, Decimal):
+        value = Decimal(str(value))
+    return int(value.quantize(CENTAVO, rounding=ROUND_HALF_UP).scaleb(2))
+
+
+def from_centavos(value) -> Optional[Decimal]:
+    if value is None:
+        return None
+    return Decimal(int(value)).scaleb(-2)
+
+
+class Money(TypeDecorator):
+    """
+    A peso amount stored as an integer number of centavos and exposed as a two-place Decimal,
+    so SUMs run on integers and come back exact.
+    """
+    impl = BigInteger
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return to_centavos(value)
+
+    def process_result_value(self, value, dialect):
+        return from_centavos(value)
+
+
+def centavos(expression):
+    """
+    A Money column (or expression) read as its raw integer centavos, for bulk loads into NumPy
+    that should skip the per-value Decimal conversion.
+    """
+    return type_coerce(expression, BigInteger)
+
+
+def centavo_table(model_table):
+    """
+    A lightweight stand-in for model_table whose Money columns are plain BIGINT, for bulk INSERTs
+    and UPDATEs that already hold integer centavos (NumPy/pandas results).
+    """
+    return table(model_table.name, *(
+        column(c.name, BigInteger if isinstance(c.type, Money) else c.type) for c in model_table.columns
+    ))
@@ -1,14 +1,24 @@
 from fastapi import FastAPI
 from app.api.v1 import api_router
 from .db.session import create_db_and_tables
+from .services.payroll_service import shutdown_payslip_process_pool
+from .services.job_service import job_queue
+from .services.render_executor import render_executor
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
+from .core.config import settings
+from .core.metrics import MetricsMiddleware, metrics
+from .db.profiler import QueryProfilerMiddleware
 
 def lifespan(app: FastAPI):
     create_db_and_tables()
     print("Database and tables created.")
     yield
+    job_queue.shutdown()
+    render_executor.shutdown()
+    shutdown_payslip_process_pool()
 
 app = FastAPI(title="My FastAPI App", lifespan=lifespan)
 
@@ -24,4 +34,16 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
+
+if settings.sql_profiler_enabled:
+    app.add_middleware(QueryProfilerMiddleware)
+
+if settings.metrics_enabled:
+    # added last so it is outermost and its timing includes CORS handling
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/metrics", include_in_schema=False)
+    def read_metrics():
+        return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
@@ -1,4 +1,5 @@
 from app.db.session import Base
+from app.db.types import Money
 from sqlalchemy import Column, Integer, String, Float, DateTime, Date, ForeignKey
 
 class Employee(Base):
@@ -8,10 +9,15 @@ class Employee(Base):
     first_name = Column(String(100), nullable=False)
     last_name = Column(String(100), nullable=False)
     email = Column(String(100), unique=True, nullable=False)
-    hire_date = Column(Date, nullable=False)
+    hire_date = Column(Date, nullable=False, index=True)
     position = Column(String(100), nullable=False)
-    salary = Column(Float, nullable=False)
-    status = Column(String(8), nullable=False, default="Active") 
+    salary = Column(Money, nullable=False)
+    status = Column(String(8), nullable=False, default="Active", index=True)
+    # bumped by every write; the detail endpoint's ETag
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+
+    # never hand a deleted row's id to a new one, or its (id, version) ETag could match the old row's
+    __table_args__ = {"sqlite_autoincrement": True}
 
     def __repr__(self):
         return f"<Employee(id={self.id}, first_name={self.first_name}, last_name={self.last_name})>"
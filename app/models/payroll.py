@@ -1,5 +1,6 @@
 from app.db.session import Base
-from sqlalchemy import Column, Integer, String, Float, DateTime, Date, ForeignKey, UniqueConstraint
+from app.db.types import Money
+from sqlalchemy import Column, Integer, String, Float, DateTime, Date, ForeignKey, UniqueConstraint, Index
 
 class Payroll(Base):
     __tablename__ = "payroll"
@@ -9,19 +10,26 @@ class Payroll(Base):
     time_in = Column(DateTime, nullable=False)
     time_out = Column(DateTime, nullable=False)
     total_hours_worked = Column(Float, nullable=False)
-    deductions = Column(Float, nullable=False)
-    subtotal = Column(Float, nullable=False)
-    net_salary = Column(Float, nullable=False)
+    deductions = Column(Money, nullable=False)
+    subtotal = Column(Money, nullable=False)
+    net_salary = Column(Money, nullable=False)
     deduction_remarks = Column(String, nullable=True)
     project = Column(String, nullable=True)
-    overtime_pay = Column(Float, nullable=True)
+    overtime_pay = Column(Money, nullable=True)
     overtime_hour = Column(Float, nullable=True)
-    night_differential_pay = Column(Float, nullable=True)
+    night_differential_pay = Column(Money, nullable=True)
     night_differential_hour = Column(Float, nullable=True)
-    allowance = Column(Float, nullable=True)
+    allowance = Column(Money, nullable=True)
     date = Column(Date, nullable=False)
     created_at = Column(DateTime, nullable=False)
+    # bumped by every write; the detail endpoint's ETag
+    version = Column(Integer, nullable=False, default=1, server_default="1")
 
     __table_args__ = (
         UniqueConstraint('employee_id', 'date', name='unique_employee_date'),
+        # keyset order of the payroll list and export, unfiltered and by project
+        Index('ix_payroll_date_id', 'date', 'id'),
+        Index('ix_payroll_project_date_id', 'project', 'date', 'id'),
+        # never hand a deleted row's id to a new one, or its (id, version) ETag could match the old row's
+        {"sqlite_autoincrement": True},
     )
\ No newline at end of file
@@ -0,0 +1,27 @@
+from app.db.session import Base
+from app.db.types import Money
+from sqlalchemy import Column, Integer, String, Float, Date, ForeignKey, UniqueConstraint
+
+class PayrollRollup(Base):
+    """
+    Per-employee payroll totals for one day, week (starting Monday) or month.
+    Kept in step with Payroll by app.services.rollup_service.
+    """
+    __tablename__ = "payroll_rollup"
+
+    id = Column(Integer, primary_key=True, index=True)
+    employee_id = Column(Integer, ForeignKey("employee.id"), nullable=False)
+    period_type = Column(String(5), nullable=False)
+    period_start = Column(Date, nullable=False)
+    row_count = Column(Integer, nullable=False, default=0)
+    total_hours_worked = Column(Float, nullable=False, default=0)
+    overtime_pay = Column(Money, nullable=False, default=0)
+    night_differential_pay = Column(Money, nullable=False, default=0)
+    deductions = Column(Money, nullable=False, default=0)
+    allowance = Column(Money, nullable=False, default=0)
+    gross_salary = Column(Money, nullable=False, default=0)
+    net_salary = Column(Money, nullable=False, default=0)
+
+    __table_args__ = (
+        UniqueConstraint('employee_id', 'period_type', 'period_start', name='unique_employee_period'),
+    )
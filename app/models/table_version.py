@@ -0,0 +1,12 @@
+from app.db.session import Base
+from sqlalchemy import Column, Integer, String
+
+class TableVersion(Base):
+    """
+    A change counter per table, bumped in the same transaction as every write to that table.
+    List endpoints build their ETags from it; see app.services.versioning.
+    """
+    __tablename__ = "table_version"
+
+    table_name = Column(String(50), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
@@ -1,7 +1,7 @@
 from pydantic import BaseModel, ValidationError, model_validator
-from typing import Optional
+from typing import Dict, Optional
 from decimal import Decimal
-from datetime import datetime
+from datetime import date, datetime
 
 class PayrollSchema(BaseModel):
     id: Optional[int] = None
@@ -137,4 +137,28 @@ class PayrollResponse(PayrollSchema):
     deduction_remarks: Optional[str] = None
     project: Optional[str] = None
     date: Optional[datetime] = None
-    created_at: Optional[datetime] = None
\ No newline at end of file
+    created_at: Optional[datetime] = None
+
+class RateOverride(BaseModel):
+    daily_rate: Optional[Decimal] = None
+    daily_rate_multiplier: Optional[Decimal] = None
+    overtime_multiplier: Optional[Decimal] = None
+    night_diff_rate: Optional[Decimal] = None
+
+class PayrollSimulation(BaseModel):
+    """
+    A what-if payroll run: the most specific override (employee, then position, then global)
+    wins per field; fields nobody overrides keep the employee's rate and the configured rules.
+    """
+    start_date: date
+    end_date: date
+    global_override: Optional[RateOverride] = None
+    positions: Dict[str, RateOverride] = {}
+    employees: Dict[int, RateOverride] = {}
+    include_employees: bool = False
+
+    @model_validator(mode="after")
+    def validate_period(cls, values):
+        if values.start_date > values.end_date:
+            raise ValueError("Start date must not be after end date.")
+        return values
@@ -0,0 +1,79 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+from sqlalchemy.engine import Row
+from app.core.config import settings
+
+
+class EmployeeCache:
+    """
+    Process-local TTL + LRU cache of employee rows for the payroll paths, which look the employee
+    up on every call while employees themselves rarely change. Entries are Core rows: immutable and
+    detached from any session. Edits made through employee_service invalidate at once; the TTL
+    bounds how long an edit made by another worker process can go unseen.
+    """
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._invalidations = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, employee_id: int) -> Optional[Row]:
+        with self._lock:
+            entry = self._entries.get(employee_id)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(employee_id)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[employee_id]
+            self.misses += 1
+            return None
+
+    def token(self) -> int:
+        """
+        Take before reading an employee from the database and pass to put, so a row read before a
+        concurrent invalidation is not cached after it.
+        """
+        with self._lock:
+            return self._invalidations
+
+    def put(self, employee_id: int, employee: Row, token: int):
+        with self._lock:
+            if token != self._invalidations:
+                return
+            self._entries[employee_id] = (time.monotonic() + self.ttl_seconds, employee)
+            self._entries.move_to_end(employee_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, employee_id: int):
+        with self._lock:
+            self._invalidations += 1
+            self._entries.pop(employee_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._invalidations += 1
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": settings.employee_cache_enabled,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+employee_cache = EmployeeCache(
+    max_entries=settings.employee_cache_max_entries,
+    ttl_seconds=settings.employee_cache_ttl_seconds,
+)
@@ -3,64 +3,136 @@ from app.models.employee import Employee
 from app.schemas.employee import EmployeeResponse,EmployeeCreate,EmployeeUpdate
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.inspection import inspect
-
-def get_all_employees(db: Session) -> List[EmployeeResponse]:
-    employees = db.query(Employee).all()
-    return [
-        EmployeeResponse(**{c.key: getattr(employee, c.key) for c in inspect(Employee).mapper.column_attrs})
-        for employee in employees
-    ]
-
-def get_filtered_employees(
+from sqlalchemy import select, table, column, literal_column
+from app.db.migrations import EMPLOYEE_FTS_TABLE
+from app.services.pagination import page_limit, encode_cursor, decode_cursor, parse_fields, projection_model
+from app.services.employee_cache import employee_cache
+from app.services.payslip_cache import payslip_cache
+from app.services.serialization import to_response, to_responses
+from app.services.versioning import bump_table_version, table_version_query, row_version_query, row_etag, list_etag
+
+def employee_page_query(
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    fields: Optional[str] = None,
+):
+    """
+    The keyset query behind get_all_employees, shared with the async service.
+    Returns (query, selected fields, page limit); the query reads one extra row to detect a next page.
+    Without a limit (no limit or cursor passed) it reads every matching row.
+    """
+    limit = page_limit(limit, cursor)
+    columns = Employee.__table__.c
+    selected = parse_fields(fields, EmployeeResponse, columns.keys())
+    select_names = list(dict.fromkeys((selected or list(columns.keys())) + ["id"]))
+
+    query = select(*[columns[name] for name in select_names])
+    if status:
+        query = query.where(Employee.status == status)
+    if cursor:
+        (after_id,) = decode_cursor(cursor, int)
+        query = query.where(Employee.id > after_id)
+    query = query.order_by(Employee.id)
+    if limit is not None:
+        query = query.limit(limit + 1)
+    return query, selected, limit
+
+def employee_page(rows, selected: Optional[List[str]], limit: Optional[int]) -> dict:
+    if limit is None:
+        limit = len(rows)
+    next_cursor = encode_cursor(rows[limit - 1].id) if len(rows) > limit else None
+    schema = projection_model(EmployeeResponse, tuple(selected)) if selected else EmployeeResponse
+    return {"items": to_responses(schema, rows[:limit]), "next_cursor": next_cursor}
+
+def get_all_employees(
+    db: Session,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    fields: Optional[str] = None,
+) -> dict:
+    """
+    One keyset page of employees ordered by id.
+    Returns {"items": [...], "next_cursor": str | None}; pass next_cursor back to get the following page.
+    """
+    query, selected, limit = employee_page_query(limit, cursor, status, fields)
+    return employee_page(db.execute(query).all(), selected, limit)
+
+# The trigram tokenizer only indexes substrings of 3+ characters
+FTS_MIN_SEARCH_LENGTH = 3
+employee_fts = table(EMPLOYEE_FTS_TABLE, column("rowid"))
+
+def employee_name_condition(db: Session, search: str):
+    """
+    Case-insensitive substring match on first or last name. On SQLite this goes through the
+    employee_fts trigram index; elsewhere ILIKE, which Postgres serves from the pg_trgm indexes.
+    """
+    if db.get_bind().dialect.name == "sqlite" and len(search) >= FTS_MIN_SEARCH_LENGTH:
+        phrase = '"' + search.replace('"', '""') + '"'
+        matches = select(employee_fts.c.rowid).where(literal_column(EMPLOYEE_FTS_TABLE).op("MATCH")(phrase))
+        return Employee.id.in_(matches)
+    return Employee.first_name.ilike(f"%{search}%") | Employee.last_name.ilike(f"%{search}%")
+
+def filtered_employees_query(
     db: Session,
     search: Optional[str] = None,
     hire_date_from: Optional[str] = None,
     hire_date_to: Optional[str] = None,
     status: Optional[str] = None,
-) -> List[EmployeeResponse]:
-    
-    query = db.query(Employee)
+):
+    query = select(*Employee.__table__.c)
 
     if search:
-        query = query.filter(
-            Employee.first_name.ilike(f"%{search}%") |
-            Employee.last_name.ilike(f"%{search}%")
-        )
+        query = query.where(employee_name_condition(db, search))
 
     if hire_date_from:
-        query = query.filter(Employee.hire_date >= hire_date_from)
+        query = query.where(Employee.hire_date >= hire_date_from)
 
     if hire_date_to:
-        query = query.filter(Employee.hire_date <= hire_date_to)
+        query = query.where(Employee.hire_date <= hire_date_to)
 
     if status:
-        query = query.filter(Employee.status == status)
+        query = query.where(Employee.status == status)
 
-    employees = query.all()
-    if not employees:
-        return []
-    
-    return [
-        EmployeeResponse(**{c.key: getattr(employee, c.key) for c in inspect(Employee).mapper.column_attrs})
-        for employee in employees
-    ]
+    return query
+
+def get_filtered_employees(
+    db: Session,
+    search: Optional[str] = None,
+    hire_date_from: Optional[str] = None,
+    hire_date_to: Optional[str] = None,
+    status: Optional[str] = None,
+) -> List[EmployeeResponse]:
+    query = filtered_employees_query(db, search, hire_date_from, hire_date_to, status)
+    return to_responses(EmployeeResponse, db.execute(query).all())
+
+def employee_by_id_query(employee_id: int):
+    return select(*Employee.__table__.c).where(Employee.id == employee_id)
+
+def employee_etag(db: Session, employee_id: int) -> Optional[str]:
+    return row_etag("employee", employee_id, db.execute(row_version_query(Employee, employee_id)).scalar())
+
+def employee_list_etag(db: Session, query_string: str) -> Optional[str]:
+    return list_etag("employee", db.execute(table_version_query("employee")).scalar(), query_string)
 
 def get_employee_by_id(db: Session, employee_id: int) -> EmployeeResponse:
-    employee = db.query(Employee).filter(Employee.id == employee_id).first()
+    employee = db.execute(employee_by_id_query(employee_id)).first()
     if not employee:
         return None
-    return EmployeeResponse(**{c.key: getattr(employee, c.key) for c in inspect(Employee).mapper.column_attrs})
+    return to_response(EmployeeResponse, employee)
 
 
 def create_employee(db: Session, employee_data: EmployeeCreate) -> dict:
     try:
         new_employee = Employee(**employee_data.model_dump())
         db.add(new_employee)
+        db.flush()
+        db.execute(bump_table_version("employee"))
         db.commit()
         db.refresh(new_employee)
         # Convert the SQLAlchemy model to a Pydantic model
-        employee_response = EmployeeCreate(**{c.key: getattr(new_employee, c.key) for c in inspect(Employee).mapper.column_attrs})
+        employee_response = to_response(EmployeeCreate, new_employee)
         return {
             "success": True,
             "employee": employee_response,
@@ -81,10 +153,14 @@ def update_employee(db: Session, employee_id: int, employee_data: EmployeeUpdate
         update_data = employee_data.model_dump(exclude={"id"})
         for key, value in update_data.items():
             setattr(employee, key, value)
-
+        employee.version = Employee.version + 1
+        db.flush()
+        db.execute(bump_table_version("employee"))
         db.commit()
         db.refresh(employee)
-        employee_response = EmployeeResponse(**{c.key: getattr(employee, c.key) for c in inspect(Employee).mapper.column_attrs})
+        employee_cache.invalidate(employee_id)
+        payslip_cache.invalidate_employee(employee_id)
+        employee_response = to_response(EmployeeResponse, employee)
         return {"success": True, "employee": employee_response, "message": "Employee updated successfully"}
     except IntegrityError:
         db.rollback()
@@ -107,9 +183,12 @@ def update_employee_status(db: Session,employee_id: int,status: str) -> dict:
             employee.status = status
         else:
             employee.status = "Inactive" if employee.status == "Active" else "Active"
-
+        employee.version = Employee.version + 1
+        db.flush()
+        db.execute(bump_table_version("employee"))
         db.commit()
         db.refresh(employee)
+        employee_cache.invalidate(employee_id)
 
         return {"success": True, "employee": employee}
     except Exception as e:
@@ -123,7 +202,11 @@ def delete_employee(db: Session, employee_id: int) -> dict:
         return {"success": False, "error": "Employee not found", "code": 404}
     try:
         db.delete(employee)
+        db.flush()
+        db.execute(bump_table_version("employee"))
         db.commit()
+        employee_cache.invalidate(employee_id)
+        payslip_cache.invalidate_employee(employee_id)
         return {"success": True, "message": "Employee deleted successfully"}
     except Exception as e:
         db.rollback()
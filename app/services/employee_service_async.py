@@ -0,0 +1,139 @@
+from typing import List, Optional
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.employee import Employee
+from app.schemas.employee import EmployeeResponse, EmployeeCreate, EmployeeUpdate
+from app.services.employee_service import (
+    employee_page_query,
+    employee_page,
+    filtered_employees_query,
+    employee_by_id_query,
+)
+from app.services.employee_cache import employee_cache
+from app.services.payslip_cache import payslip_cache
+from app.services.serialization import to_response, to_responses
+from app.services.versioning import bump_table_version, table_version_query, row_version_query, row_etag, list_etag
+
+# AsyncSession versions of employee_service, used when DB_ASYNC is on. Queries come from the
+# sync module's builders, so both stacks return identical results.
+
+async def get_all_employees(
+    db: AsyncSession,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    fields: Optional[str] = None,
+) -> dict:
+    query, selected, limit = employee_page_query(limit, cursor, status, fields)
+    rows = (await db.execute(query)).all()
+    return employee_page(rows, selected, limit)
+
+async def get_filtered_employees(
+    db: AsyncSession,
+    search: Optional[str] = None,
+    hire_date_from: Optional[str] = None,
+    hire_date_to: Optional[str] = None,
+    status: Optional[str] = None,
+) -> List[EmployeeResponse]:
+    query = filtered_employees_query(db, search, hire_date_from, hire_date_to, status)
+    return to_responses(EmployeeResponse, (await db.execute(query)).all())
+
+async def get_employee_by_id(db: AsyncSession, employee_id: int) -> Optional[EmployeeResponse]:
+    employee = (await db.execute(employee_by_id_query(employee_id))).first()
+    if not employee:
+        return None
+    return to_response(EmployeeResponse, employee)
+
+async def employee_etag(db: AsyncSession, employee_id: int) -> Optional[str]:
+    return row_etag("employee", employee_id, (await db.execute(row_version_query(Employee, employee_id))).scalar())
+
+async def employee_list_etag(db: AsyncSession, query_string: str) -> Optional[str]:
+    return list_etag("employee", (await db.execute(table_version_query("employee"))).scalar(), query_string)
+
+async def _get_employee(db: AsyncSession, employee_id: int) -> Optional[Employee]:
+    return (await db.execute(select(Employee).where(Employee.id == employee_id))).scalar_one_or_none()
+
+async def create_employee(db: AsyncSession, employee_data: EmployeeCreate) -> dict:
+    try:
+        new_employee = Employee(**employee_data.model_dump())
+        db.add(new_employee)
+        await db.flush()
+        await db.execute(bump_table_version("employee"))
+        await db.commit()
+        await db.refresh(new_employee)
+        return {
+            "success": True,
+            "employee": to_response(EmployeeCreate, new_employee),
+            "message": "Employee created successfully"
+        }
+    except IntegrityError:
+        await db.rollback()
+        return {"success": False, "error": "Email address already exists!"}
+    except Exception as e:
+        await db.rollback()
+        return {"success": False, "error": f"An error occurred: {str(e)}"}
+
+async def update_employee(db: AsyncSession, employee_id: int, employee_data: EmployeeUpdate) -> dict:
+    employee = await _get_employee(db, employee_id)
+    if not employee:
+        return {"success": False, "error": "Employee not found", "code": 404}
+    try:
+        for key, value in employee_data.model_dump(exclude={"id"}).items():
+            setattr(employee, key, value)
+        employee.version = Employee.version + 1
+        await db.flush()
+        await db.execute(bump_table_version("employee"))
+        await db.commit()
+        await db.refresh(employee)
+        employee_cache.invalidate(employee_id)
+        payslip_cache.invalidate_employee(employee_id)
+        return {"success": True, "employee": to_response(EmployeeResponse, employee), "message": "Employee updated successfully"}
+    except IntegrityError:
+        await db.rollback()
+        return {"success": False, "error": "Email address already exists!", "code": 400}
+    except Exception as e:
+        await db.rollback()
+        return {"success": False, "error": f"An error occurred: {str(e)}", "code": 500}
+
+async def update_employee_status(db: AsyncSession, employee_id: int, status: str) -> dict:
+    VALID_STATUSES = ["Active", "Inactive"]
+    employee = await _get_employee(db, employee_id)
+    if not employee:
+        return {"success": False, "error": "Employee not found", "code": 404}
+
+    if status and status not in VALID_STATUSES:
+        return {"success": False, "error": f"Invalid status value: {status}. Allowed values are {VALID_STATUSES}", "code": 400}
+
+    try:
+        if status:
+            employee.status = status
+        else:
+            employee.status = "Inactive" if employee.status == "Active" else "Active"
+        employee.version = Employee.version + 1
+        await db.flush()
+        await db.execute(bump_table_version("employee"))
+        await db.commit()
+        await db.refresh(employee)
+        employee_cache.invalidate(employee_id)
+        return {"success": True, "employee": to_response(EmployeeResponse, employee)}
+    except Exception as e:
+        await db.rollback()
+        print(f"Error updating employee status: {str(e)}")
+        return {"success": False, "error": f"An error occurred: {str(e)}", "code": 500}
+
+async def delete_employee(db: AsyncSession, employee_id: int) -> dict:
+    employee = await _get_employee(db, employee_id)
+    if not employee:
+        return {"success": False, "error": "Employee not found", "code": 404}
+    try:
+        await db.delete(employee)
+        await db.flush()
+        await db.execute(bump_table_version("employee"))
+        await db.commit()
+        employee_cache.invalidate(employee_id)
+        payslip_cache.invalidate_employee(employee_id)
+        return {"success": True, "message": "Employee deleted successfully"}
+    except Exception as e:
+        await db.rollback()
+        return {"success": False, "error": f"An error occurred: {str(e)}", "code": 500}
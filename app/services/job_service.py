@@ -0,0 +1,184 @@
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, List, Optional, Union
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.services.payslip_cache import CachedPayslip, SpooledArtifact
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+# how often finished jobs past their TTL are dropped, at most
+JOB_SWEEP_INTERVAL_SECONDS = 60
+
+
+class JobQueueFull(Exception):
+    pass
+
+
+class RenderJob:
+    def __init__(self, kind: str, params: dict, render: Callable[[Session], Union[CachedPayslip, SpooledArtifact]]):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.params = params
+        self.render = render
+        self.status = JOB_QUEUED
+        self.error = None
+        self.error_code = None
+        self.result: Optional[Union[CachedPayslip, SpooledArtifact]] = None
+        self.created_at = datetime.now()
+        self.started_at = None
+        self.finished_at = None
+        self.future: Optional[Future] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (JOB_COMPLETED, JOB_FAILED)
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "params": self.params,
+            "status": self.status,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "filename": self.result.filename if self.result else None,
+            "size": self.result_size(),
+        }
+
+    def result_size(self) -> Optional[int]:
+        if self.result is None:
+            return None
+        if isinstance(self.result, SpooledArtifact):
+            try:
+                return os.path.getsize(self.result.path)
+            except OSError:
+                return None
+        return len(self.result.content)
+
+    def discard_result(self):
+        result, self.result = self.result, None
+        if isinstance(result, SpooledArtifact):
+            try:
+                os.remove(result.path)
+            except OSError:
+                pass
+
+
+class JobQueue:
+    """
+    Runs payslip and report renders on a small local worker pool so HTTP handlers only
+    submit and poll. Queued plus running jobs are capped at max_depth. Finished jobs are dropped,
+    results and all, result_ttl_seconds after they finish: on lookup, and by a sweeper thread
+    so results do not pile up when nobody asks.
+    """
+    def __init__(self, workers: int, max_depth: int, result_ttl_seconds: int):
+        self.workers = workers
+        self.max_depth = max_depth
+        self.result_ttl_seconds = result_ttl_seconds
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._jobs = {}
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._sweeper_stop: Optional[threading.Event] = None
+
+    def submit(self, kind: str, params: dict, render: Callable[[Session], Union[CachedPayslip, SpooledArtifact]]) -> RenderJob:
+        job = RenderJob(kind, params, render)
+        with self._lock:
+            expired = self._purge_expired()
+            if self._pending >= self.max_depth:
+                raise JobQueueFull(f"Job queue is full ({self.max_depth} pending jobs).")
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="render-job")
+                self._start_sweeper()
+            job.future = self._executor.submit(self._run, job)
+            self._jobs[job.id] = job
+            self._pending += 1
+        _discard(expired)
+        return job
+
+    def get(self, job_id: str) -> Optional[RenderJob]:
+        with self._lock:
+            expired = self._purge_expired()
+            job = self._jobs.get(job_id)
+        _discard(expired)
+        return job
+
+    def depth(self) -> int:
+        with self._lock:
+            return self._pending
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+            stop, self._sweeper_stop = self._sweeper_stop, None
+        if stop is not None:
+            stop.set()
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _start_sweeper(self):
+        self._sweeper_stop = threading.Event()
+        threading.Thread(target=self._sweep, args=(self._sweeper_stop,), name="render-job-sweeper", daemon=True).start()
+
+    def _sweep(self, stop: threading.Event):
+        interval = max(1, min(self.result_ttl_seconds, JOB_SWEEP_INTERVAL_SECONDS))
+        while not stop.wait(interval):
+            with self._lock:
+                expired = self._purge_expired()
+            _discard(expired)
+
+    def _run(self, job: RenderJob):
+        job.status = JOB_RUNNING
+        job.started_at = datetime.now()
+        db = SessionLocal()
+        try:
+            job.result = job.render(db)
+            job.status = JOB_COMPLETED
+        except HTTPException as e:
+            job.error, job.error_code = e.detail, e.status_code
+            job.status = JOB_FAILED
+        except Exception as e:
+            job.error, job.error_code = f"An error occurred: {str(e)}", 500
+            job.status = JOB_FAILED
+        finally:
+            db.close()
+            job.finished_at = datetime.now()
+            with self._lock:
+                self._pending -= 1
+
+    def _purge_expired(self) -> List[RenderJob]:
+        """
+        Unregister finished jobs past their TTL (call with the lock held); the caller discards their
+        results afterwards, outside the lock.
+        """
+        cutoff = time.time() - self.result_ttl_seconds
+        expired = [
+            job for job in self._jobs.values()
+            if job.finished and job.finished_at.timestamp() < cutoff
+        ]
+        for job in expired:
+            del self._jobs[job.id]
+        return expired
+
+
+def _discard(jobs: List[RenderJob]):
+    for job in jobs:
+        job.discard_result()
+
+
+job_queue = JobQueue(
+    workers=settings.job_workers,
+    max_depth=settings.job_queue_max_depth,
+    result_ttl_seconds=settings.job_result_ttl_seconds,
+)
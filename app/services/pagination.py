@@ -0,0 +1,92 @@
+import base64
+import json
+from datetime import date, datetime
+from functools import lru_cache
+from typing import List, Optional, Tuple, Type
+from fastapi import HTTPException
+from pydantic import BaseModel, create_model
+from app.core.config import settings
+from app.services.serialization import PreEncodedJSONResponse, json_response
+
+
+def page_limit(limit: Optional[int], cursor: Optional[str] = None) -> Optional[int]:
+    """
+    The page size for a list request, or None when neither limit nor cursor was passed: those
+    requests keep getting every row, as they did before the list endpoints were paginated.
+    """
+    if limit is None:
+        return settings.default_page_size if cursor else None
+    return max(1, min(limit, settings.max_page_size))
+
+
+def encode_cursor(*values) -> str:
+    """
+    Opaque keyset cursor for the last row of a page, e.g. encode_cursor(row.date, row.id).
+    """
+    payload = [v.isoformat() if isinstance(v, (date, datetime)) else v for v in values]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *types) -> Tuple:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if len(payload) != len(types):
+            raise ValueError("cursor has the wrong number of keys")
+        return tuple(
+            datetime.fromisoformat(value).date() if kind is date
+            else datetime.fromisoformat(value) if kind is datetime
+            else kind(value)
+            for kind, value in zip(types, payload)
+        )
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid cursor: {str(e)}")
+
+
+def parse_fields(fields: Optional[str], schema: Type[BaseModel], table_columns) -> Optional[List[str]]:
+    """
+    Turn a comma-separated ?fields= value into a list of selectable column names.
+    """
+    if not fields:
+        return None
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    allowed = [name for name in schema.model_fields if name in table_columns]
+    unknown = [f for f in requested if f not in allowed]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {unknown}. Allowed fields are {allowed}")
+    return list(dict.fromkeys(requested))
+
+
+@lru_cache(maxsize=128)
+def projection_model(schema: Type[BaseModel], fields: Tuple[str, ...]) -> Type[BaseModel]:
+    """
+    A schema subset with every field optional, so projected rows serialize exactly like full ones.
+    """
+    definitions = {name: (Optional[schema.model_fields[name].annotation], None) for name in fields}
+    return create_model(f"{schema.__name__}Projection", **definitions)
+
+
+def page_response(page: dict) -> PreEncodedJSONResponse:
+    """
+    Page items as the JSON body, with the next cursor in the X-Next-Cursor header.
+    """
+    headers = {"X-Next-Cursor": page["next_cursor"]} if page["next_cursor"] else {}
+    return json_response(page["items"], headers=headers)
+
+
+def page_openapi(schema: Type[BaseModel]) -> dict:
+    """
+    OpenAPI responses for a paged list route. The body is pre-encoded, so the route declares
+    response_model=None and the item schema is only documented here.
+    """
+    return {
+        200: {
+            "model": List[schema],
+            "description": (
+                f"A JSON array of {schema.__name__} items. With ?fields= each item carries only the "
+                "listed fields. When more rows follow, the cursor for the next page is in the "
+                "X-Next-Cursor header."
+            ),
+            "headers": {"X-Next-Cursor": {"description": "Cursor for the next page", "schema": {"type": "string"}}},
+        },
+    }
@@ -0,0 +1,82 @@
+from decimal import Decimal
+from typing import Dict, List, Optional
+from sqlalchemy import select, func
+from sqlalchemy.orm import Session
+from app.models.payroll import Payroll
+from app.db.types import Money
+
+# Summary name -> summed column
+TOTAL_COLUMNS = {
+    "total_hours_worked": Payroll.total_hours_worked,
+    "overtime_pay": Payroll.overtime_pay,
+    "night_differential_pay": Payroll.night_differential_pay,
+    "deductions": Payroll.deductions,
+    "allowance": Payroll.allowance,
+    "gross_salary": Payroll.subtotal,
+    "net_salary": Payroll.net_salary,
+}
+# The totals held as integer centavos (every one but the hours)
+MONEY_TOTALS = [name for name, column in TOTAL_COLUMNS.items() if isinstance(column.type, Money)]
+
+
+def _aggregate_columns():
+    return [
+        *(func.coalesce(func.sum(column), 0).label(name) for name, column in TOTAL_COLUMNS.items()),
+        func.count(Payroll.id).label("row_count"),
+        func.min(Payroll.date).label("period_from"),
+        func.max(Payroll.date).label("period_to"),
+    ]
+
+
+def _filtered(query, employee_ids: Optional[List[int]], start_date: Optional[str], end_date: Optional[str]):
+    if employee_ids is not None:
+        query = query.where(Payroll.employee_id.in_(employee_ids))
+    if start_date:
+        query = query.where(Payroll.date >= start_date)
+    if end_date:
+        query = query.where(Payroll.date <= end_date)
+    return query
+
+
+def totals_summary(row) -> dict:
+    return {
+        "totals": {name: Decimal(str(getattr(row, name))) for name in TOTAL_COLUMNS},
+        "row_count": row.row_count,
+        "period_from": row.period_from,
+        "period_to": row.period_to,
+    }
+
+
+def payroll_totals_query(
+    employee_id: Optional[int] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+):
+    employee_ids = [employee_id] if employee_id is not None else None
+    return _filtered(select(*_aggregate_columns()), employee_ids, start_date, end_date)
+
+
+def get_payroll_totals(
+    db: Session,
+    employee_id: Optional[int] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+) -> dict:
+    """
+    Totals, row count and min/max date for the matching payroll rows in one SUM/MIN/MAX query.
+    """
+    return totals_summary(db.execute(payroll_totals_query(employee_id, start_date, end_date)).one())
+
+
+def get_payroll_totals_by_employee(
+    db: Session,
+    employee_ids: Optional[List[int]] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+) -> Dict[int, dict]:
+    """
+    The same totals for many employees at once, with GROUP BY employee_id.
+    """
+    query = select(Payroll.employee_id, *_aggregate_columns()).group_by(Payroll.employee_id)
+    rows = db.execute(_filtered(query, employee_ids, start_date, end_date)).all()
+    return {row.employee_id: totals_summary(row) for row in rows}
@@ -0,0 +1,335 @@
+import time
+from typing import List, NamedTuple, Optional
+import numpy as np
+import pandas as pd
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.types import Money, centavo_table, centavos, from_centavos, to_centavos
+from app.models.employee import Employee
+from app.models.payroll import Payroll
+from app.schemas.payroll import PayrollSimulation
+from app.services.payslip_cache import payslip_cache
+from app.services.rollup_service import refresh_payroll_rollups
+from app.services.versioning import bump_table_version
+
+SECONDS_PER_HOUR = 3600
+SECONDS_PER_DAY = 24 * SECONDS_PER_HOUR
+RUN_UPDATE_BATCH = 5000
+
+# Payroll columns a run computes; all other columns (allowance, deductions, remarks...) are inputs
+COMPUTED_COLUMNS = [
+    "total_hours_worked", "overtime_hour", "overtime_pay", "night_differential_hour",
+    "night_differential_pay", "subtotal", "net_salary",
+]
+RUN_TOTALS = ["total_hours_worked", "overtime_pay", "night_differential_pay", "subtotal", "net_salary"]
+SIMULATION_TOTALS = ["overtime_pay", "night_differential_pay", "subtotal", "net_salary"]
+# Payroll columns each caller loads; fewer columns is a noticeably cheaper fetch over a year of rows
+PUNCH_COLUMNS = ["employee_id", "time_in", "time_out", "allowance", "deductions"]
+RUN_COLUMNS = ["id", "date", *PUNCH_COLUMNS, *COMPUTED_COLUMNS]
+SIMULATION_COLUMNS = [*PUNCH_COLUMNS, *SIMULATION_TOTALS]
+# What a simulation reports: the stored totals, a recompute at the current rates, and the what-if
+SIMULATION_SERIES = ["actual", "baseline", "simulated"]
+# Loaded and computed as int64 centavos
+MONEY_COLUMNS = {column.name for column in Payroll.__table__.columns if isinstance(column.type, Money)}
+
+
+class PayRules(NamedTuple):
+    """
+    The rates a payroll run applies. The multipliers may also be per-row arrays.
+    """
+    regular_hours: float
+    overtime_multiplier: float
+    night_diff_rate: float
+    night_start_hour: int
+    night_end_hour: int
+
+
+def default_pay_rules() -> PayRules:
+    return PayRules(
+        regular_hours=settings.payroll_regular_hours,
+        overtime_multiplier=settings.payroll_overtime_multiplier,
+        night_diff_rate=settings.payroll_night_diff_rate,
+        night_start_hour=settings.payroll_night_start_hour,
+        night_end_hour=settings.payroll_night_end_hour,
+    )
+
+
+def epoch_seconds(column: pd.Series) -> np.ndarray:
+    return pd.to_datetime(column).to_numpy("datetime64[s]").astype(np.int64)
+
+
+def round_centavos(values: np.ndarray) -> np.ndarray:
+    # half-up to a whole centavo, like Money does with Decimal amounts
+    return np.floor(values + 0.5).astype(np.int64)
+
+
+def centavo_array(frame: pd.DataFrame, name: str) -> np.ndarray:
+    return frame[name].astype(float).fillna(0).astype(np.int64).to_numpy()
+
+
+def _night_seconds_before(seconds: np.ndarray, start_hour: int, end_hour: int) -> np.ndarray:
+    """
+    Night-window seconds between the epoch and each timestamp, so that the night time inside a
+    shift is just the difference at both ends, however many midnights the shift crosses.
+    """
+    days, clock = np.divmod(seconds, SECONDS_PER_DAY)
+    start, end = start_hour * SECONDS_PER_HOUR, end_hour * SECONDS_PER_HOUR
+    if start > end:  # 22:00-06:00 style window: [00:00, end) and [start, 24:00) of every day
+        per_day = end + SECONDS_PER_DAY - start
+        return days * per_day + np.minimum(clock, end) + np.maximum(clock - start, 0)
+    per_day = end - start
+    return days * per_day + np.clip(clock - start, 0, per_day)
+
+
+def compute_pay(
+    time_in: np.ndarray,
+    time_out: np.ndarray,
+    daily_rate: np.ndarray,
+    allowance: np.ndarray,
+    deductions: np.ndarray,
+    rules: PayRules,
+) -> dict:
+    """
+    Hours and pay for every punch at once. time_in/time_out are epoch seconds and the amounts are
+    centavos; the daily rate pays rules.regular_hours, hours past that are overtime, and night
+    hours earn a premium on top. Money results are int64 centavos.
+    """
+    hours = (time_out - time_in) / SECONDS_PER_HOUR
+    regular = np.minimum(hours, rules.regular_hours)
+    overtime = hours - regular
+    night = (
+        _night_seconds_before(time_out, rules.night_start_hour, rules.night_end_hour)
+        - _night_seconds_before(time_in, rules.night_start_hour, rules.night_end_hour)
+    ) / SECONDS_PER_HOUR
+
+    hourly_rate = daily_rate / rules.regular_hours
+    basic_pay = round_centavos(regular * hourly_rate)
+    overtime_pay = round_centavos(overtime * hourly_rate * rules.overtime_multiplier)
+    night_differential_pay = round_centavos(night * hourly_rate * rules.night_diff_rate)
+    subtotal = basic_pay + overtime_pay + night_differential_pay + allowance
+    return {
+        "total_hours_worked": np.round(hours, 2),
+        "overtime_hour": np.round(overtime, 2),
+        "overtime_pay": overtime_pay,
+        "night_differential_hour": np.round(night, 2),
+        "night_differential_pay": night_differential_pay,
+        "subtotal": subtotal,
+        "net_salary": subtotal - deductions,
+    }
+
+
+def load_punches(
+    db: Session,
+    start_date: str,
+    end_date: str,
+    employee_ids: Optional[List[int]] = None,
+    columns: List[str] = RUN_COLUMNS,
+) -> pd.DataFrame:
+    """
+    The given Payroll columns of every row in the period, plus the employee's daily rate and
+    position, as one frame. Money columns come back as integer centavos.
+    """
+    selected = [
+        centavos(getattr(Payroll, name)).label(name) if name in MONEY_COLUMNS else getattr(Payroll, name)
+        for name in columns
+    ]
+    query = (
+        select(*selected, centavos(Employee.salary).label("daily_rate"), Employee.position)
+        .join(Employee, Employee.id == Payroll.employee_id)
+        .where(Payroll.date >= start_date, Payroll.date <= end_date)
+    )
+    if employee_ids:
+        query = query.where(Payroll.employee_id.in_(employee_ids))
+    rows = db.execute(query).all()
+    return pd.DataFrame(rows, columns=[*columns, "daily_rate", "position"])
+
+
+def _changed(frame: pd.DataFrame, computed: dict) -> np.ndarray:
+    changed = np.zeros(len(frame), dtype=bool)
+    for name in COMPUTED_COLUMNS:
+        stored = frame[name].astype(float).to_numpy()
+        tolerance = 0 if name in MONEY_COLUMNS else 0.005
+        changed |= np.isnan(stored) | (np.abs(stored - computed[name]) > tolerance)
+    return changed
+
+
+def _run_update_statement():
+    # Core UPDATE by id; money goes in as raw centavos, without a Decimal round trip per value
+    table = centavo_table(Payroll.__table__)
+    return (
+        update(table)
+        .where(table.c.id == bindparam("payroll_id"))
+        .values({**{name: bindparam(f"new_{name}") for name in COMPUTED_COLUMNS}, "version": table.c.version + 1})
+    )
+
+
+def _punch_arrays(frame: pd.DataFrame):
+    """
+    time_in and time_out as epoch seconds plus the mask of rows a run can compute.
+    """
+    time_in, time_out = epoch_seconds(frame["time_in"]), epoch_seconds(frame["time_out"])
+    return time_in, time_out, time_out > time_in
+
+
+def run_payroll(
+    db: Session,
+    start_date: str,
+    end_date: str,
+    employee_ids: Optional[List[int]] = None,
+) -> dict:
+    """
+    Recompute hours, overtime, night differential, gross and net pay for every payroll row of the
+    period from its punches and the employee's daily rate, and write the rows that changed back in
+    one transaction. Rows whose time out is not after time in are skipped and counted.
+    """
+    started = time.perf_counter()
+    frame = load_punches(db, start_date, end_date, employee_ids)
+    if frame.empty:
+        return {"success": False, "error": "No payroll records found for the selected period.", "code": 404}
+
+    time_in, time_out, valid = _punch_arrays(frame)
+    frame = frame[valid].reset_index(drop=True)
+    rules = default_pay_rules()
+    computed = compute_pay(
+        time_in[valid],
+        time_out[valid],
+        frame["daily_rate"].astype(float).to_numpy(),
+        centavo_array(frame, "allowance"),
+        centavo_array(frame, "deductions"),
+        rules,
+    )
+    changed = _changed(frame, computed)
+
+    updates = pd.DataFrame({"payroll_id": frame["id"], **{f"new_{name}": computed[name] for name in COMPUTED_COLUMNS}})
+    records = updates[changed].to_dict("records")
+    touched = frame.loc[changed, ["employee_id", "date"]]
+    try:
+        statement = _run_update_statement()
+        for offset in range(0, len(records), RUN_UPDATE_BATCH):
+            db.execute(statement, records[offset:offset + RUN_UPDATE_BATCH])
+        refresh_payroll_rollups(db, touched.itertuples(index=False, name=None))
+        if records:
+            db.execute(bump_table_version("payroll"))
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        return {"success": False, "error": f"An error occurred: {str(e)}", "code": 500}
+    payslip_cache.invalidate_employees(int(employee_id) for employee_id in touched["employee_id"].unique())
+
+    return {
+        "success": True,
+        "period_from": start_date,
+        "period_to": end_date,
+        "rows": len(frame),
+        "updated": len(records),
+        "skipped": int((~valid).sum()),
+        "employees": int(frame["employee_id"].nunique()),
+        "rules": rules._asdict(),
+        "totals": {
+            name: from_centavos(computed[name].sum()) if name in MONEY_COLUMNS else round(float(computed[name].sum()), 2)
+            for name in RUN_TOTALS
+        },
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+
+
+def _resolve_override(
+    frame: pd.DataFrame, simulation: PayrollSimulation, field: str, default, convert=float
+) -> np.ndarray:
+    """
+    Per-row value of one override field: employee override, else position override, else global
+    override, else default (a scalar or a per-row array). convert turns an override into the
+    array's unit.
+    """
+    values = np.full(len(frame), np.nan)
+    for column, overrides in (("employee_id", simulation.employees), ("position", simulation.positions)):
+        mapping = {key: convert(getattr(o, field)) for key, o in overrides.items() if getattr(o, field) is not None}
+        if mapping:
+            values = np.where(np.isnan(values), frame[column].map(mapping).to_numpy(dtype=float), values)
+    global_value = getattr(simulation.global_override, field, None)
+    if global_value is not None:
+        default = convert(global_value)
+    return np.where(np.isnan(values), default, values)
+
+
+def _group_totals(frame: pd.DataFrame, key: str, series: dict) -> List[dict]:
+    columns = {f"{label}_{name}": series[label][name] for label in SIMULATION_SERIES for name in SIMULATION_TOTALS}
+    grouped = pd.DataFrame({key: frame[key].to_numpy(), **columns}).groupby(key, sort=True)
+    sums = grouped.sum()
+    sums["row_count"] = grouped.size()
+    return [
+        {key: group, "row_count": int(row["row_count"]), **_diff_totals(row)}
+        for group, row in zip(sums.index.tolist(), sums.to_dict("records"))
+    ]
+
+
+def _diff_totals(sums) -> dict:
+    """
+    Totals per series from a mapping of <series>_<name> centavo sums, plus the rate-driven
+    difference (simulated minus baseline) and the drift of the stored rows from the current rates
+    (baseline minus actual).
+    """
+    totals = {
+        label: {name: from_centavos(sums[f"{label}_{name}"]) for name in SIMULATION_TOTALS}
+        for label in SIMULATION_SERIES
+    }
+    actual, baseline, simulated = (totals[label] for label in SIMULATION_SERIES)
+    return {
+        **totals,
+        "difference": {name: simulated[name] - baseline[name] for name in SIMULATION_TOTALS},
+        "drift": {name: baseline[name] - actual[name] for name in SIMULATION_TOTALS},
+    }
+
+
+def simulate_payroll(db: Session, simulation: PayrollSimulation) -> dict:
+    """
+    Re-price a past period under different daily rates, overtime multipliers or night-differential
+    premiums. "difference" compares the what-if with a recompute at the current rates, so it only
+    moves with the overrides; "drift" is how far the stored totals are from that recompute (rows
+    entered by hand or not yet run). Read-only: nothing is written, and the recorded punches,
+    allowances and deductions are used as they are.
+    """
+    started = time.perf_counter()
+    frame = load_punches(
+        db, simulation.start_date.isoformat(), simulation.end_date.isoformat(), columns=SIMULATION_COLUMNS
+    )
+    if frame.empty:
+        return {"success": False, "error": "No payroll records found for the selected period.", "code": 404}
+
+    time_in, time_out, valid = _punch_arrays(frame)
+    frame = frame[valid].reset_index(drop=True)
+    rules = default_pay_rules()
+    actual_rate = frame["daily_rate"].astype(float).to_numpy()
+    daily_rate = _resolve_override(frame, simulation, "daily_rate", actual_rate, convert=to_centavos)
+    daily_rate = daily_rate * _resolve_override(frame, simulation, "daily_rate_multiplier", 1.0)
+    simulated_rules = rules._replace(
+        overtime_multiplier=_resolve_override(frame, simulation, "overtime_multiplier", rules.overtime_multiplier),
+        night_diff_rate=_resolve_override(frame, simulation, "night_diff_rate", rules.night_diff_rate),
+    )
+    allowance, deductions = centavo_array(frame, "allowance"), centavo_array(frame, "deductions")
+    series = {
+        "actual": {name: centavo_array(frame, name) for name in SIMULATION_TOTALS},
+        "baseline": compute_pay(time_in[valid], time_out[valid], actual_rate, allowance, deductions, rules),
+        "simulated": compute_pay(time_in[valid], time_out[valid], daily_rate, allowance, deductions, simulated_rules),
+    }
+    drifted = np.zeros(len(frame), dtype=bool)
+    for name in SIMULATION_TOTALS:
+        drifted |= series["baseline"][name] != series["actual"][name]
+
+    sums = {f"{label}_{name}": series[label][name].sum() for label in SIMULATION_SERIES for name in SIMULATION_TOTALS}
+    result = {
+        "success": True,
+        "period_from": simulation.start_date,
+        "period_to": simulation.end_date,
+        "rows": len(frame),
+        "skipped": int((~valid).sum()),
+        "employees": int(frame["employee_id"].nunique()),
+        "drifted_rows": int(drifted.sum()),
+        **_diff_totals(sums),
+        "by_position": _group_totals(frame, "position", series),
+    }
+    if simulation.include_employees:
+        result["by_employee"] = _group_totals(frame, "employee_id", series)
+    result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return result
@@ -1,54 +1,228 @@
-from typing import List, Optional
+from typing import Iterable, List, Optional
 from app.models.payroll import Payroll
 from app.schemas.payroll import PayrollSchema, PayrollResponse,PayrollCreate,PayrollUpdate
 from sqlalchemy.orm import Session
-from sqlalchemy.inspection import inspect
 from app.models.employee import Employee
 from sqlalchemy.exc import IntegrityError
-from fastapi import HTTPException
-from weasyprint import HTML, CSS
-from jinja2 import Environment, FileSystemLoader
+from sqlalchemy.engine import Row
+from sqlalchemy import select, insert, tuple_, literal
+from fastapi import HTTPException, UploadFile, File
+from fastapi.concurrency import run_in_threadpool
 import os
 from decimal import Decimal
-from datetime import datetime
+from datetime import datetime, date
 from io import BytesIO
-from openpyxl import Workbook
+from openpyxl import Workbook, load_workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.drawing.image import Image as ExcelImage
 from openpyxl.styles import Alignment, Font
-from fastapi.responses import StreamingResponse
+from fastapi.responses import StreamingResponse, Response
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from app.core.config import settings
+from app.core.metrics import Span, timed_iter
+from app.services.payslip_renderer import get_render_context
+from app.services.employee_cache import employee_cache
+from app.services.employee_service import employee_by_id_query
+from app.services.payslip_cache import payslip_cache, payslip_fingerprint, etag_matches, PayslipKey, CachedPayslip, SpooledArtifact
+from app.services.pagination import page_limit, encode_cursor, decode_cursor, parse_fields, projection_model
+from app.services.serialization import to_response, to_responses
+from app.db.session import SessionLocal
+from app.services.payroll_aggregates import get_payroll_totals, get_payroll_totals_by_employee
+from app.services.rollup_service import refresh_payroll_rollups
+from app.services.versioning import bump_table_version, table_version_query, row_version_query, row_etag, list_etag
+from functools import lru_cache
+from itertools import groupby
+from operator import attrgetter
+import multiprocessing
+import io
+import csv
+import zipfile
+import json
+import logging
+import time
+import re
+import tempfile
+import pandas as pd
+
+logger = logging.getLogger(__name__)
 
-def get_employee_or_404(db: Session, employee_id: int):
-    employee = db.query(Employee).filter(Employee.id == employee_id).first()
+def get_employee_or_404(db: Session, employee_id: int) -> Row:
+    """
+    The employee's row, from the employee cache when it is enabled and holds a fresh copy.
+    """
+    if not settings.employee_cache_enabled:
+        employee = db.execute(employee_by_id_query(employee_id)).first()
+    else:
+        employee = employee_cache.get(employee_id)
+        if employee is None:
+            token = employee_cache.token()
+            employee = db.execute(employee_by_id_query(employee_id)).first()
+            if employee:
+                employee_cache.put(employee_id, employee, token)
     if not employee:
         raise HTTPException(status_code=404, detail=f"Employee with ID {employee_id} not found")
     return employee
 
-def get_all_payrolls(db: Session) -> List[PayrollResponse]:
-    payrolls = db.query(Payroll).all()
-    return [
-        PayrollResponse(**{c.key: getattr(payroll, c.key) for c in inspect(Payroll).mapper.column_attrs})
-        for payroll in payrolls
-    ]
+def payroll_page_query(
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    employee_id: Optional[int] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    project: Optional[str] = None,
+    fields: Optional[str] = None,
+):
+    """
+    The keyset query behind get_all_payrolls, shared with the async service.
+    Returns (query, selected fields, page limit); the query reads one extra row to detect a next page.
+    Without a limit (no limit or cursor passed) it reads every matching row.
+    """
+    limit = page_limit(limit, cursor)
+    columns = Payroll.__table__.c
+    selected = parse_fields(fields, PayrollResponse, columns.keys())
+    # date and id are always read: they form the cursor
+    select_names = list(dict.fromkeys((selected or list(columns.keys())) + ["date", "id"]))
+
+    query = select(*[columns[name] for name in select_names])
+    if employee_id is not None:
+        query = query.where(Payroll.employee_id == employee_id)
+    if start_date:
+        query = query.where(Payroll.date >= start_date)
+    if end_date:
+        query = query.where(Payroll.date <= end_date)
+    if project:
+        query = query.where(Payroll.project == project)
+    if cursor:
+        after_date, after_id = decode_cursor(cursor, date, int)
+        query = query.where(tuple_(Payroll.date, Payroll.id) > tuple_(literal(after_date), literal(after_id)))
+    query = query.order_by(Payroll.date, Payroll.id)
+    if limit is not None:
+        query = query.limit(limit + 1)
+    return query, selected, limit
+
+def payroll_page(rows, selected: Optional[List[str]], limit: Optional[int]) -> dict:
+    if limit is None:
+        limit = len(rows)
+    next_cursor = encode_cursor(rows[limit - 1].date, rows[limit - 1].id) if len(rows) > limit else None
+    schema = projection_model(PayrollResponse, tuple(selected)) if selected else PayrollResponse
+    return {"items": to_responses(schema, rows[:limit]), "next_cursor": next_cursor}
+
+def get_all_payrolls(
+    db: Session,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    employee_id: Optional[int] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    project: Optional[str] = None,
+    fields: Optional[str] = None,
+) -> dict:
+    """
+    One keyset page of payroll rows ordered by (date, id).
+    Returns {"items": [...], "next_cursor": str | None}; pass next_cursor back to get the following page.
+    """
+    query, selected, limit = payroll_page_query(limit, cursor, employee_id, start_date, end_date, project, fields)
+    return payroll_page(db.execute(query).all(), selected, limit)
+
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+# the PayrollResponse fields, in schema order; internal columns such as version stay out
+EXPORT_COLUMNS = [name for name in PayrollResponse.model_fields if name in Payroll.__table__.c]
+
+def _export_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        # exact, as a string, the way the JSON API renders money
+        return str(value)
+    return value
+
+def _iter_payroll_export(query, fmt: str):
+    """
+    Stream the query through a server-side cursor, yielding one encoded chunk per fetched batch.
+    A dedicated session is used because the request's session is closed once the handler returns.
+    """
+    db = SessionLocal()
+    try:
+        result = db.execute(query.execution_options(yield_per=settings.export_batch_size))
+        columns = list(result.keys())
+        if fmt == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(columns)
+            yield buffer.getvalue()
+        for partition in result.partitions():
+            if fmt == "csv":
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                writer.writerows([_export_value(v) for v in row] for row in partition)
+                yield buffer.getvalue()
+            else:
+                yield "".join(
+                    json.dumps(dict(zip(columns, map(_export_value, row)))) + "\n"
+                    for row in partition
+                )
+    finally:
+        db.close()
+
+def export_payrolls(
+    fmt: str = "ndjson",
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    project: Optional[str] = None,
+    employee_id: Optional[int] = None,
+) -> StreamingResponse:
+    """
+    Export payroll rows as NDJSON or CSV without materializing the result set.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Invalid export format: {fmt}. Allowed values are {list(EXPORT_FORMATS)}")
+
+    query = select(*(Payroll.__table__.c[name] for name in EXPORT_COLUMNS))
+    if employee_id is not None:
+        query = query.where(Payroll.employee_id == employee_id)
+    if start_date:
+        query = query.where(Payroll.date >= start_date)
+    if end_date:
+        query = query.where(Payroll.date <= end_date)
+    if project:
+        query = query.where(Payroll.project == project)
+    query = query.order_by(Payroll.date, Payroll.id)
+
+    filename = f"payroll_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{fmt}"
+    return StreamingResponse(_iter_payroll_export(query, fmt), media_type=EXPORT_FORMATS[fmt], headers={
+        "Content-Disposition": f"attachment; filename={filename}"
+    })
+
+def payroll_by_id_query(payroll_id: int):
+    return select(*Payroll.__table__.c).where(Payroll.id == payroll_id)
+
+def payroll_etag(db: Session, payroll_id: int) -> Optional[str]:
+    return row_etag("payroll", payroll_id, db.execute(row_version_query(Payroll, payroll_id)).scalar())
+
+def payroll_list_etag(db: Session, query_string: str) -> Optional[str]:
+    return list_etag("payroll", db.execute(table_version_query("payroll")).scalar(), query_string)
 
 def get_payroll_by_id(db: Session, payroll_id: int) -> dict:
-    payroll = db.query(Payroll).filter(Payroll.id == payroll_id).first()
+    payroll = db.execute(payroll_by_id_query(payroll_id)).first()
     if not payroll:
         return {"success": False, "error": "Payroll record not found", "code": 404}
     
-    return {
-        "success": True,
-        "payroll": PayrollResponse(**{c.key: getattr(payroll, c.key) for c in inspect(Payroll).mapper.column_attrs})
-    }
+    return {"success": True, "payroll": to_response(PayrollResponse, payroll)}
 
 def generate_payroll(db: Session, payroll_data: PayrollCreate, employee_id: int) -> dict:
     get_employee_or_404(db, employee_id)
     try:
         new_payroll = Payroll(**payroll_data.model_dump())
         db.add(new_payroll)
+        db.flush()
+        refresh_payroll_rollups(db, [(new_payroll.employee_id, new_payroll.date)])
+        db.execute(bump_table_version("payroll"))
         db.commit()
         db.refresh(new_payroll)
+        payslip_cache.invalidate_employees([employee_id, new_payroll.employee_id])
 
-        return {"success": True, "payroll": new_payroll}
+        return {"success": True, "payroll": to_response(PayrollResponse, new_payroll)}
     except IntegrityError as e:
         db.rollback()
         return {"success": False, "error": "Payroll record already exists for this employee on that date.", "code": 400}
@@ -60,14 +234,21 @@ def update_payroll(db: Session, payroll_id: int, payroll_data: PayrollUpdate) ->
     payroll = db.query(Payroll).filter(Payroll.id == payroll_id).first()
     if not payroll:
         return {"success": False, "error": "Payroll record not found", "code": 404}
+    previous_employee_id = payroll.employee_id
+    previous_date = payroll.date
     try:
-        update_data = payroll_data.model_dump()
+        update_data = payroll_data.model_dump(exclude={"id"})
         for key, value in update_data.items():
             setattr(payroll, key, value)
+        payroll.version = Payroll.version + 1
 
+        db.flush()
+        refresh_payroll_rollups(db, [(previous_employee_id, previous_date), (payroll.employee_id, payroll.date)])
+        db.execute(bump_table_version("payroll"))
         db.commit()
         db.refresh(payroll)
-        return {"success": True, "payroll": payroll}
+        payslip_cache.invalidate_employees([previous_employee_id, payroll.employee_id])
+        return {"success": True, "payroll": to_response(PayrollResponse, payroll)}
     except IntegrityError:
         db.rollback()
         return {"success": False, "error": "Payroll record already exists for this employee on that date.", "code": 400}
@@ -81,42 +262,128 @@ def delete_payroll(db: Session, payroll_id: int) -> dict:
         return {"success": False, "error": "Payroll record not found", "code": 404}
     try:
         db.delete(payroll)
+        db.flush()
+        refresh_payroll_rollups(db, [(payroll.employee_id, payroll.date)])
+        db.execute(bump_table_version("payroll"))
         db.commit()
+        payslip_cache.invalidate_employee(payroll.employee_id)
         return {"success": True, "message": "Payroll record deleted successfully."}
     except Exception as e:
         db.rollback()
         return {"success": False, "error": f"An error occurred: {str(e)}", "code": 500}   
 
+def employee_payrolls_query(employee_id: int, start_date: Optional[str] = None, end_date: Optional[str] = None):
+    query = select(*Payroll.__table__.c).where(Payroll.employee_id == employee_id)
+    if start_date:
+        query = query.where(Payroll.date >= start_date)
+    if end_date:
+        query = query.where(Payroll.date <= end_date)
+    return query.order_by(Payroll.date)
+
 def get_payroll_summary(
     db: Session,
     employee_id: int,
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
+    totals_only: bool = False,
 ) -> dict:
    
     get_employee_or_404(db, employee_id)
     try:
-        payrolls_query = db.query(Payroll).filter(Payroll.employee_id == employee_id)
-        if start_date:
-            payrolls_query = payrolls_query.filter(Payroll.date >= start_date)
-        if end_date:
-            payrolls_query = payrolls_query.filter(Payroll.date <= end_date)
-        payrolls = payrolls_query.all()
-
-        if not payrolls:
+        summary = get_payroll_totals(db, employee_id, start_date, end_date)
+        if not summary["row_count"]:
             return {"success": False, "error": "No payroll records found.", "code": 404}   
 
-        payrolls_data = [
-            PayrollResponse(**{c.key: getattr(payroll, c.key) for c in inspect(Payroll).mapper.column_attrs})
-            for payroll in payrolls
-        ]
-        return {"success": True, "payrolls": payrolls_data}
+        if totals_only:
+            return {"success": True, **summary}
+
+        payrolls = db.execute(employee_payrolls_query(employee_id, start_date, end_date)).all()
+
+        return {"success": True, "payrolls": to_responses(PayrollResponse, payrolls), **summary}
     except Exception as e:
         db.rollback()
         return {"success": False, "error": str(e), "code": 500}
     
 
-def generate_payslip_pdf(employee_id: int, db: Session) -> StreamingResponse:
+def build_payslip_context(employee: Employee, payrolls: List[Payroll], summary: dict) -> dict:
+    """
+    Template variables for a payslip; summary comes from payroll_aggregates.
+    """
+    totals = summary["totals"]
+    return {
+        "employee": employee,
+        "payrolls": payrolls,
+        "total_hours_worked": totals["total_hours_worked"],
+        "total_overtime_pay": totals["overtime_pay"],
+        "total_night_diff": totals["night_differential_pay"],
+        "total_deductions": totals["deductions"],
+        "allowance": totals["allowance"],
+        "total_gross_salary": totals["gross_salary"],
+        "total_net_salary": totals["net_salary"],
+        "pay_period_from": summary["period_from"],
+        "pay_period_to": summary["period_to"],
+        "current_date": datetime.now(),
+        "daily_rate": Decimal(employee.salary),  # Ensure employee salary is Decimal
+    }
+
+def render_payslip_html(**context) -> str:
+    return get_render_context().render_html(**context)
+
+def render_payslip_pdf_bytes(html_content: str) -> bytes:
+    """
+    Lay out a rendered payslip with WeasyPrint. Module-level so it can run in a worker process,
+    where it uses that process's own render context.
+    """
+    return get_render_context().render_pdf(html_content)
+
+def _payslip_cache_key(employee: Employee, payrolls: List[Payroll], fmt: str) -> PayslipKey:
+    # a reloaded PDF template changes the key, so neither the cache nor a 304 serves the old layout
+    layout_version = get_render_context().version if fmt == "pdf" else ""
+    return PayslipKey(
+        employee_id=employee.id,
+        period_from=str(min(p.date for p in payrolls)),
+        period_to=str(max(p.date for p in payrolls)),
+        fmt=fmt,
+        fingerprint=payslip_fingerprint(employee, payrolls, fmt, layout_version),
+    )
+
+def _payslip_response(artifact: CachedPayslip, etag: str) -> StreamingResponse:
+    return StreamingResponse(BytesIO(artifact.content), media_type=artifact.media_type, headers={
+        "Content-Disposition": f"attachment; filename={artifact.filename}",
+        "ETag": etag,
+        "Cache-Control": "private, no-cache",
+    })
+
+def _cached_payslip_response(key: PayslipKey, if_none_match: Optional[str]) -> Optional[Response]:
+    """
+    Answer from the client's copy (304) or the payslip cache; None means the payslip must be rendered.
+    """
+    etag = f'"{key.fingerprint}"'
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "private, no-cache"})
+    if settings.payslip_cache_enabled:
+        artifact = payslip_cache.get(key)
+        if artifact is not None:
+            return _payslip_response(artifact, etag)
+    return None
+
+def _store_payslip(key: PayslipKey, artifact: CachedPayslip) -> StreamingResponse:
+    if settings.payslip_cache_enabled:
+        payslip_cache.put(key, artifact)
+    return _payslip_response(artifact, f'"{key.fingerprint}"')
+
+def _render_payslip_pdf(employee: Employee, payrolls: List[Payroll], summary: dict) -> CachedPayslip:
+    context = build_payslip_context(employee, payrolls, summary)
+    current_date = context["current_date"]
+
+    # Render HTML with Jinja2, then generate the PDF bytes
+    html_content = render_payslip_html(**context)
+    pdf_bytes = render_payslip_pdf_bytes(html_content)
+
+    filename = f"payslip_{employee.first_name}_{employee.last_name}_{current_date.strftime('%Y%m%d_%H%M%S')}.pdf"
+    return CachedPayslip(pdf_bytes, "application/pdf", filename)
+
+def generate_payslip_pdf(employee_id: int, db: Session, if_none_match: Optional[str] = None) -> Response:
     employee = get_employee_or_404(db, employee_id)
     
     try:
@@ -126,90 +393,13 @@ def generate_payslip_pdf(employee_id: int, db: Session) -> StreamingResponse:
         if not payrolls:
             raise HTTPException(status_code=404, detail="No payroll records found for this employee.")
 
-        # Payroll summary
-        total_hours_worked = sum(Decimal(p.total_hours_worked) if p.total_hours_worked else Decimal(0) for p in payrolls)
-        total_overtime_pay = sum(Decimal(p.overtime_pay) if p.overtime_pay else Decimal(0) for p in payrolls)
-        total_night_diff = sum(Decimal(p.night_differential_pay) if p.night_differential_pay else Decimal(0) for p in payrolls)
-        total_deductions = sum(Decimal(p.deductions) if p.deductions else Decimal(0) for p in payrolls)
-        allowance = sum(Decimal(p.allowance) if p.allowance else Decimal(0) for p in payrolls)
-        gross_salary = sum(Decimal(p.subtotal) if p.subtotal else Decimal(0) for p in payrolls)
-        net_salary = sum(Decimal(p.net_salary) if p.net_salary else Decimal(0) for p in payrolls)
-        pay_period_from = min(p.date for p in payrolls)
-        pay_period_to = max(p.date for p in payrolls)
-        daily_rate = Decimal(employee.salary)  # Ensure employee salary is Decimal
-        current_date = datetime.now()
-
-        # Render HTML with Jinja2
-        template_env = Environment(loader=FileSystemLoader("app/templates"))
-        template = template_env.get_template("payroll_payslip.html") 
-        html_content = template.render(
-            employee=employee,
-            payrolls=payrolls,
-            total_hours_worked=total_hours_worked,
-            total_overtime_pay=total_overtime_pay,
-            total_night_diff=total_night_diff,
-            total_deductions=total_deductions,
-            allowance=allowance,
-            total_gross_salary=gross_salary,
-            total_net_salary=net_salary,
-            pay_period_from=pay_period_from,
-            pay_period_to=pay_period_to,
-            current_date=current_date,
-            daily_rate=daily_rate
-        )
-        
-        # Generate PDF from HTML
-        landscape_css = CSS(string='''
-            @page {
-                size: A4 landscape;
-                margin: 1cm;
-            }
-
-            body {
-                font-family: Arial, sans-serif;
-                font-size: 12px;
-            }
-
-            table {
-                width: 100%;
-                border-collapse: collapse;
-                page-break-inside: auto;
-            }
-
-            thead {
-                display: table-header-group;
-            }
-
-            tfoot {
-                display: table-footer-group;
-            }
-
-            tr {
-                page-break-inside: avoid;
-                page-break-after: auto;
-            }
-
-            td, th {
-                border: 1px solid #ccc;
-                padding: 6px;
-                text-align: left;
-            }
-
-            .payslip-container {
-                page-break-inside: avoid;
-            }
-        ''')
-        base_url = os.path.abspath("app/static")
-
-        # Generate the PDF bytes
-        pdf_bytes = HTML(string=html_content,base_url=base_url).write_pdf(stylesheets=[landscape_css])
-
-        # Return PDF as a StreamingResponse
-        pdf_stream = BytesIO(pdf_bytes)
-        filename = f"payslip_{employee.first_name}_{employee.last_name}_{current_date.strftime('%Y%m%d_%H%M%S')}.pdf"
-        return StreamingResponse(pdf_stream, media_type="application/pdf", headers={
-            "Content-Disposition": f"attachment; filename={filename}"
-        })
+        cache_key = _payslip_cache_key(employee, payrolls, "pdf")
+        cached_response = _cached_payslip_response(cache_key, if_none_match)
+        if cached_response is not None:
+            return cached_response
+
+        summary = get_payroll_totals(db, employee_id)
+        return _store_payslip(cache_key, _render_payslip_pdf(employee, payrolls, summary))
        
         # output_path = f"pdf/payslip_{employee.first_name}_{employee.last_name}_{current_date.strftime('%Y%m%d_%H%M%S')}.pdf"
         # os.makedirs("pdf", exist_ok=True)
@@ -230,141 +420,429 @@ def generate_payslip_pdf(employee_id: int, db: Session) -> StreamingResponse:
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
     
 
-def generate_payslip_excel(db: Session, employee_id: int) -> dict:
-    employee = get_employee_or_404(db, employee_id)
-    payrolls = db.query(Payroll).filter(Payroll.employee_id == employee_id).all()
+_payslip_process_pool: Optional[ProcessPoolExecutor] = None
+
+def get_payslip_process_pool() -> ProcessPoolExecutor:
+    """
+    Lazily start the process pool used for bulk WeasyPrint renders.
+    """
+    global _payslip_process_pool
+    if _payslip_process_pool is None:
+        _payslip_process_pool = ProcessPoolExecutor(
+            max_workers=settings.payslip_pdf_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _payslip_process_pool
+
+def shutdown_payslip_process_pool():
+    global _payslip_process_pool
+    if _payslip_process_pool is not None:
+        _payslip_process_pool.shutdown(wait=False, cancel_futures=True)
+        _payslip_process_pool = None
+
+
+class _ZipChunkBuffer:
+    """
+    Write-only sink for zipfile that hands back whatever was written since the last drain.
+    """
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _stream_payslip_zip(render_jobs: List[tuple]):
+    """
+    Submit every payslip to the process pool and yield ZIP bytes as each render completes.
+    """
+    pool = get_payslip_process_pool()
+    buffer = _ZipChunkBuffer()
+    started = time.perf_counter()
+    rendered = 0
+    errors = []
+
+    with zipfile.ZipFile(buffer, mode="w", compression=zipfile.ZIP_STORED) as archive:
+        futures = {
+            pool.submit(render_payslip_pdf_bytes, html_content): (employee_id, filename)
+            for employee_id, filename, html_content in render_jobs
+        }
+        for future in as_completed(futures):
+            employee_id, filename = futures[future]
+            try:
+                pdf_bytes = future.result()
+            except BrokenProcessPool as e:
+                shutdown_payslip_process_pool()
+                errors.append({"employee_id": employee_id, "error": f"Render worker crashed: {str(e)}"})
+                continue
+            except Exception as e:
+                errors.append({"employee_id": employee_id, "error": str(e)})
+                continue
+
+            archive.writestr(filename, pdf_bytes)
+            rendered += 1
+            yield buffer.drain()
+
+        elapsed = time.perf_counter() - started
+        summary = {
+            "requested": len(render_jobs),
+            "rendered": rendered,
+            "failed": len(errors),
+            "errors": errors,
+            "elapsed_seconds": round(elapsed, 3),
+            "payslips_per_second": round(rendered / elapsed, 2) if elapsed > 0 else None,
+        }
+        archive.writestr("summary.json", json.dumps(summary, indent=2))
+        logger.info(
+            "Bulk payslip run: %d/%d rendered in %.2fs, %d failed",
+            rendered, len(render_jobs), elapsed, len(errors),
+        )
+    yield buffer.drain()
+
+
+def _prepare_bulk_render_jobs(
+    db: Session,
+    start_date: str,
+    end_date: str,
+    employee_ids: Optional[List[int]] = None,
+) -> List[tuple]:
+    payrolls_query = db.query(Payroll).filter(Payroll.date >= start_date, Payroll.date <= end_date)
+    if employee_ids:
+        payrolls_query = payrolls_query.filter(Payroll.employee_id.in_(employee_ids))
+    payrolls = payrolls_query.order_by(Payroll.employee_id, Payroll.date).all()
 
     if not payrolls:
-        raise HTTPException(status_code=404, detail="No payroll records found for this employee.")
+        raise HTTPException(status_code=404, detail="No payroll records found for this period.")
+
+    payrolls_by_employee = {}
+    for payroll in payrolls:
+        payrolls_by_employee.setdefault(payroll.employee_id, []).append(payroll)
+
+    employees = db.query(Employee).filter(Employee.id.in_(payrolls_by_employee.keys())).all()
+    summaries = get_payroll_totals_by_employee(db, list(payrolls_by_employee.keys()), start_date, end_date)
+
+    # Templates are rendered here; only the WeasyPrint layout is shipped to the workers.
+    render_jobs = []
+    for employee in employees:
+        context = build_payslip_context(employee, payrolls_by_employee[employee.id], summaries[employee.id])
+        filename = f"payslip_{employee.id}_{employee.first_name}_{employee.last_name}.pdf"
+        render_jobs.append((employee.id, filename, render_payslip_html(**context)))
+    return render_jobs
+
+def generate_bulk_payslips_pdf(
+    db: Session,
+    start_date: str,
+    end_date: str,
+    employee_ids: Optional[List[int]] = None,
+) -> StreamingResponse:
+    """
+    Render payslips for every employee with payroll in the period and stream them back as a ZIP.
+    """
+    render_jobs = _prepare_bulk_render_jobs(db, start_date, end_date, employee_ids)
+    filename = f"payslips_{start_date}_{end_date}.zip"
+    return StreamingResponse(_stream_payslip_zip(render_jobs), media_type="application/zip", headers={
+        "Content-Disposition": f"attachment; filename={filename}",
+        "X-Payslip-Count": str(len(render_jobs)),
+    })
+
+
+EXCEL_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+LOGO_PATH = os.path.join("app", "static", "images", "company_logo.png")
+COMPANY_NAME = "HODREAL FIT-OUT AND CONSTRUCTION"
+COMPANY_CONTACT = "Batangas City | Contact: 09217292222 | Email: hodrealconstruction@yahoo.com"
+WORKBOOK_STREAM_CHUNK = 64 * 1024
+BOLD = Font(bold=True)
+TITLE_FONT = Font(bold=True, size=14)
+CONTACT_FONT = Font(size=10)
+LEFT = Alignment(horizontal='left')
+
+@lru_cache(maxsize=1)
+def _logo_bytes() -> Optional[bytes]:
     try:
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Payslip"
+        with open(LOGO_PATH, "rb") as f:
+            return f.read()
+    except OSError:
+        return None  # Logo optional, continue without crashing
 
-        logo_path = os.path.join("app", "static", "images", "company_logo.png")
-        try:
-            img = ExcelImage(logo_path)
-            img.width = 120
-            img.height = 80
-            ws.add_image(img, 'A1')
-        except Exception:
-            pass  # Logo optional, continue without crashing
-
-        ws.merge_cells('C1:G1')
-        ws['C1'] = "HODREAL FIT-OUT AND CONSTRUCTION"
-        ws['C1'].alignment = Alignment(horizontal='left')
-        ws['C1'].font = Font(bold=True, size=14)
-
-        ws.merge_cells('C2:J2')
-        ws['C2'] = "Batangas City | Contact: 09217292222 | Email: hodrealconstruction@yahoo.com"
-        ws['C2'].alignment = Alignment(horizontal='left')
-        ws['C2'].font = Font(size=10)
-
-        row_offset = 5
-        ws.merge_cells(f'A{row_offset}:F{row_offset}')
-        ws[f'A{row_offset}'] = f"Employee: {employee.first_name} {employee.last_name}"
-        ws[f'A{row_offset}'].font = Font(bold=True)
-
-        ws.merge_cells(f'A{row_offset + 1}:F{row_offset + 1}')
-        ws[f'A{row_offset + 1}'] = f"Position: {employee.position}"
-        ws[f'A{row_offset + 1}'].font = Font(bold=True)
-
-        pay_period_from = min([p.date for p in payrolls])
-        pay_period_to = max([p.date for p in payrolls])
-
-        ws.merge_cells(f'A{row_offset + 2}:F{row_offset + 2}')
-        ws[f'A{row_offset + 2}'] = f"Pay Period: {pay_period_from} - {pay_period_to}"
-        ws[f'A{row_offset + 2}'].font = Font(bold=True)
-
-        ws.merge_cells(f'A{row_offset + 3}:F{row_offset + 3}')
-        ws[f'A{row_offset + 3}'] = f"Date Generated: {datetime.now().strftime('%Y-%m-%d')}"
-        ws[f'A{row_offset + 3}'].font = Font(bold=True)
-
-        daily_rate = employee.salary
-        ws.merge_cells(f'A{row_offset + 4}:F{row_offset + 4}')
-        ws[f'A{row_offset + 4}'] = f"Daily Rate: {daily_rate}"
-        ws[f'A{row_offset + 4}'].font = Font(bold=True)
-
-        row_offset += 7
-
-        headers = ["Date", "Overtime", "Night Diff", "Allowance", "Deductions", "Net Salary"]
-        for col_num, header in enumerate(headers, 1):
-            ws.cell(row=row_offset, column=col_num, value=header).font = Font(bold=True)
-
-        for payroll in payrolls:
-            row_offset += 1
-            ws.append([
-                payroll.date.strftime("%Y-%m-%d"),
-                round(payroll.overtime_pay, 2),
-                round(payroll.night_differential_pay, 2),
-                round(payroll.allowance, 2),
-                round(payroll.deductions, 2),
-                round(payroll.net_salary, 2),
-            ])
-
-        total_hours = sum(float(p.total_hours_worked or 0) for p in payrolls)
-        total_ot = sum(float(p.overtime_pay or 0) for p in payrolls)
-        total_nd = sum(float(p.night_differential_pay or 0) for p in payrolls)
-        total_allowance = sum(float(p.allowance or 0) for p in payrolls)
-        total_deductions = sum(float(p.deductions or 0) for p in payrolls)
-        total_gross = sum(float(p.subtotal or 0) for p in payrolls)
-        total_net = sum(float(p.net_salary or 0) for p in payrolls)
-
-        row_offset += 2
-        summary_data = [
-            ("Total Hours Worked", total_hours),
-            ("Total Overtime Pay", total_ot),
-            ("Total Night Differential Pay", total_nd),
-            ("Total Allowance", total_allowance),
-            ("Total Deductions", total_deductions),
-            ("Total Gross Salary", total_gross),
-            ("Total Net Salary", total_net),
-        ]
-
-        for label, value in summary_data:
-            ws[f'A{row_offset}'] = f"{label}: {value}"
-            row_offset += 1
-
-        # folder_path = "excel"
-        # os.makedirs(folder_path, exist_ok=True)
-
-        # Generate the file name
-        # filename = f"payslip_{employee.first_name}_{employee.last_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-        # file_path = os.path.join(folder_path, filename)
-
-        # Save the file to the folder
-        # wb.save(file_path)
+def _logo_image() -> Optional[ExcelImage]:
+    """
+    A fresh openpyxl image for one sheet, built from the logo bytes read once per process.
+    """
+    data = _logo_bytes()
+    if data is None:
+        return None
+    img = ExcelImage(BytesIO(data))
+    img.width = 120
+    img.height = 80
+    return img
+
+def _styled(ws, value, **style) -> WriteOnlyCell:
+    cell = WriteOnlyCell(ws, value=value)
+    for name, attribute in style.items():
+        setattr(cell, name, attribute)
+    return cell
+
+def _write_company_header(ws, logo: Optional[ExcelImage]):
+    # rows 1-4: logo at A1, company name and contact line beside it
+    if logo is not None:
+        ws.add_image(logo, 'A1')
+    ws.merged_cells.add('C1:G1')
+    ws.append([None, None, _styled(ws, COMPANY_NAME, font=TITLE_FONT, alignment=LEFT)])
+    ws.merged_cells.add('C2:J2')
+    ws.append([None, None, _styled(ws, COMPANY_CONTACT, font=CONTACT_FONT, alignment=LEFT)])
+    ws.append([])
+    ws.append([])
+
+def _write_payslip_sheet(ws, employee: Employee, payrolls: Iterable, summary: dict):
+    """
+    Lay out one payslip on a write-only sheet, top to bottom in a single pass. Totals come from
+    summary (payroll_aggregates), so payrolls may be a one-shot iterator of rows.
+    """
+    _write_company_header(ws, _logo_image())
+
+    details = [
+        f"Employee: {employee.first_name} {employee.last_name}",
+        f"Position: {employee.position}",
+        f"Pay Period: {summary['period_from']} - {summary['period_to']}",
+        f"Date Generated: {datetime.now().strftime('%Y-%m-%d')}",
+        f"Daily Rate: {employee.salary}",
+    ]
+    for row, text in enumerate(details, start=5):
+        ws.merged_cells.add(f'A{row}:F{row}')
+        ws.append([_styled(ws, text, font=BOLD)])
+    ws.append([])
+    ws.append([])
+
+    headers = ["Date", "Overtime", "Night Diff", "Allowance", "Deductions", "Net Salary"]
+    ws.append([_styled(ws, header, font=BOLD) for header in headers])
+    for payroll in payrolls:
+        ws.append([
+            payroll.date.strftime("%Y-%m-%d"),
+            round(payroll.overtime_pay, 2),
+            round(payroll.night_differential_pay, 2),
+            round(payroll.allowance, 2),
+            round(payroll.deductions, 2),
+            round(payroll.net_salary, 2),
+        ])
+    ws.append([])
+
+    totals = summary["totals"]
+    summary_data = [
+        ("Total Hours Worked", totals["total_hours_worked"]),
+        ("Total Overtime Pay", totals["overtime_pay"]),
+        ("Total Night Differential Pay", totals["night_differential_pay"]),
+        ("Total Allowance", totals["allowance"]),
+        ("Total Deductions", totals["deductions"]),
+        ("Total Gross Salary", totals["gross_salary"]),
+        ("Total Net Salary", totals["net_salary"]),
+    ]
+    for label, value in summary_data:
+        ws.append([f"{label}: {value}"])
 
-        # return {
-        #     "success": True,
-        #     "message": "Payslip Excel file generated successfully.",
-        #     "filename": filename,
-        #     "path": file_path
-        # }
+def _render_payslip_excel(employee: Employee, payrolls: List[Payroll], summary: dict) -> CachedPayslip:
+    wb = Workbook(write_only=True)
+    _write_payslip_sheet(wb.create_sheet("Payslip"), employee, payrolls, summary)
 
-        # Write to buffer
-        output = BytesIO()
+    output = BytesIO()
+    with Span("openpyxl_save"):
         wb.save(output)
-        output.seek(0)
 
-        filename = f"payslip_{employee.first_name}_{employee.last_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-        headers = {
-            "Content-Disposition": f"attachment; filename={filename}"
-        }
+    filename = f"payslip_{employee.first_name}_{employee.last_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+    return CachedPayslip(output.getvalue(), EXCEL_MEDIA_TYPE, filename)
+
+# Columns of the workbook summary sheet: (header, payroll_aggregates total)
+WORKBOOK_SUMMARY_COLUMNS = [
+    ("Hours Worked", "total_hours_worked"),
+    ("Overtime Pay", "overtime_pay"),
+    ("Night Differential Pay", "night_differential_pay"),
+    ("Allowance", "allowance"),
+    ("Deductions", "deductions"),
+    ("Gross Salary", "gross_salary"),
+    ("Net Salary", "net_salary"),
+]
+INVALID_SHEET_TITLE_CHARS = re.compile(r"[\[\]:*?/\\]")
+
+def _sheet_title(employee: Employee) -> str:
+    # Excel sheet names: at most 31 characters, none of []:*?/\ ; the id keeps them unique
+    title = f"{employee.id} {employee.last_name}, {employee.first_name}"
+    return INVALID_SHEET_TITLE_CHARS.sub("_", title)[:31]
+
+def _write_finished_sheet(write, ws, *args, **kwargs):
+    # closing a write-only sheet flushes it to its temp file and frees its XML writer; otherwise
+    # every sheet of the workbook keeps one open until save
+    write(ws, *args, **kwargs)
+    ws.close()
+
+def _write_workbook_summary_sheet(ws, employees: dict, summaries: dict, start_date: str, end_date: str):
+    _write_company_header(ws, _logo_image())
+    ws.append([_styled(ws, f"Payroll Summary: {start_date} - {end_date}", font=BOLD)])
+    ws.append([f"Date Generated: {datetime.now().strftime('%Y-%m-%d')}"])
+    ws.append([])
+    ws.append([_styled(ws, header, font=BOLD) for header in ["Employee ID", "Name", "Position", "Days"] + [h for h, _ in WORKBOOK_SUMMARY_COLUMNS]])
+
+    company = {name: Decimal(0) for _, name in WORKBOOK_SUMMARY_COLUMNS}
+    days = 0
+    for employee_id, summary in summaries.items():
+        employee = employees[employee_id]
+        totals = summary["totals"]
+        ws.append(
+            [employee.id, f"{employee.first_name} {employee.last_name}", employee.position, summary["row_count"]]
+            + [totals[name] for _, name in WORKBOOK_SUMMARY_COLUMNS]
+        )
+        days += summary["row_count"]
+        for _, name in WORKBOOK_SUMMARY_COLUMNS:
+            company[name] += totals[name]
+    ws.append([])
+    ws.append(
+        [_styled(ws, "Total", font=BOLD), None, None, _styled(ws, days, font=BOLD)]
+        + [_styled(ws, company[name], font=BOLD) for _, name in WORKBOOK_SUMMARY_COLUMNS]
+    )
+
+def build_payroll_workbook(
+    db: Session,
+    start_date: str,
+    end_date: str,
+    employee_ids: Optional[List[int]] = None,
+):
+    """
+    One workbook for a pay period: a Summary sheet, then one payslip sheet per employee.
+    Payroll rows are streamed from the database in (employee_id, date) order and written straight
+    into write-only sheets, which openpyxl spools to disk; the finished .xlsx goes to a temporary
+    file. Returns that file, rewound; the caller closes it.
+    """
+    summaries = get_payroll_totals_by_employee(db, employee_ids, start_date, end_date)
+    if not summaries:
+        raise HTTPException(status_code=404, detail="No payroll records found for the selected period.")
+    summaries = dict(sorted(summaries.items()))
+    employees = {
+        employee.id: employee
+        for employee in db.query(Employee).filter(Employee.id.in_(list(summaries)))
+    }
 
-        return StreamingResponse(output, media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", headers=headers)
-    except Exception as e:      
-        raise HTTPException(status_code=500, detail=f"An error occurred while generating the payslip: {str(e)}")
+    wb = Workbook(write_only=True)
+    _write_finished_sheet(_write_workbook_summary_sheet, wb.create_sheet("Summary"), employees, summaries, start_date, end_date)
 
+    query = (
+        select(
+            Payroll.employee_id, Payroll.date, Payroll.overtime_pay, Payroll.night_differential_pay,
+            Payroll.allowance, Payroll.deductions, Payroll.net_salary,
+        )
+        .where(Payroll.date >= start_date, Payroll.date <= end_date)
+    )
+    if employee_ids:
+        query = query.where(Payroll.employee_id.in_(employee_ids))
+    rows = db.execute(
+        query.order_by(Payroll.employee_id, Payroll.date)
+        .execution_options(yield_per=settings.export_batch_size)
+    )
+    for employee_id, payrolls in groupby(rows, key=attrgetter("employee_id")):
+        employee = employees[employee_id]
+        _write_finished_sheet(
+            _write_payslip_sheet, wb.create_sheet(_sheet_title(employee)), employee, payrolls, summaries[employee_id],
+        )
 
-from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
+    output = tempfile.TemporaryFile()
+    try:
+        with Span("openpyxl_save"):
+            wb.save(output)
+    except Exception:
+        output.close()
+        raise
+    output.seek(0)
+    return output
 
-from io import BytesIO
-from typing import List
+def _iter_file(file, chunk_size: int = WORKBOOK_STREAM_CHUNK):
+    try:
+        while chunk := file.read(chunk_size):
+            yield chunk
+    finally:
+        file.close()
 
-import pandas as pd
+def generate_payroll_workbook(
+    db: Session,
+    start_date: str,
+    end_date: str,
+    employee_ids: Optional[List[int]] = None,
+) -> StreamingResponse:
+    output = build_payroll_workbook(db, start_date, end_date, employee_ids)
+    size = os.fstat(output.fileno()).st_size
+    return StreamingResponse(_iter_file(output), media_type=EXCEL_MEDIA_TYPE, headers={
+        "Content-Disposition": f"attachment; filename=payroll_{start_date}_{end_date}.xlsx",
+        "Content-Length": str(size),
+    })
+
+def generate_payslip_excel(db: Session, employee_id: int, if_none_match: Optional[str] = None) -> Response:
+    employee = get_employee_or_404(db, employee_id)
+    payrolls = db.query(Payroll).filter(Payroll.employee_id == employee_id).all()
+
+    if not payrolls:
+        raise HTTPException(status_code=404, detail="No payroll records found for this employee.")
+
+    cache_key = _payslip_cache_key(employee, payrolls, "xlsx")
+    cached_response = _cached_payslip_response(cache_key, if_none_match)
+    if cached_response is not None:
+        return cached_response
+    try:
+        summary = get_payroll_totals(db, employee_id)
+        return _store_payslip(cache_key, _render_payslip_excel(employee, payrolls, summary))
+    except Exception as e:      
+        raise HTTPException(status_code=500, detail=f"An error occurred while generating the payslip: {str(e)}")
 
+def build_payslip_artifact(db: Session, employee_id: int, fmt: str) -> CachedPayslip:
+    """
+    Render (or fetch from the cache) one employee's payslip as bytes, for callers outside a request.
+    """
+    employee = get_employee_or_404(db, employee_id)
+    payrolls = db.query(Payroll).filter(Payroll.employee_id == employee_id).all()
+    if not payrolls:
+        raise HTTPException(status_code=404, detail="No payroll records found for this employee.")
 
+    cache_key = _payslip_cache_key(employee, payrolls, fmt)
+    if settings.payslip_cache_enabled:
+        artifact = payslip_cache.get(cache_key)
+        if artifact is not None:
+            return artifact
+
+    summary = get_payroll_totals(db, employee_id)
+    if fmt == "pdf":
+        artifact = _render_payslip_pdf(employee, payrolls, summary)
+    elif fmt == "xlsx":
+        artifact = _render_payslip_excel(employee, payrolls, summary)
+    else:
+        raise HTTPException(status_code=400, detail=f"Unsupported payslip format: {fmt}")
+    if settings.payslip_cache_enabled:
+        payslip_cache.put(cache_key, artifact)
+    return artifact
+
+def build_bulk_payslips_zip(
+    db: Session,
+    start_date: str,
+    end_date: str,
+    employee_ids: Optional[List[int]] = None,
+) -> SpooledArtifact:
+    """
+    The bulk payslip ZIP written to a temporary file, as the period workbook is, instead of memory.
+    The caller deletes the file.
+    """
+    render_jobs = _prepare_bulk_render_jobs(db, start_date, end_date, employee_ids)
+    with tempfile.NamedTemporaryFile(suffix=".zip", delete=False) as output:
+        try:
+            for chunk in _stream_payslip_zip(render_jobs):
+                output.write(chunk)
+        except BaseException:
+            output.close()
+            os.remove(output.name)
+            raise
+    return SpooledArtifact(output.name, "application/zip", f"payslips_{start_date}_{end_date}.zip")
 
 REQUIRED_COLUMNS = [
     'employee_id', 'allowance', 'total_hours_worked', 'overtime_pay',
@@ -373,77 +851,379 @@ REQUIRED_COLUMNS = [
     'time_in', 'time_out', 'project'
 ]
 
+NUMERIC_COLUMNS = [
+    'allowance', 'total_hours_worked', 'overtime_pay', 'overtime_hour', 'night_differential_pay',
+    'night_differential_hour', 'deductions', 'subtotal', 'net_salary'
+]
+
+EMPLOYEE_ID_QUERY_BATCH = 5000
+
 def fill_missing_values(df: pd.DataFrame) -> pd.DataFrame:
-    for column in df.columns:
-        for index, value in df[column].items():
-            if pd.isna(value):
-                if column in ['allowance', 'total_hours_worked',
-                              'overtime_pay', 'overtime_hour', 'night_differential_pay',
-                              'night_differential_hour', 'deductions', 'subtotal', 'net_salary']:
-                    df.at[index, column] = Decimal('0.00')
-                else:
-                    df.at[index, column] = ''
+    numeric_columns = [c for c in df.columns if c in NUMERIC_COLUMNS]
+    other_columns = [c for c in df.columns if c not in NUMERIC_COLUMNS]
+    df[numeric_columns] = df[numeric_columns].fillna(0.0)
+    df[other_columns] = df[other_columns].astype(object).where(df[other_columns].notna(), '')
     return df
 
-async def batch_upload_payroll(db: Session, excel_file: UploadFile = File(...))-> dict:
+def get_existing_employee_ids(db: Session, employee_ids) -> set:
+    """
+    Set-based existence check for the employee ids referenced by an upload.
+    """
+    employee_ids = list(employee_ids)
+    existing = set()
+    for start in range(0, len(employee_ids), EMPLOYEE_ID_QUERY_BATCH):
+        batch = employee_ids[start:start + EMPLOYEE_ID_QUERY_BATCH]
+        existing.update(db.execute(select(Employee.id).where(Employee.id.in_(batch))).scalars())
+    return existing
+
+def _parse_time_column(column: pd.Series) -> pd.Series:
+    # Cells arrive as datetime.time/datetime objects or "HH:MM:SS" strings; keep the clock part.
+    clock = column.astype(str).str.extract(r"(\d{1,2}:\d{2}:\d{2})$", expand=False)
+    return pd.to_timedelta(clock, errors='coerce')
+
+def _to_python_datetimes(column: pd.Series) -> pd.Series:
+    values = column.to_numpy().astype('datetime64[us]').tolist()
+    return pd.Series(values, index=column.index, dtype=object)
+
+def prepare_payroll_records(db: Session, df: pd.DataFrame) -> tuple:
+    """
+    Validate and convert an upload frame column-wise. The frame's index is each row's position
+    below the header (as read_excel numbers them), so error row numbers match the spreadsheet.
+    Returns (records ready for insert, row errors).
+    """
+    df = fill_missing_values(df.copy())
+    row_numbers = df.index.to_numpy() + 2  # header is spreadsheet row 1
+    error_messages = pd.Series('', index=df.index, dtype=object)
+
+    def flag(mask: pd.Series, message):
+        nonlocal error_messages
+        mask = mask & (error_messages == '')
+        if mask.any():
+            error_messages = error_messages.mask(mask, message if isinstance(message, str) else message[mask])
+
+    employee_ids = pd.to_numeric(df['employee_id'], errors='coerce')
+    flag(employee_ids.isna() | (employee_ids % 1 != 0), "Invalid or missing employee_id.")
+    valid_ids = employee_ids.dropna()
+    existing_ids = get_existing_employee_ids(db, valid_ids.astype('int64').unique().tolist())
+    unknown = employee_ids.notna() & ~employee_ids.isin(existing_ids)
+    flag(unknown, "Employee with ID " + employee_ids.astype(str).str.removesuffix('.0') + " does not exist.")
+
+    amounts = {}
+    for column in NUMERIC_COLUMNS:
+        amounts[column] = pd.to_numeric(df[column], errors='coerce')
+        flag(amounts[column].isna(), f"Invalid number in column {column}.")
+
+    dates = pd.to_datetime(df['date'], errors='coerce').dt.normalize()
+    flag(dates.isna(), "Invalid date.")
+    time_in = dates + _parse_time_column(df['time_in'])
+    time_out = dates + _parse_time_column(df['time_out'])
+    flag(time_in.isna(), "Invalid time_in, expected HH:MM:SS.")
+    flag(time_out.isna(), "Invalid time_out, expected HH:MM:SS.")
+
+    invalid = error_messages != ''
+    errors = [
+        {"row": int(row), "error": message}
+        for row, message in zip(row_numbers[invalid.to_numpy()], error_messages[invalid])
+    ]
+
+    valid = ~invalid
+    if not valid.any():
+        return [], errors
+
+    frame = pd.DataFrame({column: amounts[column][valid].astype(float) for column in NUMERIC_COLUMNS})
+    frame['employee_id'] = employee_ids[valid].astype('int64')
+    frame['deduction_remarks'] = df['deduction_remarks'][valid].astype(str)
+    frame['project'] = df['project'][valid].astype(str)
+    frame['date'] = dates[valid].dt.date
+    frame['time_in'] = _to_python_datetimes(time_in[valid])
+    frame['time_out'] = _to_python_datetimes(time_out[valid])
+    frame['created_at'] = pd.Series([datetime.now()] * len(frame), index=frame.index, dtype=object)
+
+    return frame.to_dict('records'), errors
+
+UPLOAD_MODES = ("insert", "upsert", "skip")
+
+# Columns an upsert overwrites; the conflict key and creation metadata are kept.
+UPSERT_COLUMNS = [
+    'time_in', 'time_out', 'total_hours_worked', 'deductions', 'subtotal', 'net_salary',
+    'deduction_remarks', 'project', 'overtime_pay', 'overtime_hour', 'night_differential_pay',
+    'night_differential_hour', 'allowance',
+]
+
+def _dialect_insert(db: Session):
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    elif dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        raise HTTPException(status_code=400, detail=f"Upsert uploads are not supported on {dialect}.")
+    return dialect_insert
+
+def get_existing_payroll_keys(db: Session, records: List[dict]) -> set:
+    """
+    (employee_id, date) pairs from records that already exist, found with one range query per id batch.
+    """
+    employee_ids = sorted({r["employee_id"] for r in records})
+    dates = [r["date"] for r in records]
+    wanted = {(r["employee_id"], r["date"]) for r in records}
+    existing = set()
+    for start in range(0, len(employee_ids), EMPLOYEE_ID_QUERY_BATCH):
+        batch = employee_ids[start:start + EMPLOYEE_ID_QUERY_BATCH]
+        rows = db.execute(
+            select(Payroll.employee_id, Payroll.date)
+            .where(Payroll.employee_id.in_(batch), Payroll.date >= min(dates), Payroll.date <= max(dates))
+        )
+        existing.update(key for key in rows.tuples() if key in wanted)
+    return existing
+
+def split_conflicting_records(db: Session, records: List[dict], rows: List[int]) -> tuple:
+    """
+    For insert mode: set aside rows whose (employee_id, date) already exists or repeats an earlier
+    row of the same batch, so the rest can still be inserted.
+    Returns (insertable records, one error per conflicting row).
+    """
+    existing = get_existing_payroll_keys(db, records) if records else set()
+    seen = set()
+    insertable, errors = [], []
+    for record, row in zip(records, rows):
+        key = (record["employee_id"], record["date"])
+        if key in existing:
+            errors.append({"row": row, "error": "Payroll record already exists for this employee on that date."})
+        elif key in seen:
+            errors.append({"row": row, "error": "Duplicates an earlier row for this employee and date."})
+        else:
+            seen.add(key)
+            insertable.append(record)
+    return insertable, errors
+
+def insert_payroll_records(db: Session, records: List[dict], mode: str = "insert") -> dict:
+    """
+    Write prepared payroll rows with bulk statements and return inserted/updated/skipped counts.
+    insert fails on an existing (employee_id, date); upsert overwrites it and skip leaves it alone,
+    both through INSERT ... ON CONFLICT on the unique_employee_date constraint.
+    """
+    counts = {"inserted": 0, "updated": 0, "skipped": 0}
+    if not records:
+        return counts
+    if mode not in UPLOAD_MODES:
+        raise HTTPException(status_code=400, detail=f"Invalid upload mode: {mode}. Allowed values are {list(UPLOAD_MODES)}")
+
+    if mode == "insert":
+        db.execute(insert(Payroll), records)
+        counts["inserted"] = len(records)
+        return counts
+
+    # One statement cannot touch the same key twice; the last row for a key wins.
+    unique_records = list({(r["employee_id"], r["date"]): r for r in records}.values())
+    counts["skipped"] += len(records) - len(unique_records)
+
+    existing = get_existing_payroll_keys(db, unique_records)
+    statement = _dialect_insert(db)(Payroll)
+    if mode == "upsert":
+        statement = statement.on_conflict_do_update(
+            index_elements=["employee_id", "date"],
+            set_={**{column: statement.excluded[column] for column in UPSERT_COLUMNS}, "version": Payroll.version + 1},
+        )
+        counts["updated"] += len(existing)
+    else:
+        statement = statement.on_conflict_do_nothing(index_elements=["employee_id", "date"])
+        counts["skipped"] += len(existing)
+    db.execute(statement, unique_records)
+    counts["inserted"] += len(unique_records) - len(existing)
+    return counts
+
+async def batch_upload_payroll(db: Session, excel_file: UploadFile = File(...), mode: str = "insert")-> dict:
     """
     Upload an Excel file and batch insert payroll records.
     """
     try:
         content = await excel_file.read()
-        df = pd.read_excel(BytesIO(content), engine='openpyxl')
+        with Span("pandas_parse"):
+            df = pd.read_excel(BytesIO(content), engine='openpyxl')
 
         # Validate required columns
         for column in REQUIRED_COLUMNS:
             if column not in df.columns:
                 raise HTTPException(status_code=400, detail=f"Missing required column: {column}")
 
-        df = fill_missing_values(df)
+        with Span("upload_validate"):
+            records, errors = prepare_payroll_records(db, df)
+        if errors:
+            first = errors[0]
+            status_code = 404 if "does not exist" in first["error"] else 400
+            raise HTTPException(status_code=status_code, detail=f"Error processing row {first['row']}: {first['error']}")
+
+        counts = insert_payroll_records(db, records, mode)
+        refresh_payroll_rollups(db, ((r["employee_id"], r["date"]) for r in records))
+        if records:
+            db.execute(bump_table_version("payroll"))
+        db.commit()
+        payslip_cache.invalidate_employees(r["employee_id"] for r in records)
 
-        payroll_records = []
+        return {
+            "success": True,
+            "message": f"{counts['inserted'] + counts['updated']} payroll records uploaded.",
+            **counts,
+        }
 
-        for _, row in df.iterrows():
-            employee = db.query(Employee).filter_by(id=row['employee_id']).first()
-            if not employee:
-                raise HTTPException(status_code=404, detail=f"Employee with ID {row['employee_id']} does not exist.")
+    except IntegrityError as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=400,
+            detail=f"Payroll record already exists for this employee on that date; use mode=upsert or mode=skip. ({str(e.orig)})",
+        )
 
-            try:
-                time_in = pd.to_datetime(row['time_in'], format='%H:%M:%S').time()
-                time_out = pd.to_datetime(row['time_out'], format='%H:%M:%S').time()
-                date_value = pd.to_datetime(row['date']).date()
-
-                payroll = Payroll(
-                    employee_id=row['employee_id'],
-                    allowance=row['allowance'],
-                    total_hours_worked=row['total_hours_worked'],
-                    overtime_pay=row['overtime_pay'],
-                    overtime_hour=row['overtime_hour'],
-                    night_differential_pay=row['night_differential_pay'],
-                    night_differential_hour=row['night_differential_hour'],
-                    deductions=row['deductions'],
-                    deduction_remarks=row.get('deduction_remarks', ''),
-                    subtotal=row['subtotal'],
-                    net_salary=row['net_salary'],
-                    date=date_value,
-                    time_in=datetime.combine(date_value, time_in),
-                    time_out=datetime.combine(date_value, time_out),
-                    project=row.get('project', ''),
-                    created_at= datetime.now()
-                )
+    except HTTPException:
+        db.rollback()
+        raise
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
 
-                payroll_records.append(payroll)
+UPLOAD_SPOOL_BLOCK = 1024 * 1024
 
-            except Exception as e:
-                raise HTTPException(status_code=400, detail=f"Error processing row: {str(e)}")
+async def spool_upload_to_disk(upload: UploadFile) -> str:
+    """
+    Copy an upload to a temporary file in fixed-size blocks so it is never held in memory whole.
+    """
+    suffix = os.path.splitext(upload.filename or "")[1].lower() or ".xlsx"
+    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as spool:
+        try:
+            while True:
+                block = await upload.read(UPLOAD_SPOOL_BLOCK)
+                if not block:
+                    break
+                spool.write(block)
+        except BaseException:
+            spool.close()
+            os.remove(spool.name)
+            raise
+        return spool.name
+
+def _iter_upload_rows(path: str):
+    """
+    Yield the header and then each data row of a spooled .xlsx (read-only mode) or .csv file.
+    """
+    if path.endswith(".csv"):
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            for row in csv.reader(f):
+                yield [value if value != '' else None for value in row]
+        return
 
-        db.bulk_save_objects(payroll_records)
-        db.commit()
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[0]
+        for row in ws.iter_rows(values_only=True):
+            yield list(row)
+    finally:
+        wb.close()
 
-        return {"success": True, "message": f"{len(payroll_records)} payroll records uploaded."}
+def _iter_upload_chunks(path: str, chunk_size: int):
+    """
+    Yield DataFrames of at most chunk_size rows; raises 400 on a bad header. Blank rows are
+    dropped, and each frame's index keeps the source position of its rows (0 = first row below
+    the header), as prepare_payroll_records expects.
+    """
+    rows = _iter_upload_rows(path)
+    header = next(rows, None)
+    header = [str(column).strip() if column is not None else '' for column in (header or [])]
+    for column in REQUIRED_COLUMNS:
+        if column not in header:
+            raise HTTPException(status_code=400, detail=f"Missing required column: {column}")
+
+    width = len(header)
+    chunk = []
+    positions = []
+    for position, row in enumerate(rows):
+        if all(value is None for value in row):
+            continue
+        chunk.append((row + [None] * width)[:width])
+        positions.append(position)
+        if len(chunk) >= chunk_size:
+            yield pd.DataFrame(chunk, columns=header, index=positions)
+            chunk = []
+            positions = []
+    if chunk:
+        yield pd.DataFrame(chunk, columns=header, index=positions)
+
+def ingest_payroll_file(db: Session, path: str, chunk_size: int, mode: str = "insert") -> dict:
+    """
+    Validate, insert and commit a spooled payroll file chunk by chunk.
+    Bad rows are skipped and reported instead of aborting the upload.
+    """
+    max_errors = settings.upload_max_reported_errors
+    chunks = []
+    errors = []
+    totals = {"inserted": 0, "updated": 0, "skipped": 0}
+    total_rows = failed = 0
+
+    for index, df in enumerate(timed_iter("pandas_parse", _iter_upload_chunks(path, chunk_size))):
+        first_row = int(df.index[0]) + 2
+        with Span("upload_validate"):
+            records, row_errors = prepare_payroll_records(db, df)
+            if mode == "insert":
+                # prepared records keep spreadsheet order, minus the rows that failed validation
+                invalid_rows = {error["row"] for error in row_errors}
+                record_rows = [row for row in (int(i) + 2 for i in df.index) if row not in invalid_rows]
+                records, conflicts = split_conflicting_records(db, records, record_rows)
+                row_errors = sorted(row_errors + conflicts, key=lambda error: error["row"])
+        chunk_counts = {"inserted": 0, "updated": 0, "skipped": 0}
+        try:
+            chunk_counts = insert_payroll_records(db, records, mode)
+            refresh_payroll_rollups(db, ((r["employee_id"], r["date"]) for r in records))
+            if records:
+                db.execute(bump_table_version("payroll"))
+            db.commit()
+            payslip_cache.invalidate_employees(r["employee_id"] for r in records)
+        except IntegrityError as e:
+            # only a concurrent writer can get here in insert mode: the conflicts were split off above
+            db.rollback()
+            row_errors.append({
+                "row": first_row,
+                "error": f"Chunk rejected, a row duplicates an existing payroll record: {str(e.orig)}",
+            })
+
+        chunk_failed = len(df) - sum(chunk_counts.values())
+        total_rows += len(df)
+        failed += chunk_failed
+        for key, value in chunk_counts.items():
+            totals[key] += value
+        errors.extend(row_errors[:max(max_errors - len(errors), 0)])
+        chunks.append({
+            "chunk": index + 1,
+            "first_row": first_row,
+            "rows": len(df),
+            **chunk_counts,
+            "failed": chunk_failed,
+        })
 
+    return {
+        "success": True,
+        "message": f"{totals['inserted'] + totals['updated']} of {total_rows} payroll records uploaded.",
+        "total_rows": total_rows,
+        **totals,
+        "failed": failed,
+        "chunks": chunks,
+        "errors": errors,
+        "errors_truncated": failed > 0 and len(errors) >= max_errors,
+    }
+
+async def stream_upload_payroll(db: Session, excel_file: UploadFile, chunk_size: Optional[int] = None, mode: str = "insert") -> dict:
+    """
+    Constant-memory upload: spool to disk, then parse and commit in chunks off the event loop.
+    """
+    path = await spool_upload_to_disk(excel_file)
+    try:
+        return await run_in_threadpool(ingest_payroll_file, db, path, chunk_size or settings.upload_chunk_size, mode)
+    except HTTPException:
+        db.rollback()
+        raise
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
+    finally:
+        os.remove(path)
     
     
 def download_payroll_template():
@@ -461,7 +1241,7 @@ def download_payroll_template():
 
     # Write Excel to in-memory buffer
     output = BytesIO()
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
+    with Span("openpyxl_save"), pd.ExcelWriter(output, engine='openpyxl') as writer:
         df.to_excel(writer, index=False, sheet_name='Payroll Template')
 
     output.seek(0)
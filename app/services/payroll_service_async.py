@@ -0,0 +1,150 @@
+from typing import Optional
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.engine import Row
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.models.payroll import Payroll
+from app.schemas.payroll import PayrollResponse, PayrollCreate, PayrollUpdate
+from app.services.payroll_aggregates import payroll_totals_query, totals_summary
+from app.services.payroll_service import (
+    payroll_page_query,
+    payroll_page,
+    payroll_by_id_query,
+    employee_payrolls_query,
+)
+from app.services.employee_cache import employee_cache
+from app.services.employee_service import employee_by_id_query
+from app.services.payslip_cache import payslip_cache
+from app.services.rollup_service import refresh_payroll_rollups
+from app.services.serialization import to_response, to_responses
+from app.services.versioning import bump_table_version, table_version_query, row_version_query, row_etag, list_etag
+
+# AsyncSession versions of the payroll CRUD functions in payroll_service, used when DB_ASYNC is on.
+# Rollup refreshes are pandas code on a sync Session, so they run through AsyncSession.run_sync.
+
+async def get_employee_or_404(db: AsyncSession, employee_id: int) -> Row:
+    if not settings.employee_cache_enabled:
+        employee = (await db.execute(employee_by_id_query(employee_id))).first()
+    else:
+        employee = employee_cache.get(employee_id)
+        if employee is None:
+            token = employee_cache.token()
+            employee = (await db.execute(employee_by_id_query(employee_id))).first()
+            if employee:
+                employee_cache.put(employee_id, employee, token)
+    if not employee:
+        raise HTTPException(status_code=404, detail=f"Employee with ID {employee_id} not found")
+    return employee
+
+async def _get_payroll(db: AsyncSession, payroll_id: int) -> Optional[Payroll]:
+    return (await db.execute(select(Payroll).where(Payroll.id == payroll_id))).scalar_one_or_none()
+
+async def get_all_payrolls(
+    db: AsyncSession,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    employee_id: Optional[int] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    project: Optional[str] = None,
+    fields: Optional[str] = None,
+) -> dict:
+    query, selected, limit = payroll_page_query(limit, cursor, employee_id, start_date, end_date, project, fields)
+    rows = (await db.execute(query)).all()
+    return payroll_page(rows, selected, limit)
+
+async def payroll_etag(db: AsyncSession, payroll_id: int) -> Optional[str]:
+    return row_etag("payroll", payroll_id, (await db.execute(row_version_query(Payroll, payroll_id))).scalar())
+
+async def payroll_list_etag(db: AsyncSession, query_string: str) -> Optional[str]:
+    return list_etag("payroll", (await db.execute(table_version_query("payroll"))).scalar(), query_string)
+
+async def get_payroll_by_id(db: AsyncSession, payroll_id: int) -> dict:
+    payroll = (await db.execute(payroll_by_id_query(payroll_id))).first()
+    if not payroll:
+        return {"success": False, "error": "Payroll record not found", "code": 404}
+    return {"success": True, "payroll": to_response(PayrollResponse, payroll)}
+
+async def generate_payroll(db: AsyncSession, payroll_data: PayrollCreate, employee_id: int) -> dict:
+    await get_employee_or_404(db, employee_id)
+    try:
+        new_payroll = Payroll(**payroll_data.model_dump())
+        db.add(new_payroll)
+        await db.flush()
+        await db.run_sync(refresh_payroll_rollups, [(new_payroll.employee_id, new_payroll.date)])
+        await db.execute(bump_table_version("payroll"))
+        await db.commit()
+        await db.refresh(new_payroll)
+        payslip_cache.invalidate_employees([employee_id, new_payroll.employee_id])
+        return {"success": True, "payroll": to_response(PayrollResponse, new_payroll)}
+    except IntegrityError:
+        await db.rollback()
+        return {"success": False, "error": "Payroll record already exists for this employee on that date.", "code": 400}
+    except Exception as e:
+        await db.rollback()
+        return {"success": False, "error": str(e), "code": 500}
+
+async def update_payroll(db: AsyncSession, payroll_id: int, payroll_data: PayrollUpdate) -> dict:
+    payroll = await _get_payroll(db, payroll_id)
+    if not payroll:
+        return {"success": False, "error": "Payroll record not found", "code": 404}
+    previous_employee_id = payroll.employee_id
+    previous_date = payroll.date
+    try:
+        for key, value in payroll_data.model_dump(exclude={"id"}).items():
+            setattr(payroll, key, value)
+        payroll.version = Payroll.version + 1
+
+        await db.flush()
+        await db.run_sync(refresh_payroll_rollups, [(previous_employee_id, previous_date), (payroll.employee_id, payroll.date)])
+        await db.execute(bump_table_version("payroll"))
+        await db.commit()
+        await db.refresh(payroll)
+        payslip_cache.invalidate_employees([previous_employee_id, payroll.employee_id])
+        return {"success": True, "payroll": to_response(PayrollResponse, payroll)}
+    except IntegrityError:
+        await db.rollback()
+        return {"success": False, "error": "Payroll record already exists for this employee on that date.", "code": 400}
+    except Exception as e:
+        await db.rollback()
+        return {"success": False, "error": f"An error occurred: {str(e)}", "code": 500}
+
+async def delete_payroll(db: AsyncSession, payroll_id: int) -> dict:
+    payroll = await _get_payroll(db, payroll_id)
+    if not payroll:
+        return {"success": False, "error": "Payroll record not found", "code": 404}
+    try:
+        await db.delete(payroll)
+        await db.flush()
+        await db.run_sync(refresh_payroll_rollups, [(payroll.employee_id, payroll.date)])
+        await db.execute(bump_table_version("payroll"))
+        await db.commit()
+        payslip_cache.invalidate_employee(payroll.employee_id)
+        return {"success": True, "message": "Payroll record deleted successfully."}
+    except Exception as e:
+        await db.rollback()
+        return {"success": False, "error": f"An error occurred: {str(e)}", "code": 500}
+
+async def get_payroll_summary(
+    db: AsyncSession,
+    employee_id: int,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    totals_only: bool = False,
+) -> dict:
+    await get_employee_or_404(db, employee_id)
+    try:
+        summary = totals_summary((await db.execute(payroll_totals_query(employee_id, start_date, end_date))).one())
+        if not summary["row_count"]:
+            return {"success": False, "error": "No payroll records found.", "code": 404}
+
+        if totals_only:
+            return {"success": True, **summary}
+
+        payrolls = (await db.execute(employee_payrolls_query(employee_id, start_date, end_date))).all()
+        return {"success": True, "payrolls": to_responses(PayrollResponse, payrolls), **summary}
+    except Exception as e:
+        await db.rollback()
+        return {"success": False, "error": str(e), "code": 500}
@@ -0,0 +1,220 @@
+import hashlib
+import logging
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from typing import Iterable, NamedTuple, Optional
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# An eviction pass trims the disk tier to this fraction of its limit, so passes stay rare.
+DISK_EVICT_TARGET = 0.9
+
+# Employee fields that appear on a payslip; a change to any of them changes the fingerprint.
+FINGERPRINT_EMPLOYEE_FIELDS = ("id", "first_name", "last_name", "position", "salary")
+FINGERPRINT_PAYROLL_FIELDS = (
+    "id", "date", "time_in", "time_out", "total_hours_worked", "overtime_hour", "overtime_pay",
+    "night_differential_hour", "night_differential_pay", "allowance", "deductions",
+    "subtotal", "net_salary", "deduction_remarks", "project",
+)
+
+
+class PayslipKey(NamedTuple):
+    employee_id: int
+    period_from: str
+    period_to: str
+    fmt: str
+    fingerprint: str
+
+
+class CachedPayslip(NamedTuple):
+    content: bytes
+    media_type: str
+    filename: str
+
+
+class SpooledArtifact(NamedTuple):
+    """
+    A rendered artifact too big to hold in memory, in a temporary file its owner deletes.
+    """
+    path: str
+    media_type: str
+    filename: str
+
+
+def payslip_fingerprint(employee, payrolls, fmt: str, layout_version: str = "") -> str:
+    """
+    Content hash of everything a payslip is rendered from, including the template version
+    (layout_version) for formats rendered from a template.
+    """
+    digest = hashlib.sha256(fmt.encode())
+    digest.update(layout_version.encode())
+    digest.update(repr(tuple(getattr(employee, f) for f in FINGERPRINT_EMPLOYEE_FIELDS)).encode())
+    for payroll in sorted(payrolls, key=lambda p: p.id):
+        digest.update(repr(tuple(getattr(payroll, f) for f in FINGERPRINT_PAYROLL_FIELDS)).encode())
+    return digest.hexdigest()[:32]
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag.removeprefix("W/") in candidates
+
+
+class PayslipCache:
+    """
+    Size-bounded LRU of rendered payslips with an optional on-disk second tier.
+    Keys carry a content fingerprint, so a stale entry can never be served; invalidation
+    only frees the space held by an employee's outdated artifacts.
+    """
+    def __init__(self, max_bytes: int, disk_dir: Optional[str] = None, disk_max_bytes: int = 0):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        # running estimate of the disk tier's bytes; None until the first write scans the directory
+        self._disk_size: Optional[int] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: PayslipKey) -> Optional[CachedPayslip]:
+        with self._lock:
+            artifact = self._entries.get(key)
+            if artifact is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return artifact
+
+        artifact = self._read_disk(key)
+        with self._lock:
+            if artifact is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._store(key, artifact)
+        return artifact
+
+    def put(self, key: PayslipKey, artifact: CachedPayslip):
+        with self._lock:
+            self._store(key, artifact)
+        self._write_disk(key, artifact)
+
+    def invalidate_employee(self, employee_id: int):
+        with self._lock:
+            for key in [k for k in self._entries if k.employee_id == employee_id]:
+                self._size -= len(self._entries.pop(key).content)
+        if self.disk_dir:
+            shutil.rmtree(os.path.join(self.disk_dir, str(employee_id)), ignore_errors=True)
+
+    def invalidate_employees(self, employee_ids: Iterable[int]):
+        for employee_id in set(employee_ids):
+            self.invalidate_employee(employee_id)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            self._disk_size = 0
+        if self.disk_dir:
+            shutil.rmtree(self.disk_dir, ignore_errors=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._size, "hits": self.hits, "misses": self.misses}
+
+    def _store(self, key: PayslipKey, artifact: CachedPayslip):
+        size = len(artifact.content)
+        if size > self.max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._size -= len(previous.content)
+        self._entries[key] = artifact
+        self._size += size
+        while self._size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted.content)
+
+    def _disk_path(self, key: PayslipKey) -> str:
+        name = f"{key.period_from}_{key.period_to}_{key.fingerprint}.{key.fmt}"
+        return os.path.join(self.disk_dir, str(key.employee_id), name)
+
+    def _read_disk(self, key: PayslipKey) -> Optional[CachedPayslip]:
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, "rb") as f:
+                media_type = f.readline().decode().strip()
+                filename = f.readline().decode().strip()
+                content = f.read()
+            os.utime(path)  # mtime doubles as the disk tier's LRU clock
+        except OSError:
+            return None
+        return CachedPayslip(content, media_type, filename)
+
+    def _write_disk(self, key: PayslipKey, artifact: CachedPayslip):
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(f"{artifact.media_type}\n{artifact.filename}\n".encode())
+                f.write(artifact.content)
+                written = f.tell()
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning("Payslip disk cache write failed: %s", e)
+            return
+        # Overwrites and invalidations leave the estimate high, never low; a high estimate only
+        # brings the next directory walk forward, and the walk corrects it.
+        with self._lock:
+            if self._disk_size is not None:
+                self._disk_size += written
+            over_limit = self._disk_size is None or self._disk_size > self.disk_max_bytes
+        if over_limit:
+            self._evict_disk()
+
+    def _evict_disk(self):
+        """
+        Walk the disk tier once: measure it and, when it is over the limit, delete the least
+        recently used files down to DISK_EVICT_TARGET of the limit.
+        """
+        files = []
+        for root, _, names in os.walk(self.disk_dir):
+            for name in names:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in files)
+        if total > self.disk_max_bytes:
+            target = self.disk_max_bytes * DISK_EVICT_TARGET
+            for _, size, path in sorted(files):
+                if total <= target:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                except OSError:
+                    pass
+        with self._lock:
+            self._disk_size = total
+
+
+payslip_cache = PayslipCache(
+    max_bytes=settings.payslip_cache_max_bytes,
+    disk_dir=settings.payslip_cache_dir,
+    disk_max_bytes=settings.payslip_cache_disk_max_bytes,
+)
@@ -0,0 +1,161 @@
+import hashlib
+import mimetypes
+import os
+import threading
+from typing import Optional
+from jinja2 import Environment, FileSystemLoader
+from weasyprint import HTML, CSS, default_url_fetcher
+from weasyprint.text.fonts import FontConfiguration
+from app.core.config import settings
+from app.core.metrics import Span
+
+TEMPLATE_DIR = "app/templates"
+STATIC_DIR = "app/static"
+PAYSLIP_TEMPLATE = "payroll_payslip.html"
+
+PAYSLIP_LANDSCAPE_CSS = '''
+    @page {
+        size: A4 landscape;
+        margin: 1cm;
+    }
+
+    body {
+        font-family: Arial, sans-serif;
+        font-size: 12px;
+    }
+
+    table {
+        width: 100%;
+        border-collapse: collapse;
+        page-break-inside: auto;
+    }
+
+    thead {
+        display: table-header-group;
+    }
+
+    tfoot {
+        display: table-footer-group;
+    }
+
+    tr {
+        page-break-inside: avoid;
+        page-break-after: auto;
+    }
+
+    td, th {
+        border: 1px solid #ccc;
+        padding: 6px;
+        text-align: left;
+    }
+
+    .payslip-container {
+        page-break-inside: avoid;
+    }
+'''
+
+
+class PayslipRenderContext:
+    """
+    Everything a payslip render needs that does not depend on the payroll data:
+    the compiled template, parsed stylesheets, fonts and the static assets held in memory.
+    """
+    def __init__(self, template_dir: str = TEMPLATE_DIR, static_dir: str = STATIC_DIR, template_name: str = PAYSLIP_TEMPLATE):
+        self.template_path = os.path.join(template_dir, template_name)
+        self.template_mtime = os.path.getmtime(self.template_path)
+        self.template_env = Environment(loader=FileSystemLoader(template_dir), auto_reload=False)
+        self.template = self.template_env.get_template(template_name)
+
+        self.base_url = os.path.abspath(static_dir)
+        self.assets = self._load_static_assets(self.base_url)
+
+        self.font_config = FontConfiguration()
+        self.stylesheets = [
+            CSS(string=PAYSLIP_LANDSCAPE_CSS, font_config=self.font_config, url_fetcher=self.url_fetcher),
+        ]
+        self.image_cache = {}
+        self.version = self._layout_version()
+
+    def _layout_version(self) -> str:
+        """
+        Hash of the template source and the static assets: the same on every worker, and it
+        changes whenever a reload picks up a new template or logo.
+        """
+        digest = hashlib.sha256()
+        with open(self.template_path, "rb") as f:
+            digest.update(f.read())
+        for url, (data, _) in sorted(self.assets.items()):
+            digest.update(url.encode())
+            digest.update(data)
+        return digest.hexdigest()[:16]
+
+    @staticmethod
+    def _load_static_assets(base_dir: str) -> dict:
+        assets = {}
+        for root, _, files in os.walk(base_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                with open(path, "rb") as f:
+                    data = f.read()
+                mime_type, _ = mimetypes.guess_type(path)
+                assets[f"file://{path}"] = (data, mime_type)
+        return assets
+
+    def url_fetcher(self, url: str, timeout: int = 10, ssl_context=None) -> dict:
+        """
+        Serve static assets from memory. Missing files under the static folder fail
+        without touching the disk; anything else goes to WeasyPrint's default fetcher.
+        """
+        asset = self.assets.get(url)
+        if asset is not None:
+            data, mime_type = asset
+            return {"string": data, "mime_type": mime_type, "redirected_url": url}
+        if url.startswith(f"file://{self.base_url}"):
+            raise FileNotFoundError(f"Static asset not found: {url}")
+        return default_url_fetcher(url, timeout=timeout, ssl_context=ssl_context)
+
+    def is_stale(self) -> bool:
+        try:
+            return os.path.getmtime(self.template_path) != self.template_mtime
+        except OSError:
+            return False
+
+    def render_html(self, **context) -> str:
+        with Span("payslip_template_render"):
+            return self.template.render(**context)
+
+    def render_pdf(self, html_content: str) -> bytes:
+        with Span("weasyprint_layout"):
+            document = HTML(string=html_content, base_url=self.base_url, url_fetcher=self.url_fetcher)
+            return document.write_pdf(
+                stylesheets=self.stylesheets,
+                font_config=self.font_config,
+                cache=self.image_cache,
+            )
+
+
+_render_context: Optional[PayslipRenderContext] = None
+_render_context_lock = threading.Lock()
+
+def get_render_context() -> PayslipRenderContext:
+    """
+    Return this process's render context, building it on first use and rebuilding it
+    when the template file changed on disk (if payslip_template_autoreload is on).
+    """
+    global _render_context
+    context = _render_context
+    if context is not None and not (settings.payslip_template_autoreload and context.is_stale()):
+        return context
+    with _render_context_lock:
+        if _render_context is None or _render_context is context:
+            _render_context = PayslipRenderContext()
+        return _render_context
+
+def reload_render_context() -> PayslipRenderContext:
+    """
+    Force a rebuild of the render context, e.g. after deploying a new template or logo.
+    """
+    global _render_context
+    with _render_context_lock:
+        _render_context = PayslipRenderContext()
+        return _render_context
@@ -0,0 +1,136 @@
+import asyncio
+import contextvars
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+from app.core.config import settings
+
+
+class RenderQueueFull(Exception):
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class RenderStats:
+    def __init__(self):
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.queue_wait_total = 0.0
+        self.queue_wait_max = 0.0
+        self.render_time_total = 0.0
+        self.render_time_max = 0.0
+
+    def record(self, queue_wait: float, render_time: float, ok: bool):
+        if ok:
+            self.completed += 1
+        else:
+            self.failed += 1
+        self.queue_wait_total += queue_wait
+        self.queue_wait_max = max(self.queue_wait_max, queue_wait)
+        self.render_time_total += render_time
+        self.render_time_max = max(self.render_time_max, render_time)
+
+    def to_dict(self) -> dict:
+        finished = self.completed + self.failed
+        return {
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "queue_wait_avg_ms": round(self.queue_wait_total / finished * 1000, 2) if finished else 0.0,
+            "queue_wait_max_ms": round(self.queue_wait_max * 1000, 2),
+            "render_time_avg_ms": round(self.render_time_total / finished * 1000, 2) if finished else 0.0,
+            "render_time_max_ms": round(self.render_time_max * 1000, 2),
+        }
+
+
+class RenderExecutor:
+    """
+    A dedicated, bounded pool for CPU-heavy payslip and template renders, so a burst of downloads
+    queues here instead of filling the shared Starlette threadpool. At most `workers` renders run
+    at once and at most `max_queue` more wait; anything beyond that fails fast with RenderQueueFull.
+    """
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending = 0
+        self._running = 0
+        self._stats: Dict[str, RenderStats] = {}
+        self._lock = threading.Lock()
+
+    async def run(self, kind: str, render: Callable, *args):
+        """
+        Run render(*args) on the render pool and await its result without holding an event-loop
+        or threadpool thread while it waits.
+        """
+        with self._lock:
+            stats = self._stats.setdefault(kind, RenderStats())
+            if self._pending >= self.workers + self.max_queue:
+                stats.rejected += 1
+                raise RenderQueueFull(
+                    f"Render queue is full ({self._pending} renders pending).", self._retry_after()
+                )
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="render")
+            self._pending += 1
+        # run in a copy of the caller's context so per-request state (the SQL profile) follows the render
+        context = contextvars.copy_context()
+        future = self._executor.submit(context.run, self._run, stats, time.perf_counter(), render, *args)
+        future.add_done_callback(self._release_if_cancelled)
+        return await asyncio.wrap_future(future)
+
+    def _release_if_cancelled(self, future):
+        # a render cancelled before it started (client went away) never reaches _run's finally
+        if future.cancelled():
+            with self._lock:
+                self._pending -= 1
+
+    def _run(self, stats: RenderStats, submitted: float, render: Callable, *args):
+        started = time.perf_counter()
+        with self._lock:
+            self._running += 1
+        ok = False
+        try:
+            result = render(*args)
+            ok = True
+            return result
+        finally:
+            finished = time.perf_counter()
+            with self._lock:
+                self._running -= 1
+                self._pending -= 1
+                stats.record(started - submitted, finished - started, ok)
+
+    def _retry_after(self) -> int:
+        """
+        Seconds until the current backlog should have drained, from the average render time so far.
+        """
+        finished = sum(s.completed + s.failed for s in self._stats.values())
+        average = sum(s.render_time_total for s in self._stats.values()) / finished if finished else 1.0
+        return max(1, math.ceil(average * self._pending / self.workers))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "running": self._running,
+                "queued": self._pending - self._running,
+                "kinds": {kind: stats.to_dict() for kind, stats in self._stats.items()},
+            }
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+render_executor = RenderExecutor(
+    workers=settings.render_workers,
+    max_queue=settings.render_queue_max_depth,
+)
@@ -0,0 +1,193 @@
+import sys
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Iterable, Optional, Tuple
+import pandas as pd
+from fastapi import HTTPException
+from sqlalchemy import select, delete, insert, func, tuple_
+from sqlalchemy.orm import Session
+from app.models.payroll import Payroll
+from app.models.payroll_rollup import PayrollRollup
+from app.db.types import centavo_table, centavos
+from app.services.payroll_aggregates import TOTAL_COLUMNS, MONEY_TOTALS
+
+PERIOD_TYPES = ("day", "week", "month")
+ROLLUP_DELETE_BATCH = 500
+REBUILD_EMPLOYEE_BATCH = 500
+
+
+def period_start(day: date, period_type: str) -> date:
+    if isinstance(day, datetime):
+        day = day.date()
+    if period_type == "day":
+        return day
+    if period_type == "week":
+        return day - timedelta(days=day.weekday())
+    if period_type == "month":
+        return day.replace(day=1)
+    raise ValueError(f"Unknown period type: {period_type}")
+
+
+def period_end(start: date, period_type: str) -> date:
+    if period_type == "day":
+        return start
+    if period_type == "week":
+        return start + timedelta(days=6)
+    next_month = (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return next_month - timedelta(days=1)
+
+
+def _load_payroll_frame(db: Session, employee_ids, start: Optional[date] = None, end: Optional[date] = None) -> pd.DataFrame:
+    query = select(
+        Payroll.employee_id,
+        Payroll.date,
+        *((centavos(column) if name in MONEY_TOTALS else column).label(name) for name, column in TOTAL_COLUMNS.items()),
+    ).where(Payroll.employee_id.in_(employee_ids))
+    if start is not None:
+        query = query.where(Payroll.date >= start, Payroll.date <= end)
+    rows = db.execute(query).all()
+    return pd.DataFrame(rows, columns=["employee_id", "date", *TOTAL_COLUMNS])
+
+
+def _aggregate(frame: pd.DataFrame, period_type: str) -> pd.DataFrame:
+    """
+    Group payroll rows into period buckets with column-wise pandas operations; money sums are
+    int64 centavos, so they are exact.
+    """
+    dates = pd.to_datetime(frame["date"])
+    if period_type == "week":
+        starts = dates - pd.to_timedelta(dates.dt.weekday, unit="D")
+    elif period_type == "month":
+        starts = dates.dt.to_period("M").dt.to_timestamp()
+    else:
+        starts = dates
+    totals = frame[list(TOTAL_COLUMNS)].astype(float).fillna(0)
+    totals[MONEY_TOTALS] = totals[MONEY_TOTALS].astype("int64")
+    totals["employee_id"] = frame["employee_id"]
+    totals["period_start"] = starts.dt.date
+    grouped = totals.groupby(["employee_id", "period_start"])
+    result = grouped.sum()
+    result["row_count"] = grouped.size()
+    result = result.reset_index()
+    result["period_type"] = period_type
+    return result
+
+
+def _write_buckets(db: Session, buckets: pd.DataFrame):
+    if buckets.empty:
+        return
+    records = buckets.to_dict("records")
+    for record in records:
+        record["employee_id"] = int(record["employee_id"])
+        record["row_count"] = int(record["row_count"])
+    db.execute(insert(centavo_table(PayrollRollup.__table__)), records)
+
+
+def refresh_payroll_rollups(db: Session, keys: Iterable[Tuple[int, date]]):
+    """
+    Recompute the day/week/month rollups touched by writes to the given (employee_id, date) rows.
+    Runs inside the caller's transaction; the caller must flush its Payroll changes first.
+    """
+    touched = {(employee_id, period_type, period_start(day, period_type))
+               for employee_id, day in keys if employee_id is not None and day is not None
+               for period_type in PERIOD_TYPES}
+    if not touched:
+        return
+
+    touched = list(touched)
+    for start in range(0, len(touched), ROLLUP_DELETE_BATCH):
+        batch = touched[start:start + ROLLUP_DELETE_BATCH]
+        db.execute(delete(PayrollRollup).where(
+            tuple_(PayrollRollup.employee_id, PayrollRollup.period_type, PayrollRollup.period_start).in_(batch)
+        ))
+
+    # a week can straddle two months, so load every row of every touched bucket, not just the months
+    first_day = min(start for _, _, start in touched)
+    last_day = max(period_end(start, period_type) for _, period_type, start in touched)
+    employee_ids = sorted({bucket[0] for bucket in touched})
+    frame = _load_payroll_frame(db, employee_ids, first_day, last_day)
+    if frame.empty:
+        return
+
+    wanted = pd.MultiIndex.from_tuples(touched, names=["employee_id", "period_type", "period_start"])
+    for period_type in PERIOD_TYPES:
+        buckets = _aggregate(frame, period_type)
+        keep = pd.MultiIndex.from_frame(buckets[["employee_id", "period_type", "period_start"]]).isin(wanted)
+        _write_buckets(db, buckets[keep])
+
+
+def rebuild_payroll_rollups(db: Session) -> int:
+    """
+    Drop and recompute every rollup row, a batch of employees at a time. Commits at the end.
+    """
+    db.execute(delete(PayrollRollup))
+    employee_ids = list(db.execute(select(Payroll.employee_id).distinct().order_by(Payroll.employee_id)).scalars())
+    written = 0
+    for start in range(0, len(employee_ids), REBUILD_EMPLOYEE_BATCH):
+        frame = _load_payroll_frame(db, employee_ids[start:start + REBUILD_EMPLOYEE_BATCH])
+        if frame.empty:
+            continue
+        for period_type in PERIOD_TYPES:
+            buckets = _aggregate(frame, period_type)
+            _write_buckets(db, buckets)
+            written += len(buckets)
+    db.commit()
+    return written
+
+
+def get_company_summary(
+    db: Session,
+    period_type: str = "month",
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+) -> dict:
+    """
+    Per-employee period totals and company-wide totals, read only from the rollup table.
+    Dates are snapped to the start of the period that contains them.
+    """
+    if period_type not in PERIOD_TYPES:
+        raise HTTPException(status_code=400, detail=f"Invalid period: {period_type}. Allowed values are {list(PERIOD_TYPES)}")
+
+    conditions = [PayrollRollup.period_type == period_type]
+    if start_date:
+        conditions.append(PayrollRollup.period_start >= period_start(date.fromisoformat(start_date), period_type))
+    if end_date:
+        conditions.append(PayrollRollup.period_start <= period_start(date.fromisoformat(end_date), period_type))
+
+    columns = [getattr(PayrollRollup, name) for name in TOTAL_COLUMNS]
+    rows = db.execute(
+        select(PayrollRollup.employee_id, PayrollRollup.period_start, PayrollRollup.row_count, *columns)
+        .where(*conditions)
+        .order_by(PayrollRollup.period_start, PayrollRollup.employee_id)
+    ).all()
+    company = db.execute(
+        select(func.coalesce(func.sum(PayrollRollup.row_count), 0), *(func.coalesce(func.sum(c), 0) for c in columns))
+        .where(*conditions)
+    ).one()
+
+    return {
+        "period": period_type,
+        "rows": [
+            {
+                "employee_id": row.employee_id,
+                "period_start": row.period_start,
+                "row_count": row.row_count,
+                "totals": {name: Decimal(str(getattr(row, name))) for name in TOTAL_COLUMNS},
+            }
+            for row in rows
+        ],
+        "row_count": company[0],
+        "totals": {name: Decimal(str(value)) for name, value in zip(TOTAL_COLUMNS, company[1:])},
+    }
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["rebuild"]:
+        sys.exit("usage: python -m app.services.rollup_service rebuild")
+    from app.db.session import SessionLocal, create_db_and_tables
+    create_db_and_tables()
+    session = SessionLocal()
+    try:
+        print(f"Rebuilt {rebuild_payroll_rollups(session)} payroll rollup rows.")
+    finally:
+        session.close()
@@ -0,0 +1,58 @@
+from functools import lru_cache
+from typing import Iterable, List, Optional, Sequence, Type, TypeVar
+from fastapi.responses import Response
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy.engine import Row
+
+Schema = TypeVar("Schema", bound=BaseModel)
+
+
+class PreEncodedJSONResponse(Response):
+    """
+    A response whose body is already JSON bytes, so nothing is validated or encoded again.
+    """
+    media_type = "application/json"
+
+
+@lru_cache(maxsize=256)
+def list_adapter(schema: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(List[schema])
+
+
+def to_response(schema: Type[Schema], obj) -> Schema:
+    """
+    One ORM object or Core row as a response schema.
+    """
+    if isinstance(obj, Row):
+        return schema.model_validate(obj._asdict())
+    return schema.model_validate(obj, from_attributes=True)
+
+
+def to_responses(schema: Type[Schema], rows: Iterable) -> List[Schema]:
+    """
+    ORM objects or Core rows as response schemas, validated in a single call.
+    Core rows are zipped with their column names once up front; validating dicts is
+    several times faster than reading Row attributes one by one.
+    """
+    rows = rows if isinstance(rows, list) else list(rows)
+    if rows and isinstance(rows[0], Row):
+        keys = rows[0]._fields
+        return list_adapter(schema).validate_python([dict(zip(keys, row)) for row in rows])
+    return list_adapter(schema).validate_python(rows, from_attributes=True)
+
+
+def encode_json(items: Sequence[BaseModel]) -> bytes:
+    """
+    Encode a list of same-typed schemas; output matches FastAPI's own encoding of them.
+    """
+    if not items:
+        return b"[]"
+    return list_adapter(type(items[0])).dump_json(items)
+
+
+def json_response(content, status_code: int = 200, headers: Optional[dict] = None) -> PreEncodedJSONResponse:
+    """
+    A schema, or a list of schemas, as a pre-encoded JSON response.
+    """
+    body = encode_json(content) if isinstance(content, list) else content.model_dump_json().encode()
+    return PreEncodedJSONResponse(content=body, status_code=status_code, headers=headers)
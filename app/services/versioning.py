@@ -0,0 +1,66 @@
+import hashlib
+from typing import Optional
+from fastapi.responses import Response
+from sqlalchemy import select, update
+from app.models.table_version import TableVersion
+from app.services.payslip_cache import etag_matches
+
+# Conditional GETs for the employee and payroll read endpoints. A row's ETag is its version
+# column; a list's ETag is its table's change counter plus the query string. A poll whose
+# If-None-Match still matches is answered 304 after a single-value lookup, before any rows are read.
+
+CACHE_CONTROL = "private, no-cache"
+
+
+def bump_table_version(table_name: str):
+    """
+    The UPDATE that marks table_name as changed. Execute it as the writing transaction's last
+    statement, after a flush and right before commit: every writer updates this one row, so on
+    Postgres its lock serializes them for as long as the transaction stays open after the bump.
+    """
+    return (
+        update(TableVersion)
+        .where(TableVersion.table_name == table_name)
+        .values(version=TableVersion.version + 1)
+    )
+
+
+def table_version_query(table_name: str):
+    return select(TableVersion.version).where(TableVersion.table_name == table_name)
+
+
+def row_version_query(model, row_id: int):
+    return select(model.version).where(model.id == row_id)
+
+
+def row_etag(table_name: str, row_id: int, version: Optional[int]) -> Optional[str]:
+    if version is None:
+        return None
+    return f'W/"{table_name}-{row_id}-{version}"'
+
+
+def list_etag(table_name: str, version: Optional[int], query_string: str) -> Optional[str]:
+    """
+    Read the counter before the rows: a write landing in between leaves a tag older than the
+    body, which costs the client one extra full response instead of a stale 304.
+    """
+    if version is None:
+        return None
+    params = hashlib.sha1(query_string.encode()).hexdigest()[:16]
+    return f'W/"{table_name}-v{version}-{params}"'
+
+
+def not_modified_response(if_none_match: Optional[str], etag: Optional[str]) -> Optional[Response]:
+    """
+    A 304 when the client's copy is still current, otherwise None.
+    """
+    if etag is None or not etag_matches(if_none_match, etag):
+        return None
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
+
+def with_etag(response: Response, etag: Optional[str]) -> Response:
+    if etag is not None:
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = CACHE_CONTROL
+    return response
@@ -0,0 +1,93 @@
+"""
+Rows/sec of batch_upload_payroll on generated spreadsheets.
+
+    python -m benchmarks.bench_batch_upload --sizes 1000 10000 100000
+
+Runs against a throwaway SQLite database unless DATABASE_URL is already set.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from datetime import date, timedelta
+from io import BytesIO
+
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench.sqlite3"
+
+from openpyxl import Workbook
+from starlette.datastructures import UploadFile
+from app.db.session import SessionLocal, create_db_and_tables, engine
+from app.models.employee import Employee
+from app.models.payroll import Payroll
+from app.services.payroll_service import REQUIRED_COLUMNS, batch_upload_payroll
+
+EMPLOYEES = 500
+
+
+def build_workbook(rows: int) -> bytes:
+    """
+    One row per employee per day, in the download_payroll_template column layout.
+    """
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Payroll Template")
+    ws.append(REQUIRED_COLUMNS)
+    start = date(2024, 1, 1)
+    for i in range(rows):
+        employee_id = i % EMPLOYEES + 1
+        day = start + timedelta(days=i // EMPLOYEES)
+        ws.append([
+            employee_id, 50, 9, 0, 0, 0, 0, 25, "", 700, 675,
+            day.isoformat(), "08:00:00", "17:00:00", f"Project {employee_id % 7}",
+        ])
+    output = BytesIO()
+    wb.save(output)
+    return output.getvalue()
+
+
+def seed_employees():
+    db = SessionLocal()
+    db.query(Payroll).delete()
+    db.query(Employee).delete()
+    db.add_all(
+        Employee(
+            id=i, first_name=f"First{i}", last_name=f"Last{i}", email=f"employee{i}@example.com",
+            hire_date=date(2020, 1, 1), position="Mason", salary=650.0, status="Active",
+        )
+        for i in range(1, EMPLOYEES + 1)
+    )
+    db.commit()
+    db.close()
+
+
+def run_upload(content: bytes) -> float:
+    db = SessionLocal()
+    try:
+        upload = UploadFile(file=BytesIO(content), filename="payroll.xlsx")
+        started = time.perf_counter()
+        result = asyncio.run(batch_upload_payroll(db, upload))
+        elapsed = time.perf_counter() - started
+        assert result["success"], result
+        return elapsed
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    args = parser.parse_args()
+
+    engine.echo = False
+    create_db_and_tables()
+    print(f"{'rows':>8} {'upload s':>10} {'rows/sec':>12}")
+    for rows in args.sizes:
+        content = build_workbook(rows)
+        seed_employees()
+        elapsed = run_upload(content)
+        print(f"{rows:>8} {elapsed:>10.2f} {rows / elapsed:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
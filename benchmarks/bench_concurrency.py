@@ -0,0 +1,122 @@
+"""
+Requests/sec of the employee endpoints under concurrent clients, sync vs async database stack.
+
+    python -m benchmarks.bench_concurrency --clients 50 100 200 --seconds 10
+
+For each mode (DB_ASYNC=false / true) this starts uvicorn in a subprocess against the same
+seeded SQLite database, then keeps N clients busy with a mix of list, detail and search
+requests. Needs httpx (pip install httpx). Runs against a throwaway SQLite database unless
+DATABASE_URL is already set.
+"""
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date
+
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench.sqlite3"
+
+import httpx
+from app.db.session import SessionLocal, create_db_and_tables
+from app.models.employee import Employee
+
+EMPLOYEES = 5000
+
+
+def seed():
+    db = SessionLocal()
+    db.query(Employee).delete()
+    db.add_all(
+        Employee(
+            id=i, first_name=f"First{i}", last_name=f"Last{i}", email=f"employee{i}@example.com",
+            hire_date=date(2020, 1, 1), position="Mason", salary=650.0, status="Active" if i % 4 else "Inactive",
+        )
+        for i in range(1, EMPLOYEES + 1)
+    )
+    db.commit()
+    db.close()
+
+
+def request_path(rng: random.Random) -> str:
+    kind = rng.random()
+    if kind < 0.4:
+        return f"/api/v1/employees/?limit=50&status=Active"
+    if kind < 0.8:
+        return f"/api/v1/employees/{rng.randint(1, EMPLOYEES)}"
+    return f"/api/v1/employees/employeeList?search=st{rng.randint(100, 999)}"
+
+
+async def client(base_url: str, deadline: float, seed: int, counts: dict):
+    rng = random.Random(seed)
+    async with httpx.AsyncClient(base_url=base_url, timeout=30) as http:
+        while time.perf_counter() < deadline:
+            try:
+                response = await http.get(request_path(rng))
+                counts["ok" if response.status_code == 200 else "errors"] += 1
+            except httpx.HTTPError:
+                counts["errors"] += 1
+
+
+async def run_load(base_url: str, clients: int, seconds: float) -> dict:
+    counts = {"ok": 0, "errors": 0}
+    started = time.perf_counter()
+    await asyncio.gather(*(client(base_url, started + seconds, i, counts) for i in range(clients)))
+    counts["elapsed"] = time.perf_counter() - started
+    return counts
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(db_async: bool, port: int) -> subprocess.Popen:
+    env = {**os.environ, "DB_ASYNC": str(db_async).lower(), "DB_ECHO": "false"}
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning", "--no-access-log"],
+        env=env, stdout=subprocess.DEVNULL,
+    )
+    for _ in range(100):
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/api/v1/employees/1", timeout=1)
+            return server
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError("uvicorn did not start")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, nargs="+", default=[50, 100, 200])
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--modes", nargs="+", choices=["sync", "async"], default=["sync", "async"])
+    args = parser.parse_args()
+
+    create_db_and_tables()
+    seed()
+
+    for mode in args.modes:
+        port = free_port()
+        server = start_server(mode == "async", port)
+        try:
+            for clients in args.clients:
+                counts = asyncio.run(run_load(f"http://127.0.0.1:{port}", clients, args.seconds))
+                print(
+                    f"{mode:>5} {clients:4d} clients: {counts['ok'] / counts['elapsed']:8.1f} req/s, "
+                    f"{counts['errors']} errors"
+                )
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Concurrent payroll writes and reads against one database, counting "database is locked" errors.
+
+    python -m benchmarks.bench_db_concurrency --writers 4 --readers 8 --seconds 10
+
+Writers create payroll rows through generate_payroll (rollups included); readers page through
+get_all_payrolls and sum with get_payroll_totals. To compare with SQLite's defaults, run with
+SQLITE_JOURNAL_MODE=DELETE SQLITE_SYNCHRONOUS=FULL SQLITE_BUSY_TIMEOUT_MS=0.
+Runs against a throwaway SQLite database unless DATABASE_URL is already set.
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import date, datetime, timedelta
+
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench.sqlite3"
+
+from sqlalchemy import text
+from app.core.config import settings
+from app.db.session import SessionLocal, create_db_and_tables, engine
+from app.models.employee import Employee
+from app.models.payroll import Payroll
+from app.schemas.payroll import PayrollCreate
+from app.services.payroll_aggregates import get_payroll_totals
+from app.services.payroll_service import generate_payroll, get_all_payrolls
+
+EMPLOYEES_PER_WRITER = 50
+
+
+def seed(writers: int):
+    db = SessionLocal()
+    db.query(Payroll).delete()
+    db.query(Employee).delete()
+    db.add_all(
+        Employee(
+            id=i, first_name=f"First{i}", last_name=f"Last{i}", email=f"employee{i}@example.com",
+            hire_date=date(2020, 1, 1), position="Mason", salary=650.0, status="Active",
+        )
+        for i in range(1, writers * EMPLOYEES_PER_WRITER + 1)
+    )
+    db.commit()
+    db.close()
+
+
+def writer(index: int, stop: threading.Event, counts: Counter, lock: threading.Lock):
+    first_employee = index * EMPLOYEES_PER_WRITER + 1
+    n = 0
+    while not stop.is_set():
+        employee_id = first_employee + n % EMPLOYEES_PER_WRITER
+        day = date(2024, 1, 1) + timedelta(days=n // EMPLOYEES_PER_WRITER)
+        time_in = datetime.combine(day, datetime.min.time()) + timedelta(hours=8)
+        payroll = PayrollCreate(
+            employee_id=employee_id, time_in=time_in, time_out=time_in + timedelta(hours=9),
+            subtotal=700, deductions=25, project=f"Project {employee_id % 7}",
+        )
+        db = SessionLocal()
+        try:
+            result = generate_payroll(db, payroll, employee_id)
+        except Exception as e:
+            result = {"success": False, "error": str(e)}
+        finally:
+            db.close()
+        with lock:
+            if result["success"]:
+                counts["writes"] += 1
+            else:
+                counts["locked" if "locked" in result["error"] else "write_errors"] += 1
+        n += 1
+
+
+def reader(index: int, stop: threading.Event, counts: Counter, lock: threading.Lock):
+    while not stop.is_set():
+        db = SessionLocal()
+        try:
+            get_all_payrolls(db, limit=100, project=f"Project {index % 7}")
+            get_payroll_totals(db, start_date="2024-01-01", end_date="2024-12-31")
+            outcome = "reads"
+        except Exception as e:
+            outcome = "locked" if "locked" in str(e) else "read_errors"
+        finally:
+            db.close()
+        with lock:
+            counts[outcome] += 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=10)
+    args = parser.parse_args()
+
+    create_db_and_tables()
+    seed(args.writers)
+    with engine.connect() as conn:
+        journal_mode = conn.execute(text("PRAGMA journal_mode")).scalar() if engine.dialect.name == "sqlite" else "-"
+    print(f"{engine.dialect.name}, journal_mode={journal_mode}, pool_size={settings.db_pool_size}, "
+          f"{args.writers} writers, {args.readers} readers, {args.seconds:g}s")
+
+    stop = threading.Event()
+    counts = Counter()
+    lock = threading.Lock()
+    threads = [threading.Thread(target=writer, args=(i, stop, counts, lock)) for i in range(args.writers)]
+    threads += [threading.Thread(target=reader, args=(i, stop, counts, lock)) for i in range(args.readers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    for name in ("writes", "reads"):
+        print(f"{name:>12}: {counts[name]:7d} ({counts[name] / args.seconds:8.1f}/s)")
+    for name in ("locked", "write_errors", "read_errors"):
+        print(f"{name:>12}: {counts[name]:7d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Exactness and speed of payroll money aggregation: the per-employee SQL SUM behind summaries
+and payslips, the company-wide SUM, and a full rollup rebuild.
+
+    python -m benchmarks.bench_money_aggregation --employees 1000 --days 100
+
+Amounts are seeded with centavos that floats cannot represent (0.10, 0.20, 33.33, ...); each
+total is checked against the exact Decimal sum of what was inserted. Runs against a throwaway
+SQLite database unless DATABASE_URL is already set.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench.sqlite3"
+
+from sqlalchemy import insert
+from app.db.session import SessionLocal, create_db_and_tables
+from app.models.employee import Employee
+from app.models.payroll import Payroll
+from app.services.payroll_aggregates import get_payroll_totals, get_payroll_totals_by_employee
+from app.services.rollup_service import rebuild_payroll_rollups
+
+START = date(2025, 1, 1)
+AMOUNTS = [Decimal(a) for a in ("0.10", "0.20", "33.33", "12.35", "0.05", "650.01", "99.99")]
+
+
+def seed(employees: int, days: int) -> Decimal:
+    """
+    Insert the rows and return the exact net_salary total.
+    """
+    rng = random.Random(7)
+    db = SessionLocal()
+    db.query(Payroll).delete()
+    db.query(Employee).delete()
+    db.execute(insert(Employee), [
+        dict(
+            id=i, first_name=f"First{i}", last_name=f"Last{i}", email=f"employee{i}@example.com",
+            hire_date=date(2020, 1, 1), position="Mason", salary=650.0, status="Active",
+        )
+        for i in range(1, employees + 1)
+    ])
+    rows, exact = [], Decimal(0)
+    for i in range(1, employees + 1):
+        for day in range(days):
+            net = rng.choice(AMOUNTS)
+            exact += net
+            time_in = datetime.combine(START + timedelta(days=day), datetime.min.time()) + timedelta(hours=8)
+            rows.append(dict(
+                employee_id=i, date=START + timedelta(days=day), time_in=time_in, time_out=time_in + timedelta(hours=9),
+                total_hours_worked=9.0, overtime_pay=float(rng.choice(AMOUNTS)), allowance=float(rng.choice(AMOUNTS)),
+                deductions=0.0, subtotal=float(net), net_salary=float(net), created_at=datetime.now(),
+            ))
+    db.execute(insert(Payroll), rows)
+    db.commit()
+    db.close()
+    return exact
+
+
+def timed(label: str, run, repeat: int):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = run()
+        samples.append(time.perf_counter() - started)
+    print(f"{label:>28}: best {min(samples) * 1000:8.1f} ms")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--employees", type=int, default=1000)
+    parser.add_argument("--days", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    create_db_and_tables()
+    exact = seed(args.employees, args.days)
+
+    db = SessionLocal()
+    try:
+        company = timed("company SUM", lambda: get_payroll_totals(db), args.repeat)
+        by_employee = timed("per-employee SUM", lambda: get_payroll_totals_by_employee(db), args.repeat)
+        timed("rollup rebuild", lambda: rebuild_payroll_rollups(db), max(1, args.repeat // 2))
+    finally:
+        db.close()
+
+    summed = sum((summary["totals"]["net_salary"] for summary in by_employee.values()), Decimal(0))
+    print(f"exact net total     {exact}")
+    print(f"company SUM         {company['totals']['net_salary']}  {'exact' if company['totals']['net_salary'] == exact else 'OFF'}")
+    print(f"sum of employee SUM {summed}  {'exact' if summed == exact else 'OFF'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Wall time of a server-side payroll run (POST /payroll/run) over a whole pay period.
+
+    python -m benchmarks.bench_payroll_run --employees 2000 --days 50
+
+Seeds employees x days punches with random day and night shifts, then runs the period twice:
+the first run rewrites every row, the second finds nothing to change. Runs against a throwaway
+SQLite database unless DATABASE_URL is already set.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench.sqlite3"
+
+from sqlalchemy import insert
+from app.db.session import SessionLocal, create_db_and_tables
+from app.models.employee import Employee
+from app.models.payroll import Payroll
+from app.services.payroll_engine import run_payroll
+
+START = date(2025, 1, 1)
+
+
+def seed(employees: int, days: int):
+    rng = random.Random(42)
+    db = SessionLocal()
+    db.query(Payroll).delete()
+    db.query(Employee).delete()
+    db.execute(insert(Employee), [
+        dict(
+            id=i, first_name=f"First{i}", last_name=f"Last{i}", email=f"employee{i}@example.com",
+            hire_date=date(2020, 1, 1), position="Mason", salary=float(rng.randint(550, 900)), status="Active",
+        )
+        for i in range(1, employees + 1)
+    ])
+    rows = []
+    for i in range(1, employees + 1):
+        for day in range(days):
+            time_in = datetime.combine(START + timedelta(days=day), datetime.min.time()) + timedelta(hours=rng.choice([6, 8, 14, 20]))
+            rows.append(dict(
+                employee_id=i, date=START + timedelta(days=day), time_in=time_in,
+                time_out=time_in + timedelta(minutes=rng.randint(6 * 60, 13 * 60)), project="Bench",
+                total_hours_worked=0.0, allowance=50.0, deductions=25.0, subtotal=0.0, net_salary=0.0,
+                created_at=datetime.now(),
+            ))
+    db.execute(insert(Payroll), rows)
+    db.commit()
+    db.close()
+
+
+def timed_run(end: str) -> dict:
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        result = run_payroll(db, START.isoformat(), end)
+        result["wall_s"] = time.perf_counter() - started
+        return result
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--employees", type=int, default=2000)
+    parser.add_argument("--days", type=int, default=50)
+    args = parser.parse_args()
+
+    create_db_and_tables()
+    seed(args.employees, args.days)
+    end = (START + timedelta(days=args.days - 1)).isoformat()
+
+    for label in ("first run", "rerun"):
+        result = timed_run(end)
+        print(f"{label:>9}: {result['rows']} rows, {result['updated']} updated in {result['wall_s']:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
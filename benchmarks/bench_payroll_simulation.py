@@ -0,0 +1,57 @@
+"""
+Wall time of a what-if rate simulation (POST /payroll/simulate) over a year of payroll.
+
+    python -m benchmarks.bench_payroll_simulation --employees 1000 --days 365
+
+Seeds punches the same way as bench_payroll_run, then simulates the whole range with a global
+overtime change, a per-position raise and a few per-employee rates. Runs against a throwaway
+SQLite database unless DATABASE_URL is already set.
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import timedelta
+
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench.sqlite3"
+
+from app.db.session import SessionLocal, create_db_and_tables
+from app.schemas.payroll import PayrollSimulation
+from app.services.payroll_engine import simulate_payroll
+from benchmarks.bench_payroll_run import START, seed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--employees", type=int, default=1000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    create_db_and_tables()
+    seed(args.employees, args.days)
+    simulation = PayrollSimulation(
+        start_date=START,
+        end_date=START + timedelta(days=args.days - 1),
+        global_override={"overtime_multiplier": 1.5},
+        positions={"Mason": {"daily_rate_multiplier": 1.05}},
+        employees={i: {"daily_rate": 800} for i in range(1, 51)},
+        include_employees=True,
+    )
+
+    db = SessionLocal()
+    try:
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            result = simulate_payroll(db, simulation)
+            print(
+                f"{result['rows']} rows, {result['employees']} employees: {time.perf_counter() - started:.2f} s, "
+                f"simulated net {result['simulated']['net_salary']:,.2f}"
+            )
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Time, output size and peak Python memory of the all-employees payroll workbook
+(Summary sheet plus one payslip sheet per employee, write-only openpyxl).
+
+    python -m benchmarks.bench_payroll_workbook --employees 500 --days 15
+
+Runs against a throwaway SQLite database unless DATABASE_URL is already set.
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench.sqlite3"
+
+from sqlalchemy import insert
+from app.db.session import SessionLocal, create_db_and_tables
+from app.models.employee import Employee
+from app.models.payroll import Payroll
+from app.services.payroll_service import build_payroll_workbook
+
+START = date(2025, 1, 1)
+
+
+def seed(employees: int, days: int):
+    db = SessionLocal()
+    db.query(Payroll).delete()
+    db.query(Employee).delete()
+    db.add_all(
+        Employee(
+            id=i, first_name=f"First{i}", last_name=f"Last{i}", email=f"employee{i}@example.com",
+            hire_date=date(2020, 1, 1), position="Mason", salary=650.0, status="Active",
+        )
+        for i in range(1, employees + 1)
+    )
+    db.flush()
+    rows = []
+    for i in range(1, employees + 1):
+        for day in range(days):
+            time_in = datetime.combine(START + timedelta(days=day), datetime.min.time()) + timedelta(hours=8)
+            rows.append(dict(
+                employee_id=i, date=START + timedelta(days=day), time_in=time_in, time_out=time_in + timedelta(hours=9),
+                project="Bench", total_hours_worked=9.0, overtime_pay=0.0, night_differential_pay=0.0,
+                allowance=50.0, deductions=25.0, subtotal=650.0, net_salary=675.0, created_at=datetime.now(),
+            ))
+    db.execute(insert(Payroll), rows)
+    db.commit()
+    db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--employees", type=int, default=500)
+    parser.add_argument("--days", type=int, default=15)
+    args = parser.parse_args()
+
+    create_db_and_tables()
+    seed(args.employees, args.days)
+    end = (START + timedelta(days=args.days - 1)).isoformat()
+
+    db = SessionLocal()
+    try:
+        tracemalloc.start()
+        started = time.perf_counter()
+        output = build_payroll_workbook(db, START.isoformat(), end)
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        size = os.fstat(output.fileno()).st_size
+        output.close()
+    finally:
+        db.close()
+
+    print(
+        f"{args.employees} employees x {args.days} days: {elapsed:.2f} s, "
+        f"{size / 1024 / 1024:.1f} MiB, peak Python memory {peak / 1024 / 1024:.1f} MiB"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Per-payslip latency of the old render path (new Jinja environment, template parse and
+CSS object on every call, assets fetched from disk) against the shared render context.
+
+    python -m benchmarks.bench_payslip_render --payslips 30 --rows 15
+"""
+import argparse
+import os
+import statistics
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+from jinja2 import Environment, FileSystemLoader
+from weasyprint import HTML, CSS
+from app.services.payslip_renderer import PAYSLIP_LANDSCAPE_CSS, PayslipRenderContext
+
+
+def fake_payslip_context(rows: int) -> dict:
+    employee = SimpleNamespace(id=1, first_name="Juan", last_name="Dela Cruz", position="Mason", salary=650.0)
+    start = date(2025, 1, 1)
+    payrolls = []
+    for day in range(rows):
+        time_in = datetime.combine(start + timedelta(days=day), datetime.min.time()) + timedelta(hours=8)
+        payrolls.append(SimpleNamespace(
+            time_in=time_in, time_out=time_in + timedelta(hours=9), overtime_pay=0.0,
+            night_differential_pay=0.0, allowance=50.0, deductions=25.0, net_salary=675.0,
+        ))
+    return {
+        "employee": employee,
+        "payrolls": payrolls,
+        "total_hours_worked": Decimal(9 * rows),
+        "total_overtime_pay": Decimal(0),
+        "total_night_diff": Decimal(0),
+        "total_deductions": Decimal(25 * rows),
+        "allowance": Decimal(50 * rows),
+        "total_gross_salary": Decimal(700 * rows),
+        "total_net_salary": Decimal(675 * rows),
+        "pay_period_from": start,
+        "pay_period_to": start + timedelta(days=rows - 1),
+        "current_date": datetime.now(),
+        "daily_rate": Decimal("650"),
+    }
+
+
+def render_legacy(context: dict) -> bytes:
+    template_env = Environment(loader=FileSystemLoader("app/templates"))
+    template = template_env.get_template("payroll_payslip.html")
+    html_content = template.render(**context)
+    landscape_css = CSS(string=PAYSLIP_LANDSCAPE_CSS)
+    base_url = os.path.abspath("app/static")
+    return HTML(string=html_content, base_url=base_url).write_pdf(stylesheets=[landscape_css])
+
+
+def render_shared(render_context: PayslipRenderContext, context: dict) -> bytes:
+    return render_context.render_pdf(render_context.render_html(**context))
+
+
+def time_renders(render, payslips: int) -> list:
+    render()  # warm-up, excluded
+    samples = []
+    for _ in range(payslips):
+        started = time.perf_counter()
+        render()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def report(label: str, samples: list):
+    ms = sorted(s * 1000 for s in samples)
+    p95 = ms[max(int(len(ms) * 0.95) - 1, 0)]
+    print(f"{label:<16} mean {statistics.mean(ms):8.2f} ms  median {statistics.median(ms):8.2f} ms  p95 {p95:8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--payslips", type=int, default=30)
+    parser.add_argument("--rows", type=int, default=15, help="payroll rows per payslip")
+    args = parser.parse_args()
+
+    context = fake_payslip_context(args.rows)
+    started = time.perf_counter()
+    render_context = PayslipRenderContext()
+    print(f"render context built in {(time.perf_counter() - started) * 1000:.2f} ms (once per process)")
+
+    legacy = time_renders(lambda: render_legacy(context), args.payslips)
+    shared = time_renders(lambda: render_shared(render_context, context), args.payslips)
+    report("per-call setup", legacy)
+    report("shared context", shared)
+    print(f"speedup {statistics.mean(legacy) / statistics.mean(shared):.2f}x over {args.payslips} payslips")
+
+
+if __name__ == "__main__":
+    main()
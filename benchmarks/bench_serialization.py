@@ -0,0 +1,107 @@
+"""
+Per-row cost of turning payroll rows into a JSON response body.
+
+    python -m benchmarks.bench_serialization --rows 100000
+
+Compares the old per-row path (ORM objects, mapper inspection per row, jsonable_encoder)
+with app.services.serialization (Core rows, one bulk validation, one JSON encode).
+Runs against a throwaway SQLite database unless DATABASE_URL is already set.
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench.sqlite3"
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import insert, select
+from sqlalchemy.inspection import inspect
+from app.db.session import SessionLocal, create_db_and_tables, engine
+from app.models.employee import Employee
+from app.models.payroll import Payroll
+from app.schemas.payroll import PayrollResponse
+from app.services.serialization import encode_json, to_responses
+
+EMPLOYEES = 500
+
+
+def seed(rows: int):
+    db = SessionLocal()
+    db.query(Payroll).delete()
+    db.query(Employee).delete()
+    db.add_all(
+        Employee(
+            id=i, first_name=f"First{i}", last_name=f"Last{i}", email=f"employee{i}@example.com",
+            hire_date=date(2020, 1, 1), position="Mason", salary=650.0, status="Active",
+        )
+        for i in range(1, EMPLOYEES + 1)
+    )
+    start = date(2024, 1, 1)
+    db.execute(insert(Payroll), [
+        {
+            "employee_id": i % EMPLOYEES + 1, "date": start + timedelta(days=i // EMPLOYEES),
+            "time_in": datetime(2024, 1, 1, 8), "time_out": datetime(2024, 1, 1, 17),
+            "total_hours_worked": 9, "overtime_hour": 0, "overtime_pay": 0, "night_differential_hour": 0,
+            "night_differential_pay": 0, "allowance": 50, "deductions": 25, "subtotal": 700, "net_salary": 675,
+            "project": f"Project {i % 7}", "created_at": datetime.now(),
+        }
+        for i in range(rows)
+    ])
+    db.commit()
+    db.close()
+
+
+def per_row_inspection(db):
+    payrolls = db.query(Payroll).all()
+    items = [
+        PayrollResponse(**{c.key: getattr(payroll, c.key) for c in inspect(Payroll).mapper.column_attrs})
+        for payroll in payrolls
+    ]
+    return items, lambda: json.dumps(jsonable_encoder(items), separators=(",", ":")).encode()
+
+
+def bulk_serialization(db):
+    items = to_responses(PayrollResponse, db.execute(select(*Payroll.__table__.c)).all())
+    return items, lambda: encode_json(items)
+
+
+def measure(name: str, build, rows: int):
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        items, encode = build(db)
+        built = time.perf_counter()
+        body = encode()
+        encoded = time.perf_counter()
+    finally:
+        db.close()
+    assert len(items) == rows
+    build_us = (built - started) / rows * 1e6
+    encode_us = (encoded - built) / rows * 1e6
+    print(
+        f"{name:>20}: load+build {build_us:6.2f} us/row, encode {encode_us:6.2f} us/row, "
+        f"total {(encoded - started):6.2f}s, {len(body) / 1e6:.1f} MB"
+    )
+    return body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    engine.echo = False
+    create_db_and_tables()
+    seed(args.rows)
+
+    old = measure("per-row inspection", per_row_inspection, args.rows)
+    new = measure("bulk serialization", bulk_serialization, args.rows)
+    print(f"{'':>20}  identical output: {old == new}")
+
+
+if __name__ == "__main__":
+    main()
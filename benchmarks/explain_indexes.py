@@ -0,0 +1,109 @@
+"""
+Checks that the employee/payroll list and employee search queries are served from indexes.
+
+    python -m benchmarks.explain_indexes
+
+Runs the real service functions against a throwaway SQLite database, captures the SQL they
+execute and prints EXPLAIN QUERY PLAN for each. Exits non-zero if any plan scans a table
+without an index or sorts rows in a temporary b-tree.
+"""
+import os
+import sys
+import tempfile
+from datetime import date, datetime, timedelta
+
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/explain.sqlite3"
+
+from sqlalchemy import event, text
+from app.db.session import SessionLocal, create_db_and_tables, engine
+from app.models.employee import Employee
+from app.models.payroll import Payroll
+from app.services.employee_service import get_all_employees, get_filtered_employees
+from app.services.payroll_service import get_all_payrolls
+
+EMPLOYEES = 200
+DAYS = 20
+
+
+def seed():
+    db = SessionLocal()
+    db.add_all(
+        Employee(
+            id=i, first_name=f"First{i}", last_name=f"Last{i}", email=f"employee{i}@example.com",
+            hire_date=date(2020, 1, 1) + timedelta(days=i), position="Mason", salary=650.0,
+            status="Active" if i % 3 else "Inactive",
+        )
+        for i in range(1, EMPLOYEES + 1)
+    )
+    db.add_all(
+        Payroll(
+            employee_id=e, date=date(2024, 1, 1) + timedelta(days=d),
+            time_in=datetime(2024, 1, 1, 8), time_out=datetime(2024, 1, 1, 17),
+            total_hours_worked=9, deductions=25, subtotal=700, net_salary=675,
+            project=f"Project {e % 7}", created_at=datetime.now(),
+        )
+        for e in range(1, EMPLOYEES + 1) for d in range(DAYS)
+    )
+    db.commit()
+    db.close()
+    with engine.connect() as conn:
+        conn.execute(text("ANALYZE"))
+
+
+def captured_statements(run):
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    db = SessionLocal()
+    try:
+        run(db)
+    finally:
+        db.close()
+        event.remove(engine, "before_cursor_execute", capture)
+    return statements
+
+
+CHECKS = {
+    "employee list by status": lambda db: get_all_employees(db, limit=20, status="Active"),
+    "employee filter by hire date": lambda db: get_filtered_employees(db, hire_date_from="2020-03-01", hire_date_to="2020-03-10"),
+    "employee name search": lambda db: get_filtered_employees(db, search="st12"),
+    "payroll list": lambda db: get_all_payrolls(db, limit=20),
+    "payroll list by date range": lambda db: get_all_payrolls(db, limit=20, start_date="2024-01-05", end_date="2024-01-07"),
+    "payroll list by project": lambda db: get_all_payrolls(db, limit=20, project="Project 3"),
+    "payroll list by employee": lambda db: get_all_payrolls(db, limit=20, employee_id=5),
+}
+
+
+def main() -> int:
+    engine.echo = False
+    create_db_and_tables()
+    seed()
+
+    failures = 0
+    raw = engine.raw_connection()
+    try:
+        for name, run in CHECKS.items():
+            for statement, parameters in captured_statements(run):
+                plan = [row[3] for row in raw.execute(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()]
+                bad = [
+                    step for step in plan
+                    if (step.startswith("SCAN") and " USING " not in step and "VIRTUAL TABLE" not in step)
+                    or "TEMP B-TREE" in step
+                ]
+                status = "FAIL" if bad else "ok"
+                failures += bool(bad)
+                print(f"[{status}] {name}")
+                for step in plan:
+                    print(f"       {step}")
+    finally:
+        raw.close()
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
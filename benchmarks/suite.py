@@ -0,0 +1,205 @@
+"""
+Latency of the key API operations on deterministic synthetic data, as JSON that later runs can
+be compared against.
+
+    python -m benchmarks.suite --employees 500 --days 30 --output results.json
+    python -m benchmarks.suite --employees 500 --days 30 --baseline results.json
+
+Every request goes through the FastAPI app in-process (TestClient): list endpoints, payroll
+summaries, batch upload of a template-format spreadsheet, and PDF/Excel payslips. The payslip
+cache is off so each payslip request renders. With --baseline, an operation whose median is more
+than --threshold slower than the baseline's is flagged and the exit status is 1; record the
+baseline on the same, otherwise idle machine. Runs against a throwaway SQLite database unless
+DATABASE_URL is already set.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench.sqlite3"
+os.environ.setdefault("PAYSLIP_CACHE_ENABLED", "false")
+
+from fastapi.testclient import TestClient
+from app.main import app
+from app.db.session import create_db_and_tables, engine
+from benchmarks.synthetic import START, employees, payroll_rows, seed_database, template_workbook
+
+SCHEMA_VERSION = 1
+API = "/api/v1"
+
+
+def operations(staff: list, days: int, upload_rows: int, seed: int) -> dict:
+    """
+    name -> callable(iteration) that builds one request and returns (method, url, kwargs).
+    Employee ids and search terms come from a seeded generator, so every run issues the same requests.
+    """
+    rng = random.Random(seed)
+    employee_ids = [rng.choice(staff)["id"] for _ in range(1000)]
+    searches = [staff[i % len(staff)]["last_name"].split()[0][:4] for i in range(len(staff))]
+    end = (START + timedelta(days=days - 1)).isoformat()
+    upload_employees = staff[:max(1, min(len(staff), upload_rows))]
+    upload_days = max(1, upload_rows // len(upload_employees))
+
+    def upload(i):
+        # a fresh date range for every request, so insert mode never hits an existing row
+        first_day = START + timedelta(days=days + i * upload_days)
+        content = template_workbook(payroll_rows(upload_employees, upload_days, first_day, seed))
+        return "POST", f"{API}/payroll/batch-upload", {"files": {"excel_file": ("payroll.xlsx", content)}}
+
+    def pick(i):
+        return employee_ids[i % len(employee_ids)]
+
+    return {
+        "employees_list": lambda i: ("GET", f"{API}/employees/?limit=100", {}),
+        "employees_search": lambda i: ("GET", f"{API}/employees/employeeList?search={searches[i % len(searches)]}", {}),
+        "employee_detail": lambda i: ("GET", f"{API}/employees/{pick(i)}", {}),
+        "payroll_list": lambda i: ("GET", f"{API}/payroll/?limit=100", {}),
+        "payroll_list_employee": lambda i: ("GET", f"{API}/payroll/?limit=100&employee_id={pick(i)}", {}),
+        "payroll_summary": lambda i: ("GET", f"{API}/payroll/summary?employee_id={pick(i)}&start_date={START}&end_date={end}", {}),
+        "payroll_summary_totals": lambda i: ("GET", f"{API}/payroll/summary?employee_id={pick(i)}&totals_only=true", {}),
+        "batch_upload": upload,
+        "payslip_pdf": lambda i: ("GET", f"{API}/payroll/payslip/pdf?employee_id={pick(i)}", {}),
+        "payslip_excel": lambda i: ("GET", f"{API}/payroll/payslip/excel?employee_id={pick(i)}", {}),
+    }
+
+
+def measure(client: TestClient, build, repeat: int, warmup: int) -> dict:
+    """
+    Time repeat requests (after warmup untimed ones); request building is outside the clock.
+    """
+    samples = []
+    for i in range(warmup + repeat):
+        method, url, kwargs = build(i)
+        started = time.perf_counter()
+        response = client.request(method, url, **kwargs)
+        elapsed = time.perf_counter() - started
+        if response.status_code >= 400:
+            raise RuntimeError(f"{method} {url} returned {response.status_code}: {response.text[:200]}")
+        if i >= warmup:
+            samples.append(elapsed * 1000)
+    samples.sort()
+    return {
+        "samples": len(samples),
+        "median_ms": round(statistics.median(samples), 3),
+        "mean_ms": round(statistics.fmean(samples), 3),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+        "min_ms": round(samples[0], 3),
+        "max_ms": round(samples[-1], 3),
+    }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def compare(results: dict, baseline: dict, threshold: float, min_delta_ms: float) -> list:
+    """
+    Print current medians against the baseline's and return the names of the regressed operations.
+    A regression is a median slower by more than threshold (a fraction) and by more than
+    min_delta_ms, where even the fastest current sample is slower than the baseline median;
+    the last condition keeps a few slow outliers from flagging an operation.
+    """
+    if baseline.get("parameters") != results["parameters"]:
+        print(f"warning: baseline parameters {baseline.get('parameters')} differ from this run's {results['parameters']}")
+    regressions = []
+    print(f"\n{'operation':<24} {'baseline ms':>12} {'current ms':>12} {'change':>9}")
+    for name, current in results["operations"].items():
+        before = baseline.get("operations", {}).get(name)
+        if before is None:
+            print(f"{name:<24} {'-':>12} {current['median_ms']:>12.2f} {'new':>9}")
+            continue
+        delta = current["median_ms"] - before["median_ms"]
+        change = delta / before["median_ms"] if before["median_ms"] else 0.0
+        regressed = change > threshold and delta > min_delta_ms and current["min_ms"] > before["median_ms"]
+        if regressed:
+            regressions.append(name)
+        print(
+            f"{name:<24} {before['median_ms']:>12.2f} {current['median_ms']:>12.2f} {change:>+8.1%}"
+            f"{'  REGRESSION' if regressed else ''}"
+        )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--employees", type=int, default=500)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--upload-rows", type=int, default=1000)
+    parser.add_argument("--only", nargs="+", help="Operation names to run (default: all)")
+    parser.add_argument("--output", help="Write the results JSON here")
+    parser.add_argument("--baseline", help="Results JSON from an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Slowdown that counts as a regression, e.g. 0.10 = 10%%")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="Ignore slowdowns smaller than this")
+    args = parser.parse_args()
+
+    staff = employees(args.employees, args.seed)
+    available = operations(staff, args.days, args.upload_rows, args.seed)
+    unknown = set(args.only or []) - set(available)
+    if unknown:
+        parser.error(f"unknown operations {sorted(unknown)}; choose from {list(available)}")
+
+    engine.echo = False
+    create_db_and_tables()
+    started = time.perf_counter()
+    seed_database(args.employees, args.days, args.seed)
+    print(f"seeded {args.employees} employees x {args.days} days in {time.perf_counter() - started:.1f}s")
+
+    client = TestClient(app)
+    results = {
+        "schema_version": SCHEMA_VERSION,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "database": engine.dialect.name,
+            "cpus": os.cpu_count(),
+        },
+        "parameters": {
+            "employees": args.employees, "days": args.days, "seed": args.seed,
+            "repeat": args.repeat, "warmup": args.warmup, "upload_rows": args.upload_rows,
+        },
+        "operations": {},
+    }
+    print(f"{'operation':<24} {'median ms':>10} {'p95 ms':>10} {'min ms':>10}")
+    for name, build in available.items():
+        if args.only and name not in args.only:
+            continue
+        stats = measure(client, build, args.repeat, args.warmup)
+        results["operations"][name] = stats
+        print(f"{name:<24} {stats['median_ms']:>10.2f} {stats['p95_ms']:>10.2f} {stats['min_ms']:>10.2f}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold, args.min_delta_ms)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+            sys.exit(1)
+        print("\nno regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Deterministic synthetic data for the benchmarks: N employees with M days of payroll each, and
+upload spreadsheets in the download_payroll_template layout. The same seed always produces the
+same rows, so timings from different runs are measured on identical data.
+
+Import after DATABASE_URL is set; the benchmark modules take care of that.
+"""
+import random
+from datetime import date, datetime, timedelta
+from io import BytesIO
+from typing import Iterator, List
+from openpyxl import Workbook
+from sqlalchemy import insert
+from app.db.session import SessionLocal
+from app.models.employee import Employee
+from app.models.payroll import Payroll
+from app.models.payroll_rollup import PayrollRollup
+from app.services.employee_cache import employee_cache
+from app.services.payroll_service import REQUIRED_COLUMNS
+from app.services.rollup_service import rebuild_payroll_rollups
+
+START = date(2025, 1, 1)
+FIRST_NAMES = ["Juan", "Maria", "Jose", "Ana", "Pedro", "Rosa", "Carlo", "Liza", "Ramon", "Elena"]
+LAST_NAMES = ["Dela Cruz", "Santos", "Reyes", "Garcia", "Mendoza", "Torres", "Flores", "Ramos", "Castro", "Rivera"]
+POSITIONS = ["Mason", "Welder", "Carpenter", "Electrician", "Foreman", "Laborer"]
+PROJECTS = [f"Project {n}" for n in range(1, 8)]
+INSERT_BATCH = 5000
+
+
+def employees(count: int, seed: int = 42) -> List[dict]:
+    rng = random.Random(seed)
+    return [
+        dict(
+            id=i,
+            first_name=rng.choice(FIRST_NAMES),
+            last_name=f"{rng.choice(LAST_NAMES)} {i}",
+            email=f"employee{i}@example.com",
+            hire_date=date(2015, 1, 1) + timedelta(days=rng.randrange(3000)),
+            position=rng.choice(POSITIONS),
+            salary=float(rng.randrange(550, 950)),
+            status="Active" if rng.random() < 0.9 else "Inactive",
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+def payroll_rows(staff: List[dict], days: int, first_day: date = START, seed: int = 42) -> Iterator[dict]:
+    """
+    One payroll row per employee per day, in date order. Shifts start between 06:00 and 08:45 and
+    last 8 to 12 hours; hours past 10 are overtime at 1.25x the hourly rate.
+    """
+    rng = random.Random(f"{seed}-{first_day.isoformat()}")
+    for offset in range(days):
+        day = first_day + timedelta(days=offset)
+        for employee in staff:
+            time_in = datetime.combine(day, datetime.min.time()) + timedelta(minutes=rng.randrange(6 * 60, 9 * 60, 15))
+            hours = rng.randrange(8 * 4, 12 * 4 + 1) / 4
+            overtime_hour = max(hours - 10, 0.0)
+            overtime_pay = round(overtime_hour * employee["salary"] / 10 * 1.25, 2)
+            allowance = rng.choice([0.0, 50.0, 100.0])
+            deductions = rng.choice([0.0, 25.0, 40.5])
+            subtotal = round(employee["salary"] + overtime_pay + allowance, 2)
+            yield dict(
+                employee_id=employee["id"],
+                date=day,
+                time_in=time_in,
+                time_out=time_in + timedelta(hours=hours),
+                total_hours_worked=hours,
+                overtime_hour=overtime_hour,
+                overtime_pay=overtime_pay,
+                night_differential_hour=0.0,
+                night_differential_pay=0.0,
+                allowance=allowance,
+                deductions=deductions,
+                deduction_remarks="SSS" if deductions else "",
+                subtotal=subtotal,
+                net_salary=round(subtotal - deductions, 2),
+                project=rng.choice(PROJECTS),
+            )
+
+
+def seed_database(employee_count: int, days: int, seed: int = 42) -> List[dict]:
+    """
+    Replace every employee and payroll row with generated ones, rebuild the rollups and return
+    the generated employees.
+    """
+    staff = employees(employee_count, seed)
+    created_at = datetime.combine(START, datetime.min.time())
+    db = SessionLocal()
+    try:
+        db.query(PayrollRollup).delete()
+        db.query(Payroll).delete()
+        db.query(Employee).delete()
+        db.execute(insert(Employee), staff)
+        batch = []
+        for row in payroll_rows(staff, days, START, seed):
+            batch.append({**row, "created_at": created_at})
+            if len(batch) >= INSERT_BATCH:
+                db.execute(insert(Payroll), batch)
+                batch = []
+        if batch:
+            db.execute(insert(Payroll), batch)
+        rebuild_payroll_rollups(db)
+        db.commit()
+    finally:
+        db.close()
+    employee_cache.clear()
+    return staff
+
+
+def template_workbook(rows) -> bytes:
+    """
+    Payroll rows as an upload spreadsheet in the download_payroll_template column layout.
+    """
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Payroll Template")
+    ws.append(REQUIRED_COLUMNS)
+    for row in rows:
+        values = {
+            **row,
+            "date": row["date"].isoformat(),
+            "time_in": row["time_in"].strftime("%H:%M:%S"),
+            "time_out": row["time_out"].strftime("%H:%M:%S"),
+        }
+        ws.append([values[column] for column in REQUIRED_COLUMNS])
+    output = BytesIO()
+    wb.save(output)
+    return output.getvalue()